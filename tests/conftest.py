@@ -0,0 +1,50 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+# vim:fenc=utf-8
+#
+# Copyright © 2020 Pi-Yueh Chuang <pychuang@pm.me>
+#
+# Distributed under terms of the BSD 3-Clause license.
+
+"""Fixtures of synthetic Zotero libraries."""
+import shutil
+import sqlite3
+import pytest
+from zoteroutils import synthetic
+
+
+def modify(zotero_dir, sql, params=()):
+    """Run a statement against `zotero.sqlite` of a library and commit it."""
+    conn = sqlite3.connect(str(zotero_dir.joinpath("zotero.sqlite")))
+    with conn:
+        conn.execute(sql, params)
+    conn.close()
+
+
+def touch(zotero_dir, item_id):
+    """Mark an item as modified the way Zotero does: a new version and modification times."""
+    modify(
+        zotero_dir,
+        "UPDATE items SET version = version + 1, dateModified = datetime('now', '+100 years'), "
+        "clientDateModified = datetime('now', '+100 years') WHERE itemID = ?;", (item_id,))
+
+
+@pytest.fixture(scope="session")
+def library(tmp_path_factory):
+    """A synthetic library with 500 documents and one standalone attachment. Do not modify it."""
+    zotero_dir = tmp_path_factory.mktemp("library")
+    synthetic.generate(zotero_dir, 500, seed=1)
+    modify(
+        zotero_dir, "INSERT INTO items(itemID, itemTypeID, libraryID, key) VALUES (?, ?, 1, ?);",
+        (100000, synthetic.ITEM_TYPES.index("attachment") + 1, "STANDALN"))
+    modify(
+        zotero_dir, "INSERT INTO itemAttachments(itemID, linkMode, path) VALUES (?, 1, ?);",
+        (100000, "storage:standalone.pdf"))
+    return zotero_dir
+
+
+@pytest.fixture
+def scratch(library, tmp_path):
+    """A copy of `library` that tests may modify."""
+    shutil.copy(library.joinpath("zotero.sqlite"), tmp_path.joinpath("zotero.sqlite"))
+    return tmp_path
@@ -0,0 +1,112 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+# vim:fenc=utf-8
+#
+# Copyright © 2020 Pi-Yueh Chuang <pychuang@pm.me>
+#
+# Distributed under terms of the BSD 3-Clause license.
+
+"""Tests of the asyncio counterpart of Database."""
+import time
+import asyncio
+import pandas
+import pytest
+from zoteroutils.aio import AsyncDatabase
+from zoteroutils.database import Database
+
+# a statement running for minutes unless interrupted
+SLOW = "WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n) SELECT MAX(i) FROM n;"
+
+
+def _slow(conn):
+    """Run `SLOW` on a connection."""
+    return conn.execute(SLOW).fetchone()
+
+
+def test_results(scratch):
+    """Results equal those of Database, including arguments only some methods take."""
+    with Database(scratch) as db:
+        docs = db.get_docs(compact=True)
+        fields = db.search_fields("flow")
+        creators = db.search_creators("anne")
+
+    async def main():
+        async with AsyncDatabase(scratch) as adb:
+            assert await adb.update_index(fulltext=False) == 0  # built by db already
+            assert await adb.update_index(creators=False) > 0
+            return await asyncio.gather(
+                adb.get_docs(compact=True), adb.search_fields("flow"), adb.search_creators("anne"))
+
+    for result, expected in zip(asyncio.run(main()), [docs, fields, creators]):
+        pandas.testing.assert_frame_equal(result, expected)
+
+
+def test_cache(library):
+    """Requests go through the cache of the underlying Database."""
+
+    async def main():
+        async with AsyncDatabase(library, cache=True) as adb:
+            first = await adb.get_docs()
+            pandas.testing.assert_frame_equal(await adb.get_docs(), first)
+            pandas.testing.assert_frame_equal(adb.db.get_docs(), first)
+            return adb.db.cache.stats()
+
+    stats = asyncio.run(main())
+    assert stats["misses"] == 1 and stats["hits"] == 2
+
+
+def test_concurrent(scratch):
+    """More concurrent requests than threads all finish with the same results as in sequence."""
+    with Database(scratch) as db:
+        expected = [db.search_fields(key) for key in ["flow", "boundary layer", "café"]]
+
+    async def main():
+        async with AsyncDatabase(scratch, max_concurrency=2) as adb:
+            tasks = [adb.search_fields(key) for key in ["flow", "boundary layer", "café"] * 4]
+            return await asyncio.gather(*tasks)
+
+    for i, result in enumerate(asyncio.run(main())):
+        pandas.testing.assert_frame_equal(result, expected[i % 3])
+
+
+def test_cancel_running(library):
+    """Cancelling a task interrupts its statement, and the connection is usable afterward."""
+
+    async def main():
+        async with AsyncDatabase(library, max_concurrency=1) as adb:
+            task = asyncio.ensure_future(adb.run(_slow))
+            await asyncio.sleep(0.2)
+            start = time.perf_counter()
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+            # the only thread is free again soon, and the pooled connection still works
+            docs = await asyncio.wait_for(adb.get_docs(), 30)
+            return time.perf_counter() - start, docs
+
+    seconds, docs = asyncio.run(main())
+    assert seconds < 30
+    assert len(docs) > 0
+
+
+def test_cancel_queued(library):
+    """A task cancelled while waiting for a thread never runs."""
+    calls = []
+
+    async def main():
+        async with AsyncDatabase(library, max_concurrency=1) as adb:
+            running = asyncio.ensure_future(adb.run(_slow))
+            queued = asyncio.ensure_future(adb.run(lambda conn: calls.append(conn)))
+            await asyncio.sleep(0.2)
+
+            queued.cancel()
+            running.cancel()
+            for task in [queued, running]:
+                with pytest.raises(asyncio.CancelledError):
+                    await task
+
+            await adb.run(lambda conn: None)  # waits until the queued task has been skipped
+
+    asyncio.run(main())
+    assert calls == []
@@ -0,0 +1,48 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+# vim:fenc=utf-8
+#
+# Copyright © 2020 Pi-Yueh Chuang <pychuang@pm.me>
+#
+# Distributed under terms of the BSD 3-Clause license.
+
+"""Tests of reading many profiles on a process pool."""
+import pandas
+import pytest
+from zoteroutils import batch
+from zoteroutils.database import Database
+
+
+def test_get_docs(library, scratch):
+    """Profiles are concatenated in the given order, each equal to its own Database.get_docs."""
+    with Database(library) as db:
+        expected = db.get_docs(abs_attach_path=False, method="single")
+
+    docs = batch.get_docs({"a": library, "b": scratch}, 2, abs_attach_path=False, method="single")
+    assert docs["profile"].unique().tolist() == ["a", "b"]
+
+    for name in ["a", "b"]:
+        pandas.testing.assert_frame_equal(
+            docs[docs["profile"] == name].drop(columns="profile"), expected)
+
+
+def test_errors(library, tmp_path):
+    """A failing profile does not affect the others, and is raised, warned, or ignored."""
+    missing = tmp_path.joinpath("missing")
+    profiles = [library, missing]
+
+    results = {result.profile: result for result in batch.iter_docs(profiles, 2)}
+    assert results[str(library)].error is None and len(results[str(library)].docs) > 0
+    assert results[str(missing)].docs is None and results[str(missing)].error is not None
+
+    with pytest.raises(RuntimeError):
+        batch.get_docs(profiles, 2)
+
+    with pytest.warns(RuntimeWarning):
+        docs = batch.get_docs(profiles, 2, errors="warn")
+    assert set(docs["profile"]) == {str(library)}
+
+    assert batch.get_docs([missing], 1, errors="ignore").empty
+
+    with pytest.raises(ValueError):
+        batch.get_docs(profiles, errors="nothing")
@@ -0,0 +1,109 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+# vim:fenc=utf-8
+#
+# Copyright © 2020 Pi-Yueh Chuang <pychuang@pm.me>
+#
+# Distributed under terms of the BSD 3-Clause license.
+
+"""Tests of the cache of query results."""
+import numpy
+import pandas
+from zoteroutils.cache import ResultCache, freeze
+from zoteroutils.database import Database
+from conftest import modify
+
+
+def test_hits(library):
+    """Repeated calls with the same arguments hit the cache; other arguments do not."""
+    with Database(library, cache=True) as db:
+        first = db.get_docs()
+        first["title"] = ""  # callers get copies, so this does not modify the cache
+        assert (db.get_docs()["title"] != "").any()
+        db.get_docs(method="single")
+        db.search_fields("flow")
+        db.search_fields("flow")
+        assert db.cache.stats()["hits"] == 2
+        assert db.cache.stats()["misses"] == 3
+
+
+def test_live_invalidation(scratch):
+    """Committing to zotero.sqlite invalidates cached results of the live mode."""
+    with Database(scratch, cache=True) as db:
+        before = db.get_docs()
+        modify(scratch, "DELETE FROM items WHERE itemID = 1;")
+        after = db.get_docs()
+
+    assert 1 in before.index
+    assert 1 not in after.index
+
+
+def test_snapshot_invalidation(scratch):
+    """Results are only reused for the same snapshot, also across instances sharing a cache."""
+    cache = ResultCache()
+
+    with Database(scratch, mode="snapshot", cache=cache) as old:
+        before = old.get_docs()
+        modify(scratch, "DELETE FROM items WHERE itemID = 1;")
+
+        # the snapshot of `old` was taken before the deletion
+        assert 1 in before.index
+        assert 1 in old.get_docs().index
+
+        with Database(scratch, mode="snapshot", cache=cache) as new:
+            assert 1 not in new.get_docs().index
+
+        assert 1 in old.get_docs().index
+
+        old.refresh()
+        assert 1 not in old.get_docs().index
+
+
+def test_lru():
+    """Stale entries are invalidated, and the least recently used entries are evicted first."""
+    cache = ResultCache(max_entries=2, copy=False)
+    calls = []
+
+    def get(key, stamp=0):
+        return cache.get(key, stamp, lambda: calls.append(key) or [key])
+
+    get("a"), get("b"), get("a"), get("c")  # "b" is the least recently used
+    assert list(cache._entries) == ["a", "c"]  # pylint: disable=protected-access
+    assert get("a", stamp=1) == ["a"]
+    assert calls == ["a", "b", "c", "a"]
+
+    stats = cache.stats()
+    assert [stats[key] for key in ["hits", "misses", "invalidations", "evictions"]] == [1, 4, 1, 1]
+    assert stats["entries"] == 2 and stats["bytes"] > 0
+
+    cache.clear()
+    assert len(cache) == 0 and cache.stats()["bytes"] == 0 and cache.stats()["hits"] == 1
+
+
+def test_max_bytes():
+    """Results larger than the limit are returned but not cached."""
+    cache = ResultCache(max_bytes=1000)
+    big = pandas.DataFrame({"a": numpy.arange(1000)})
+
+    pandas.testing.assert_frame_equal(cache.get("big", 0, lambda: big), big)
+    assert len(cache) == 0
+    assert cache.get("small", 0, lambda: 1) == 1 and len(cache) == 1
+
+
+def test_freeze():
+    """Equal arguments of different types freeze to the same keys."""
+    assert freeze([1, 2, 3]) == freeze((1, 2, 3)) == freeze(numpy.array([1, 2, 3]))
+    assert freeze(pandas.Index([1, 2, 3])) == freeze(pandas.Series([1, 2, 3])) == (1, 2, 3)
+    assert freeze({"b": [1], "a": None}) == freeze({"a": None, "b": (1,)})
+    assert freeze({3, 1}) == freeze(frozenset([1, 3])) != freeze((1, 3))
+    assert freeze(numpy.int64(3)) == 3 and isinstance(freeze(numpy.float32(0.5)), float)
+    hash(freeze({"nested": [{"set": {1}}, numpy.arange(2)]}))
+
+
+def test_numpy_item_ids(library):
+    """Arrays of itemIDs are valid cache keys, equal to lists of the same itemIDs."""
+    with Database(library, cache=True) as db:
+        ids = db.get_docs().index[:10]
+        db.get_docs(ids.to_numpy())
+        db.get_docs(ids.tolist())
+        assert db.cache.stats()["hits"] == 1
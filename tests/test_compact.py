@@ -0,0 +1,66 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+# vim:fenc=utf-8
+#
+# Copyright © 2020 Pi-Yueh Chuang <pychuang@pm.me>
+#
+# Distributed under terms of the BSD 3-Clause license.
+
+"""Tests of the memory-compact dtypes of get_docs."""
+import pandas
+import pytest
+from zoteroutils.process import memory_report
+from zoteroutils.database import Database
+
+
+def _plain(values):
+    """Values as plain Python objects, with missing values as empty strings."""
+    return ["" if value is None or value is pandas.NA or value != value else (
+        list(value) if hasattr(value, "__len__") and not isinstance(value, str) else str(value))
+        for value in values]
+
+
+@pytest.mark.parametrize("output", ["path", "str", "explode"])
+@pytest.mark.parametrize("simplify", [True, False])
+def test_compact(library, output, simplify):
+    """The compact mode holds the same values as the default mode."""
+    with Database(library) as db:
+        docs = db.get_docs(attachment_output=output, simplify_author=simplify)
+        compact = db.get_docs(attachment_output=output, simplify_author=simplify, compact=True)
+
+    assert list(compact.index) == list(docs.index)
+    assert list(compact.columns) == list(docs.columns)
+
+    for column in ["title", "document type", "publication title", "year"]:
+        assert _plain(compact[column]) == _plain(docs[column]), column
+
+    expected = pandas.to_datetime(docs["time added"], utc=True)
+    assert (compact["time added"] == expected).all()
+
+    if output == "explode":
+        assert _plain(compact["attachment path"]) == _plain(docs["attachment path"])
+    else:  # single paths become lists of one path
+        assert [list(v) for v in compact["attachment path"]] == [
+            [] if v == "" else list(map(str, v)) if isinstance(v, list) else [str(v)]
+            for v in docs["attachment path"]]
+
+    if simplify:
+        assert _plain(compact["author"]) == _plain(docs["author"])
+    else:
+        assert [list(map(str, v)) for v in compact["author"]] == docs["author"].tolist()
+
+
+def test_dtypes_and_memory(library):
+    """Compact columns use smaller dtypes and less memory."""
+    with Database(library) as db:
+        docs = db.get_docs(attachment_output="str")
+        compact = db.get_docs(attachment_output="str", compact=True)
+
+    assert compact["document type"].dtype == "category"
+    assert compact["year"].dtype == "Int16"
+    assert str(compact["time added"].dtype) == "datetime64[ns, UTC]"
+
+    report = memory_report(default=docs, compact=compact)
+    assert report.loc["total", "compact"] < report.loc["total", "default"]
+    assert report.loc["year", "compact dtype"] == "Int16"
+    assert report.loc["total", "default"] == report["default"].drop("total").sum()
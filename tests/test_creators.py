@@ -0,0 +1,66 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+# vim:fenc=utf-8
+#
+# Copyright © 2020 Pi-Yueh Chuang <pychuang@pm.me>
+#
+# Distributed under terms of the BSD 3-Clause license.
+
+"""Tests of the fuzzy creator search with the trigram index."""
+import pytest
+from zoteroutils.index import edit_distance
+from zoteroutils.database import Database
+from conftest import modify
+
+NAMES = [("Anka", "Novak"), ("José", "Ortega"), ("Marguerite", "Wojciechowska")]
+
+
+@pytest.fixture
+def db(scratch):
+    """A Database of a library with a few extra creators. One of them is a document's author."""
+    for i, (first, last) in enumerate(NAMES, 900001):
+        modify(scratch, "INSERT INTO creators VALUES (?, ?, ?, 0);", (i, first, last))
+    modify(scratch, "INSERT INTO itemCreators VALUES (2, 900002, 1, 99);")
+
+    with Database(scratch) as database:
+        yield database
+
+
+@pytest.mark.parametrize("first, second, expected", [
+    ("smith", "smith", 0), ("smith", "smtih", 1), ("smith", "smyth", 1), ("smith", "smth", 1),
+    ("akna", "anka", 1), ("jsoe", "jose", 1), ("ca", "abc", 3), ("", "abc", 3),
+])
+def test_edit_distance(first, second, expected):
+    """Insertions, deletions, substitutions, and adjacent transpositions cost one edit each."""
+    assert edit_distance(first, second) == expected
+    assert edit_distance(second, first) == expected
+    assert edit_distance(first, second, 0) == min(expected, 1)
+
+
+@pytest.mark.parametrize("key, creator_id", [
+    ("Akna", 900001),  # transposition of a short key
+    ("jsoe", 900002),  # transposition, with diacritics
+    ("Anko", 900001),  # substitution of a short key
+    ("Nvak", 900001),  # deletion
+    ("Ortegga", 900002),  # insertion
+    ("Wojceichowska", 900003),  # transposition of a long key
+    ("Wojciechovska", 900003),  # substitution of a long key
+    ("Margueritte Wojciechowska", 900003),  # the full name
+])
+def test_fuzzy(db, key, creator_id):
+    """Names within the tolerated edit distance are found, ignoring case and diacritics."""
+    found = db.search_creators(key, limit=100)  # synthetic first names are common ones
+    assert creator_id in found["creatorID"].tolist()
+    assert found["distance"].is_monotonic_increasing
+
+
+def test_modes(db):
+    """Prefix and substring searches, and the items of the matched creators."""
+    assert db.search_creators("ortegax", mode="substring").empty
+    assert 900002 in db.search_creators("rteg", mode="substring")["creatorID"].tolist()
+    assert 900002 not in db.search_creators("rteg", mode="prefix")["creatorID"].tolist()
+    assert 900002 in db.search_creators("orte", mode="prefix")["creatorID"].tolist()
+    assert db.search_creators("ortega", items=True).iloc[0].tolist() == [2, 0]
+
+    with pytest.raises(ValueError):
+        db.search_creators("ortega", mode="nothing")
@@ -0,0 +1,60 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+# vim:fenc=utf-8
+#
+# Copyright © 2020 Pi-Yueh Chuang <pychuang@pm.me>
+#
+# Distributed under terms of the BSD 3-Clause license.
+
+"""Tests of reading the brief information of documents."""
+import sqlite3
+import pandas
+import pytest
+from zoteroutils.database import Database
+from conftest import modify
+
+
+def _query(zotero_dir, sql, params=()):
+    """The rows returned by a statement against `zotero.sqlite` of a library."""
+    conn = sqlite3.connect(str(zotero_dir.joinpath("zotero.sqlite")))
+    rows = conn.execute(sql, params).fetchall()
+    conn.close()
+    return rows
+
+
+@pytest.mark.parametrize("mode", ["live", "snapshot", "immutable"])
+@pytest.mark.parametrize("output", ["path", "str", "explode"])
+@pytest.mark.parametrize("simplify", [True, False])
+def test_methods_equal(library, mode, output, simplify):
+    """All methods of get_docs return the same frame."""
+    with Database(library, mode=mode) as db:
+        expected = db.get_docs(method="join", attachment_output=output, simplify_author=simplify)
+        for method in ["single", "parallel"]:
+            pandas.testing.assert_frame_equal(
+                db.get_docs(method=method, attachment_output=output, simplify_author=simplify),
+                expected)
+
+    assert expected.index.dtype == "int64"
+    assert expected.index.notna().all()
+
+
+@pytest.mark.parametrize("method", ["join", "single", "parallel"])
+def test_author_order(scratch, method):
+    """Authors are listed in the order of `orderIndex`, not in the order they are stored."""
+    item_id = int(_query(
+        scratch, "SELECT itemID FROM itemCreators GROUP BY itemID HAVING COUNT(*) >= 3 LIMIT 1;"
+    )[0][0])
+
+    # reverse the order of the authors without moving the rows
+    modify(
+        scratch, "UPDATE itemCreators SET orderIndex = -1 - orderIndex WHERE itemID = ?;",
+        (item_id,))
+    expected = [row[0] for row in _query(
+        scratch,
+        "SELECT lastName FROM itemCreators INNER JOIN creators USING(creatorID) "
+        "WHERE itemID = ? ORDER BY orderIndex;", (item_id,))]
+
+    with Database(scratch) as db:
+        docs = db.get_docs(method=method, simplify_author=False)
+
+    assert docs.loc[item_id, "author"] == expected
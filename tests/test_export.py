@@ -0,0 +1,98 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+# vim:fenc=utf-8
+#
+# Copyright © 2020 Pi-Yueh Chuang <pychuang@pm.me>
+#
+# Distributed under terms of the BSD 3-Clause license.
+
+"""Tests of exporting to and loading from columnar files."""
+import json
+import pandas
+import pytest
+from zoteroutils import export
+from zoteroutils.database import Database
+from conftest import modify, touch
+
+pytest.importorskip("pyarrow")
+
+
+@pytest.mark.parametrize("format", ["feather", "parquet"])
+def test_round_trip(library, tmp_path, format):  # pylint: disable=redefined-builtin
+    """Loaded tables equal the tables read from the database."""
+    with Database(library) as db:
+        tables = db.load(tmp_path, format, fields=["DOI", "volume"], creators=True)
+
+        pandas.testing.assert_frame_equal(
+            tables.docs, db.get_docs(attachment_output="str", compact=True), check_dtype=False)
+        pandas.testing.assert_frame_equal(
+            tables.fields, db.get_fields(["DOI", "volume"]).astype("string"))
+        assert len(tables.creators) == len(db.engine.execute("SELECT * FROM itemCreators;").all())
+
+        arrow = db.load(tmp_path, format, fields=["DOI", "volume"], creators=True, arrow=True)
+        assert arrow.docs.num_rows == len(tables.docs)
+
+
+def test_rebuild(scratch, tmp_path):
+    """Files are exported again only when needed."""
+    exported = lambda db, **kwargs: _exported(db, tmp_path, **kwargs)  # noqa: E731
+
+    with Database(scratch) as db:
+        assert exported(db)
+        assert not exported(db)
+
+        # other options
+        assert exported(db, creators=True)
+
+        # a modified item
+        touch(scratch, 1)
+        assert exported(db, creators=True)
+
+        # a deleted table file
+        tmp_path.joinpath("docs.arrow").unlink()
+        assert exported(db, creators=True)
+        assert not exported(db, creators=True)
+
+
+def _manifest(directory):
+    """The manifest in a folder."""
+    return json.loads(directory.joinpath(export.MANIFEST).read_text())
+
+
+def _exported(db, directory, **kwargs):
+    """Whether loading exports the table "docs" again."""
+    with db.profile() as prof:
+        db.load(directory, **kwargs)
+    return any(event["name"] == "export.docs" for event in prof.events)
+
+
+def test_manifest(scratch):
+    """The manifest records the options and tables, and is written without leftovers."""
+    out = scratch.joinpath("export")
+    with Database(scratch) as db:
+        manifest = export.export(db, out, "parquet", fields=True)
+
+        assert json.loads(json.dumps(manifest)) == _manifest(out)
+        assert manifest["tables"] == ["docs", "fields"] and manifest["fields"] is True
+        assert sorted(path.name for path in out.iterdir()) == [
+            "docs.parquet", "fields.parquet", export.MANIFEST]
+        assert sorted(db.load(out, "parquet", fields=True).fields.columns) == sorted(
+            db.field2id)
+
+        with pytest.raises(ValueError):
+            db.load(out, "csv")
+
+
+def test_other_writes(scratch):
+    """Writes not touching items only refresh the manifest; a broken manifest exports again."""
+    out = scratch.joinpath("export")
+    with Database(scratch) as db:
+        assert _exported(db, out)
+
+        modify(scratch, "UPDATE version SET version = version + 1 WHERE schema = 'userdata';")
+        assert not _exported(db, out)
+        assert json.loads(json.dumps(export.state(db))) == {
+            key: _manifest(out)[key] for key in ["files", "items"]}
+
+        out.joinpath(export.MANIFEST).write_text("{\"files\": ")
+        assert _exported(db, out)
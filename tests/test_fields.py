@@ -0,0 +1,61 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+# vim:fenc=utf-8
+#
+# Copyright © 2020 Pi-Yueh Chuang <pychuang@pm.me>
+#
+# Distributed under terms of the BSD 3-Clause license.
+
+"""Tests of the wide field reader."""
+import sqlite3
+import pandas
+import pytest
+from zoteroutils.database import Database
+
+FIELDS = ["DOI", "volume", "pages", "title"]
+
+
+def _long(zotero_dir, field_ids):
+    """All values of the fields as a long dataframe, read row by row without the templates."""
+    conn = sqlite3.connect(str(zotero_dir.joinpath("zotero.sqlite")))
+    rows = conn.execute(
+        "SELECT itemID, fieldID, value FROM itemData INNER JOIN itemDataValues USING(valueID) "
+        "WHERE fieldID IN ({});".format(",".join(str(field_ids[f]) for f in FIELDS))).fetchall()
+    conn.close()
+    return pandas.DataFrame(rows, columns=["itemID", "fieldID", "value"])
+
+
+def test_values(library):
+    """Each cell holds the item's value of the field, and only items with any field are rows."""
+    with Database(library) as db:
+        fields = db.get_fields(FIELDS)
+        expected = _long(library, db.field2id)
+
+    assert fields.columns.tolist() == FIELDS
+    assert sorted(fields.index) == sorted(expected["itemID"].unique())
+    assert fields.notna().sum().sum() == len(expected)
+
+    for item_id, field_id, value in expected.sample(50, random_state=0).itertuples(index=False):
+        assert fields.loc[item_id, db.id2field[field_id]] == value
+
+    assert fields["DOI"].isna().any()  # not every document has a DOI
+
+
+def test_item_ids_and_categories(library):
+    """Subsets of itemIDs and categorical columns hold the same values."""
+    with Database(library) as db:
+        fields = db.get_fields(FIELDS)
+        ids = list(fields.index[::5])
+        subset = db.get_fields(FIELDS, ids, categories=["volume"])
+        everything = db.get_fields(["volume", "pages"], categories=True)
+
+    assert subset["volume"].dtype == "category" and subset["DOI"].dtype == object
+    pandas.testing.assert_frame_equal(subset.astype(object), fields.loc[ids].astype(object))
+    assert (everything.dtypes == "category").all()
+
+
+def test_unknown_field(library):
+    """Unknown field names are rejected."""
+    with Database(library) as db:
+        with pytest.raises(ValueError, match="noSuchField"):
+            db.get_fields(["DOI", "noSuchField"])
@@ -0,0 +1,72 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+# vim:fenc=utf-8
+#
+# Copyright © 2020 Pi-Yueh Chuang <pychuang@pm.me>
+#
+# Distributed under terms of the BSD 3-Clause license.
+
+"""Tests of per-query instrumentation and profiling."""
+import pytest
+import sqlalchemy
+from zoteroutils import instrument
+from zoteroutils.database import Database
+
+
+def test_profile(library):
+    """SQL statements and spans are recorded, with fetched rows and optional query plans."""
+    events = []
+    with Database(library) as db:
+        with db.profile(events.append, explain=True) as prof:
+            docs = db.get_docs(method="single")
+        db.get_docs(method="single")  # not recorded
+
+    assert events == prof.events
+    assert {"sql", "span"} == set(prof.report()["kind"])
+
+    query = [e for e in prof.events if e["name"] == "read.single_pass.query"]
+    assert len(query) == 1 and query[0]["rows"] == len(docs)
+
+    selects = [e for e in prof.events if e["kind"] == "sql" and "GROUP_CONCAT" in e["name"]]
+    assert selects and all(e["plan"] for e in selects)
+
+    summary = prof.summary()
+    assert summary["seconds"].is_monotonic_decreasing
+    assert summary.loc[("span", "read.single_pass.query"), "calls"] == 1
+
+
+def test_parallel_readers(library):
+    """Readers running on the thread pool are recorded by the profiler of the caller."""
+    with Database(library) as db:
+        with db.profile() as prof:
+            db.get_docs(method="parallel")
+
+    names = set(prof.report()["name"])
+    assert "database.join" in names
+    assert any(name.startswith("read.") for name in names if name != "database.join")
+
+
+def test_failed_statement(library):
+    """A statement that raises is neither recorded nor confused with the next statement."""
+    with Database(library) as db, db.engine.connect() as conn:
+        with instrument.Profiler() as prof:
+            with pytest.raises(sqlalchemy.exc.OperationalError):
+                conn.execute("SELECT * FROM no_such_table;")
+            conn.execute("SELECT 1;").fetchall()
+
+        assert [e["name"] for e in prof.events] == ["SELECT 1;"]
+        assert not conn.info.get("zoteroutils.profiler")
+
+
+def test_inactive():
+    """Spans do nothing without an active profiler."""
+    assert instrument.active() is None
+    with instrument.span("nothing") as stage:
+        stage.rows = 1
+
+    with instrument.Profiler() as prof:
+        assert instrument.active() is prof
+        with instrument.span("something") as stage:
+            stage.rows = 2
+    assert instrument.active() is None
+    assert [(e["name"], e["rows"]) for e in prof.events] == [("something", 2)]
@@ -0,0 +1,45 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+# vim:fenc=utf-8
+#
+# Copyright © 2020 Pi-Yueh Chuang <pychuang@pm.me>
+#
+# Distributed under terms of the BSD 3-Clause license.
+
+"""Tests of filtering items through the temporary table of itemIDs."""
+import pandas
+import pytest
+from zoteroutils import read
+from zoteroutils.database import Database
+
+
+@pytest.mark.parametrize("method", ["join", "single", "parallel"])
+def test_item_ids(library, method):
+    """Reading a subset of itemIDs equals selecting the subset from all documents."""
+    with Database(library) as db:
+        docs = db.get_docs(method=method)
+        ids = list(docs.index[::7])
+        pandas.testing.assert_frame_equal(db.get_docs(ids, method=method), docs.loc[ids])
+
+
+@pytest.mark.parametrize("method", ["join", "single"])
+def test_many_item_ids(library, method):
+    """More itemIDs than SQLite's limit of bound variables, as strings and with unknown ones."""
+    with Database(library) as db:
+        docs = db.get_docs(method=method)
+        ids = [str(i) for i in range(1, 200000)]
+        pandas.testing.assert_frame_equal(db.get_docs(ids, method=method), docs)
+
+
+def test_reload(library):
+    """The table follows new itemIDs on the same connection and is reused for the same ones."""
+    with Database(library) as db, db.engine.connect() as conn:
+        def count(ids):
+            subquery = read.load_item_ids(conn, ids)
+            return conn.execute("SELECT COUNT(*) FROM ({});".format(subquery)).fetchone()[0]
+
+        assert count([1, 2, 3]) == 3
+        assert conn.info["zoteroutils.item_ids"] == (1, 2, 3)
+        assert count(["1", "2", "3"]) == 3
+        assert count([4, 4, 5]) == 2
+        assert count([]) == 0
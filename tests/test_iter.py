@@ -0,0 +1,37 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+# vim:fenc=utf-8
+#
+# Copyright © 2020 Pi-Yueh Chuang <pychuang@pm.me>
+#
+# Distributed under terms of the BSD 3-Clause license.
+
+"""Tests of reading documents in chunks."""
+import pandas
+import pytest
+from zoteroutils import read
+from zoteroutils.database import Database
+
+
+@pytest.mark.parametrize("method", ["join", "single", "parallel"])
+def test_iter_docs(library, method):
+    """Chunks of iter_docs add up to get_docs."""
+    with Database(library) as db:
+        chunks = list(db.iter_docs(chunksize=64, method=method))
+        assert all(len(chunk) <= 64 for chunk in chunks)
+        pandas.testing.assert_frame_equal(
+            pandas.concat(chunks), db.get_docs(method=method).sort_index(kind="stable"))
+
+        for chunksize in [0, -1]:
+            with pytest.raises(ValueError):
+                next(db.iter_docs(chunksize=chunksize))
+
+
+def test_iter_doc_ids(library):
+    """Chunks of itemIDs are ascending, disjoint, and cover all documents."""
+    with Database(library) as db, db.engine.connect() as conn:
+        chunks = list(read.iter_doc_ids(conn, 100, **db.doctype2id))
+        docs = db.get_docs()
+
+    assert [len(chunk) for chunk in chunks[:-1]] == [100] * (len(chunks) - 1)
+    assert sum(chunks, []) == sorted(docs.index)
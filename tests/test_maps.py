@@ -0,0 +1,44 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+# vim:fenc=utf-8
+#
+# Copyright © 2020 Pi-Yueh Chuang <pychuang@pm.me>
+#
+# Distributed under terms of the BSD 3-Clause license.
+
+"""Tests of lazily loaded mappings and their cache file."""
+import json
+from zoteroutils.database import Database
+
+
+def test_lazy(scratch):
+    """Neither the engine nor the mappings are created before they are used."""
+    with Database(scratch) as db:
+        assert db._engine is None and db._maps is None  # pylint: disable=protected-access
+        assert db.field2id["title"] > 0
+        assert db._engine is None  # pylint: disable=protected-access
+
+
+def test_cache_file(scratch):
+    """The cache file is written atomically, reused, and rebuilt when it is broken."""
+    path = scratch.joinpath("zoteroutils-maps.json")
+
+    with Database(scratch) as db:
+        expected = dict(db.field2id)
+    assert not path.exists()
+
+    with Database(scratch, cache_maps=True) as db:
+        assert db.field2id == expected
+    assert list(scratch.glob("*.tmp")) == []
+
+    # a cache with the same key is used without reading the database
+    cache = json.loads(path.read_text())
+    cache["all_field_map"].append(["madeUpField", 9999])
+    path.write_text(json.dumps(cache))
+    with Database(scratch, cache_maps=True) as db:
+        assert db.field2id["madeUpField"] == 9999
+
+    path.write_text("{\"key\": ")
+    with Database(scratch, cache_maps=True) as db:
+        assert db.field2id == expected
+    assert json.loads(path.read_text())["key"] == cache["key"]
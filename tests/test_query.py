@@ -0,0 +1,65 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+# vim:fenc=utf-8
+#
+# Copyright © 2020 Pi-Yueh Chuang <pychuang@pm.me>
+#
+# Distributed under terms of the BSD 3-Clause license.
+
+"""Tests of compound queries over the persistent indices."""
+import pytest
+from zoteroutils.query import And, Not, Or, Term, parse
+from zoteroutils.database import Database
+
+
+@pytest.fixture
+def db(scratch):
+    """A Database of a copy of the library. The sidecar index is in the same folder."""
+    with Database(scratch) as database:
+        yield database
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("flow author:anne", And((Term("field", "flow"), Term("author", "anne")))),
+    ("a OR b c", Or((Term("field", "a"), And((Term("field", "b"), Term("field", "c")))))),
+    ("NOT title:review flow", And((Not(Term("title", "review")), Term("field", "flow")))),
+    ("http://example.com", Term("field", "http://example.com")),
+    ("fulltext:\"navier stokes\" (type:thesis OR type:book)", And((
+        Term("fulltext", "navier stokes"), Or((Term("type", "thesis"), Term("type", "book")))))),
+])
+def test_parse(text, expected):
+    """Adjacent terms are combined with AND, which binds tighter than OR."""
+    assert parse(text) == expected
+
+
+@pytest.mark.parametrize("text", ["(flow", "flow)", "flow AND", "\"flow"])
+def test_parse_errors(text):
+    """Malformed queries raise ValueError."""
+    with pytest.raises(ValueError):
+        parse(text)
+
+
+def test_query(db):
+    """Compound queries combine the results of single searches."""
+    fields = set(db.search_fields("flow")["itemID"])
+    authors = set(db.search_authors("anne")["itemID"])
+    docs = set(db.get_docs().index)
+
+    assert set(db.search("flow author:anne")["itemID"]) == fields & authors & docs
+    assert set(db.search("flow OR author:anne")["itemID"]) == (fields | authors) & docs
+    assert set(db.search("flow NOT author:anne")["itemID"]) == (fields - authors) & docs
+
+
+def test_title_whole_words(db):
+    """Title terms only match whole words of titles."""
+    titles = db.get_docs()["title"].str.lower()
+    expected = set(titles.index[titles.str.contains(r"\bflow\b")])
+    assert set(db.search("title:flow")["itemID"]) == expected
+
+
+def test_type(db):
+    """Type terms select documents by their item types, also as a parsed tree."""
+    docs = db.get_docs()
+    expected = set(docs.index[docs["document type"] == "journalArticle"])
+    assert set(db.search("type:journalArticle")["itemID"]) == expected
+    assert set(db.search(Term("type", "journalArticle"))["itemID"]) == expected
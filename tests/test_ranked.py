@@ -0,0 +1,61 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+# vim:fenc=utf-8
+#
+# Copyright © 2020 Pi-Yueh Chuang <pychuang@pm.me>
+#
+# Distributed under terms of the BSD 3-Clause license.
+
+"""Tests of BM25-ranked, paginated searches."""
+import pytest
+from zoteroutils.database import Database
+
+
+@pytest.fixture
+def db(scratch):
+    """A Database of a copy of the library. The sidecar index is in the same folder."""
+    with Database(scratch) as database:
+        yield database
+
+
+def test_ranked(db):
+    """Ranked pages are consecutive slices of the same ranking of the same items."""
+    found = db.search_ranked("flow", limit=1000)
+    assert sorted(found["itemID"]) == sorted(db.search_fields("flow")["itemID"])
+    assert found["score"].is_monotonic_decreasing
+
+    pages = [db.search_ranked("flow", limit=10, offset=10*i)["itemID"].tolist() for i in range(3)]
+    assert sum(pages, []) == found["itemID"].tolist()[:30]
+
+
+@pytest.mark.parametrize("target, name", [
+    ("authors", "search_authors"), ("full_texts", "search_full_texts")])
+def test_targets(db, target, name):
+    """Other targets rank the same items as the unranked searches, one row per item."""
+    key = "anne" if target == "authors" else "flow"
+    found = db.search_ranked(key, target=target, limit=10000)
+    assert found["itemID"].is_unique
+    assert sorted(found["itemID"]) == sorted(set(getattr(db, name)(key)["itemID"]))
+
+
+def test_item_ids(db):
+    """Limiting the candidates keeps the order of the remaining items."""
+    found = db.search_ranked("flow", limit=1000)["itemID"].tolist()
+    subset = found[::2]
+    assert db.search_ranked("flow", limit=1000, item_ids=subset)["itemID"].tolist() == subset
+
+
+@pytest.mark.parametrize("context", ["snippet", "highlight"])
+def test_context(db, context):
+    """Snippets and highlights mark the matched words."""
+    found = db.search_ranked("flow", limit=5, context=context)
+    assert len(found) == 5
+    assert found[context].str.lower().str.contains("[flow]", regex=False).all()
+
+
+def test_errors(db):
+    """Unknown targets and contexts are rejected."""
+    with pytest.raises(ValueError):
+        db.search_ranked("flow", target="titles")
+    with pytest.raises(ValueError):
+        db.search_ranked("flow", context="summary")
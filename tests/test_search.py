@@ -0,0 +1,79 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+# vim:fenc=utf-8
+#
+# Copyright © 2020 Pi-Yueh Chuang <pychuang@pm.me>
+#
+# Distributed under terms of the BSD 3-Clause license.
+
+"""Tests of the persistent search indices against the searches building temporary indices."""
+import threading
+import concurrent.futures
+import pytest
+from zoteroutils import index, search
+from zoteroutils.database import Database
+from conftest import modify, touch
+
+KEYS = ["flow", "navier stokes", "café", "boundary layer", "zzzzz"]
+
+
+@pytest.fixture
+def db(scratch):
+    """A Database of a library that tests may modify. The sidecar index is in the same folder."""
+    with Database(scratch) as database:
+        yield database
+
+
+def _old(database, name, keys, item_ids=None):
+    """The sorted itemIDs found by a search of `zoteroutils.search`."""
+    with database.engine.connect() as conn:
+        return sorted(set(getattr(search, name)(conn, keys, item_ids)["itemID"]))
+
+
+@pytest.mark.parametrize("name", ["search_fields", "search_authors", "search_full_texts"])
+@pytest.mark.parametrize("keys", KEYS)
+def test_index_matches_old_search(db, name, keys):
+    """The indexed searches find the same items as the old searches."""
+    assert sorted(set(getattr(db, name)(keys)["itemID"])) == _old(db, name, keys)
+
+
+@pytest.mark.parametrize("name", ["search_fields", "search_authors", "search_full_texts"])
+def test_item_ids(db, name):
+    """Searches limited to itemIDs equal the old searches limited to the same itemIDs."""
+    item_ids = list(range(1, 400, 3))
+    found = sorted(set(getattr(db, name)("flow", item_ids)["itemID"]))
+    assert found == _old(db, name, "flow", item_ids)
+
+
+def test_incremental_update(db, scratch):
+    """The index follows modifications of the database."""
+    assert db.search_fields("qwertyuiop").empty
+
+    modify(scratch, "INSERT INTO itemDataValues(value) VALUES ('qwertyuiop');")
+    modify(
+        scratch,
+        "UPDATE itemData SET valueID = (SELECT MAX(valueID) FROM itemDataValues) "
+        "WHERE itemID = 3 AND fieldID = ?;", (db.field2id["title"],))
+    touch(scratch, 3)
+
+    assert db.search_fields("qwertyuiop")["itemID"].tolist() == [3]
+    assert db.search("title:qwertyuiop")["itemID"].tolist() == [3]
+
+
+def test_concurrent_updates(db):
+    """Concurrent updates of a fresh index neither fail on the sidecar's lock nor rebuild twice."""
+    barrier = threading.Barrier(4)
+
+    def update(updater):
+        with db.engine.connect() as conn:
+            index.attach_index(conn, db.index)
+            barrier.wait()
+            return updater(conn)
+
+    for updater in [index.update_index, index.update_fulltext_index]:
+        barrier.reset()
+        with concurrent.futures.ThreadPoolExecutor(4) as executor:
+            counts = list(executor.map(update, [updater] * 4))
+        assert sorted(counts)[:3] == [0, 0, 0] and max(counts) > 0
+
+    assert sorted(set(db.search_fields("flow")["itemID"])) == _old(db, "search_fields", "flow")
@@ -0,0 +1,91 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+# vim:fenc=utf-8
+#
+# Copyright © 2020 Pi-Yueh Chuang <pychuang@pm.me>
+#
+# Distributed under terms of the BSD 3-Clause license.
+
+"""Tests of the storage scanner and its manifest."""
+import pytest
+from zoteroutils.database import Database
+
+
+def _stored(zotero_dir):
+    """The (key, file name) of the first three stored attachments of a library."""
+    with Database(zotero_dir) as database, database.engine.connect() as conn:
+        return conn.execute(
+            "SELECT key, SUBSTR(path, 9) FROM items INNER JOIN itemAttachments USING(itemID) "
+            "WHERE path LIKE 'storage:%' ORDER BY itemID LIMIT 3;").fetchall()
+
+
+@pytest.fixture
+def db(scratch):
+    """A Database whose storage folder has files of the attachments in `_stored`, the first two
+    identical, an orphaned file, and a cache file of Zotero."""
+    storage = scratch.joinpath("storage")
+
+    for (key, name), content in zip(_stored(scratch), [b"same", b"same", b"other"]):
+        storage.joinpath(key).mkdir(parents=True)
+        storage.joinpath(key, name).write_bytes(content)
+
+    storage.joinpath(_stored(scratch)[0][0], ".zotero-ft-cache").write_text("words")
+    storage.joinpath("ORPHAN00", "sub").mkdir(parents=True)
+    storage.joinpath("ORPHAN00", "sub", "file.pdf").write_bytes(b"orphan")
+
+    with Database(scratch) as database:
+        yield database
+
+
+def test_check(db):
+    """Missing, orphaned, and duplicate files are found."""
+    stored = _stored(db.storage.parent)
+    report = db.check_storage("sha1")
+
+    assert len(report.files) == 4
+    assert report.orphans[["key", "name"]].values.tolist() == [["ORPHAN00", "sub/file.pdf"]]
+    assert report.duplicates[["key", "name"]].values.tolist() == [list(x) for x in stored[:2]]
+    assert report.duplicates["attachmentID"].notna().all()
+
+    with db.engine.connect() as conn:
+        n_stored = conn.execute(
+            "SELECT COUNT(*) FROM itemAttachments WHERE path LIKE 'storage:%';").fetchone()[0]
+    assert len(report.missing) == n_stored - 3
+    assert not set(report.missing["key"]) & {key for key, _ in stored}
+
+
+def test_manifest(db):
+    """Later scans only hash new or modified files."""
+    stored = _stored(db.storage.parent)
+
+    def hashed(algorithm):
+        with db.profile() as prof:
+            report = db.check_storage(algorithm)
+        spans = prof.report().set_index("name")
+        return spans.loc["storage.hash", "rows"], report
+
+    assert hashed("sha1")[0] == 4
+    assert hashed("sha1")[0] == 0
+
+    assert hashed(None)[1].files["hash"].notna().all()  # recorded hashes are kept
+    assert hashed("md5")[0] == 4  # but not reused for another algorithm
+
+    key, name = stored[2]
+    db.storage.joinpath(key, name).write_bytes(b"modified")
+    count, report = hashed("md5")
+    assert count == 1
+    assert report.duplicates["key"].tolist() == [key for key, _ in stored[:2]]
+
+    db.storage.joinpath(key, name).write_bytes(b"same")
+    assert len(hashed("md5")[1].duplicates) == 3
+
+
+def test_no_storage(scratch):
+    """A library without a storage folder has no files, and all stored attachments are missing."""
+    with Database(scratch) as db:
+        report = db.check_storage()
+    assert report.files.empty and report.orphans.empty and report.duplicates.empty
+    assert len(report.missing) > 0
+
+    with pytest.raises(ValueError):
+        db.check_storage("no-such-algorithm")
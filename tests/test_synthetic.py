@@ -0,0 +1,47 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+# vim:fenc=utf-8
+#
+# Copyright © 2020 Pi-Yueh Chuang <pychuang@pm.me>
+#
+# Distributed under terms of the BSD 3-Clause license.
+
+"""Tests of the synthetic database generator."""
+import sqlite3
+import pytest
+from zoteroutils import synthetic
+from zoteroutils.database import Database
+
+
+def _dump(path):
+    """All rows of all tables of a SQLite file."""
+    conn = sqlite3.connect(str(path))
+    tables = conn.execute("SELECT name FROM sqlite_master WHERE type = 'table';").fetchall()
+    rows = {table: conn.execute("SELECT * FROM {};".format(table)).fetchall() for table, in tables}
+    conn.close()
+    return rows
+
+
+def test_deterministic(tmp_path):
+    """The same seed generates the same database, and different seeds different ones."""
+    first = _dump(synthetic.generate(tmp_path.joinpath("a"), 50, seed=3))
+    assert first == _dump(synthetic.generate(tmp_path.joinpath("b"), 50, seed=3))
+    assert first != _dump(synthetic.generate(tmp_path.joinpath("c"), 50, seed=4))
+
+
+def test_overwrite(tmp_path):
+    """An existing file is only replaced when asked to."""
+    path = synthetic.generate(tmp_path, 10)
+    with pytest.raises(FileExistsError):
+        synthetic.generate(tmp_path, 10)
+    assert synthetic.generate(tmp_path, 20, overwrite=True) == path
+
+
+def test_documents(library):
+    """The generated library has the requested number of documents, readable by Database."""
+    with Database(library) as db:
+        docs = db.get_docs()
+
+    assert docs.index.nunique() == 500
+    assert docs["title"].ne("").all()
+    assert docs["author"].ne("").all()
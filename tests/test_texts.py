@@ -0,0 +1,88 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+# vim:fenc=utf-8
+#
+# Copyright © 2020 Pi-Yueh Chuang <pychuang@pm.me>
+#
+# Distributed under terms of the BSD 3-Clause license.
+
+"""Tests of the positional index of .zotero-ft-cache files."""
+import pytest
+from zoteroutils.database import Database
+
+TEXTS = [
+    "The Navier–Stokes equations describe viscous flow.",
+    "Stokes flow, also named creeping flow, neglects inertia; Navier did not.",
+    "Vortex shedding behind a cylinder: the wake shows periodic shedding of a vortex.",
+    "Vortex rings are stable, and shedding is rare here.",
+]
+
+
+def _attachments(zotero_dir):
+    """The (itemID, parentItemID, key) of the first 12 attachments with parents of a library."""
+    with Database(zotero_dir) as database, database.engine.connect() as conn:
+        return conn.execute(
+            "SELECT itemID, parentItemID, key FROM items INNER JOIN itemAttachments "
+            "USING(itemID) WHERE parentItemID IS NOT NULL ORDER BY itemID LIMIT 12;").fetchall()
+
+
+@pytest.fixture
+def db(scratch):
+    """A Database of a library with cache files for the attachments in `_attachments` (more than
+    the number of files processed without a process pool), each holding one of `TEXTS`. Other
+    indices are up-to-date."""
+    for i, (_, _, key) in enumerate(_attachments(scratch)):
+        scratch.joinpath("storage", key).mkdir(parents=True)
+        scratch.joinpath("storage", key, ".zotero-ft-cache").write_text(
+            TEXTS[i % len(TEXTS)], encoding="utf-8")
+
+    with Database(scratch) as database:
+        database.update_index()
+        yield database
+
+
+def _found(db, keys, mode="all", **kwargs):
+    """The sorted attachmentIDs found by a search."""
+    return sorted(db.search_texts(keys, mode, **kwargs)["attachmentID"])
+
+
+def _with(db, *indices):
+    """The sorted attachmentIDs whose cache files hold one of the texts of `indices`."""
+    attachments = _attachments(db.storage.parent)
+    return sorted(att for i, (att, _, _) in enumerate(attachments) if i % len(TEXTS) in indices)
+
+
+def test_search(db):
+    """Phrase and proximity queries distinguish word orders and distances."""
+    attachments = _attachments(db.storage.parent)
+    assert db.update_index(texts=True) == 12
+
+    assert _found(db, "navier stokes") == _with(db, 0, 1)
+    assert _found(db, "navier stokes", "phrase") == _with(db, 0)
+    assert _found(db, "vortex shedding", "near", distance=0) == _with(db, 2)
+    assert _found(db, "vortex shedding", "near", distance=5) == _with(db, 2, 3)
+    assert _found(db, "") == []
+
+    parents = db.search_texts("navier stokes", "phrase")
+    assert set(parents["itemID"]) == {parent for _, parent, _ in attachments[0::4]}
+
+    subset = [attachments[0][1]]
+    assert _found(db, "navier", item_ids=subset) == [attachments[0][0]]
+
+    with pytest.raises(ValueError):
+        db.search_texts("navier", mode="regex")
+
+
+def test_incremental(db):
+    """Updates only process changed, new, and removed cache files."""
+    assert db.update_index(texts=True) == 12
+    assert db.update_index(texts=True) == 0
+
+    first, second = _attachments(db.storage.parent)[:2]
+    db.storage.joinpath(first[2], ".zotero-ft-cache").write_text("A different text entirely.")
+    db.storage.joinpath(second[2], ".zotero-ft-cache").unlink()
+    assert db.update_index(texts=True) == 2
+
+    assert first[0] not in _found(db, "navier stokes")
+    assert second[0] not in _found(db, "navier stokes")
+    assert _found(db, "different text", "phrase") == [first[0]]
@@ -0,0 +1,100 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+# vim:fenc=utf-8
+#
+# Copyright © 2020 Pi-Yueh Chuang <pychuang@pm.me>
+#
+# Distributed under terms of the BSD 3-Clause license.
+
+"""Tests of incrementally refreshed results of get_docs."""
+import pandas
+import pytest
+from zoteroutils import synthetic
+from zoteroutils.database import Database
+from conftest import modify, touch
+
+ATTACHMENT = synthetic.ITEM_TYPES.index("attachment") + 1
+
+
+def _check(db, tracker, output):
+    """The tracker equals reading all documents again."""
+    pandas.testing.assert_frame_equal(
+        tracker.docs, db.get_docs(attachment_output=output).sort_index(kind="stable"))
+
+
+def _retitle(db, scratch, item_id, title):
+    """Give a document a new title the way Zotero does."""
+    modify(scratch, "INSERT INTO itemDataValues(value) VALUES (?);", (title,))
+    modify(
+        scratch,
+        "UPDATE itemData SET valueID = (SELECT MAX(valueID) FROM itemDataValues) "
+        "WHERE itemID = ? AND fieldID = ?;", (item_id, db.field2id["title"]))
+    touch(scratch, item_id)
+
+
+@pytest.mark.parametrize("output", ["path", "str", "explode"])
+def test_refresh(scratch, output):
+    """Refreshes re-read exactly the edited documents, and nothing without edits."""
+    with Database(scratch) as db:
+        tracker = db.track_docs(attachment_output=output)
+        docs = tracker.docs
+        assert tracker.refresh() == 0
+        assert tracker.docs is docs
+
+        _retitle(db, scratch, 5, "A brand new title")
+        assert tracker.refresh() == 1
+        assert tracker.docs.loc[[5], "title"].tolist()[0] == "A brand new title"
+        _check(db, tracker, output)
+        assert tracker.refresh() == 0
+
+        # a new attachment adds a row in the "explode" output
+        parent = int(tracker.docs.index[tracker.docs["attachment path"] != ""][0])
+        modify(
+            scratch,
+            "INSERT INTO items(itemID, itemTypeID, libraryID, key, clientDateModified) "
+            "VALUES (200000, ?, 1, 'NEWATTCH', datetime('now', '+101 years'));", (ATTACHMENT,))
+        modify(
+            scratch, "INSERT INTO itemAttachments(itemID, parentItemID, linkMode, path) "
+            "VALUES (200000, ?, 1, 'storage:new.pdf');", (parent,))
+        assert tracker.refresh() == 1
+        _check(db, tracker, output)
+
+        # a new document
+        modify(
+            scratch, "INSERT INTO items(itemID, itemTypeID, libraryID, key) "
+            "VALUES (300000, ?, 1, 'NEWDOCMT');", (db.doctype2id["journalArticle"],))
+        assert tracker.refresh() == 1
+        assert tracker.docs.index[-1] == 300000
+        _check(db, tracker, output)
+
+
+def test_trash(scratch):
+    """Documents moved to the trash are re-read once, also in the same second as the mark."""
+    with Database(scratch) as db:
+        tracker = db.track_docs()
+        ids = [int(i) for i in tracker.docs.index[:2]]
+
+        modify(scratch, "INSERT INTO deletedItems VALUES (?, datetime('now', '+100 years'));",
+               (ids[0],))
+        assert tracker.refresh() == 1
+        assert tracker.refresh() == 0
+
+        # the same second as the new mark
+        modify(
+            scratch, "INSERT INTO deletedItems SELECT ?, MAX(dateDeleted) FROM deletedItems;",
+            (ids[1],))
+        assert tracker.refresh() == 2
+        assert tracker.refresh() == 0
+
+
+def test_purged(scratch):
+    """Purged items leave no trace, so all documents are read again."""
+    with Database(scratch) as db:
+        tracker = db.track_docs()
+        n_docs = len(tracker.docs)
+        item_id = int(tracker.docs.index[0])
+
+        modify(scratch, "DELETE FROM items WHERE itemID = ?;", (item_id,))
+        assert tracker.refresh() == n_docs - 1
+        assert item_id not in tracker.docs.index
+        _check(db, tracker, "path")
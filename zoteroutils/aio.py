@@ -0,0 +1,207 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+# vim:fenc=utf-8
+#
+# Copyright © 2020 Pi-Yueh Chuang <pychuang@pm.me>
+#
+# Distributed under terms of the BSD 3-Clause license.
+
+"""An asyncio counterpart of `Database`.
+
+Usage:
+
+    async with AsyncDatabase("~/Zotero") as adb:
+        docs = await adb.get_docs()
+        found = await adb.search_fields("flow")
+        found = await adb.run(zoteroutils.search.search_authors, "Anne")
+
+Queries run in a dedicated thread pool, so they do not block the event loop. Concurrent requests
+share the pool of warm connections of the underlying `Database`. Cancelling an awaiting task
+interrupts the SQLite statement it is running.
+"""
+import typing
+import asyncio
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from .database import Database
+
+
+class AsyncDatabase:
+    """An asyncio wrapper of `Database`.
+
+    Parameters
+    ----------
+    zotero_dir : str or path-like
+        The folder of Zotero data, i.e., where `zotero.sqlite` is.
+    max_concurrency : int
+        The number of threads, i.e., the maximum number of queries running at the same time.
+        Other requests wait in the queue of the thread pool.
+    **kwargs :
+        Other keyword arguments passed to `Database`, e.g., `mode="snapshot"` or `cache=True`.
+        Results are cached exactly as with `Database`.
+
+    Notes
+    -----
+    Cancellation of a task calls `interrupt()` of the SQLite connection used by the task, which
+    aborts the running statement. A task cancelled while waiting in the queue never runs. A task
+    cancelled during pandas' post-processing finishes in the background, and its results are
+    discarded.
+    """
+
+    def __init__(self, zotero_dir: str, max_concurrency: int = 4, **kwargs):
+        self._db: Database = Database(zotero_dir, **kwargs)
+        self._executor: ThreadPoolExecutor = ThreadPoolExecutor(
+            max_concurrency, "zoteroutils-aio")
+
+        # the engine and the mappings are loaded once, before any query
+        self._ready: bool = False
+        self._lock: typing.Optional[asyncio.Lock] = None
+
+    async def __aenter__(self):
+        await self._warm()
+        return self
+
+    async def __aexit__(self, *args):
+        self.close()
+
+    @property
+    def db(self) -> Database:
+        """The underlying (synchronous) `Database` instance."""
+        return self._db
+
+    def close(self):
+        """Shut down the thread pool and close the database (see `Database.close`).
+
+        Queries already running are not interrupted.
+        """
+        self._executor.shutdown(wait=False)
+        self._db.close()
+
+    async def _warm(self):
+        """Create the engine and load the mappings in the thread pool, once."""
+        if self._ready:
+            return
+
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+
+        async with self._lock:
+            if not self._ready:
+                loop = asyncio.get_running_loop()
+                await loop.run_in_executor(
+                    self._executor, lambda: (self._db.engine, self._db.doctype2id))
+                self._ready = True
+
+    async def run(self, func: typing.Callable, *args, **kwargs):
+        """Run a function taking a connection as the first argument in the thread pool.
+
+        For example, `await adb.run(zoteroutils.search.search_fields, "flow")`.
+
+        Parameters
+        ----------
+        func : callable
+            Called as `func(conn, *args, **kwargs)` with a `sqlalchemy.engine.Connection`.
+        *args, **kwargs :
+            Other arguments of `func`.
+
+        Returns
+        -------
+        The returned value of `func`.
+        """
+        await self._warm()
+
+        loop = asyncio.get_running_loop()
+        cancelled = threading.Event()
+        lock = threading.Lock()  # held while the task's connection is checked or changed
+        running = {}  # the DBAPI connection of this task, only while the task runs `func`
+
+        def task():
+            with self._db.engine.connect() as conn:
+                with lock:
+                    if cancelled.is_set():
+                        raise asyncio.CancelledError()
+                    running["dbapi"] = conn.connection
+                try:
+                    return func(conn, *args, **kwargs)
+                finally:
+                    # cleared before the connection goes back to the pool, where other tasks may
+                    # get it; the canceller never interrupts a connection after this point
+                    with lock:
+                        running.clear()
+
+        # copying the context lets a profiler active in the caller record the task
+        future = loop.run_in_executor(self._executor, contextvars.copy_context().run, task)
+
+        try:
+            return await future
+        except asyncio.CancelledError:
+            with lock:
+                cancelled.set()
+                dbapi = running.get("dbapi")
+                if dbapi is not None:
+                    dbapi.interrupt()
+            raise
+
+    async def _call(self, name: str, *args, **kwargs):
+        """Run the method `name` of `Database` in the thread pool, on the task's connection.
+
+        The method returns cached results, if caching is on, and shares the cache with the
+        underlying `Database`.
+        """
+        # pylint: disable=protected-access
+        return await self.run(self._db._lend, getattr(self._db, name), *args, **kwargs)
+
+    async def get_docs(
+        self, itemIDs=None, abs_attach_path=True, simplify_author=True, method="join",
+        attachment_output="path", compact=False
+    ):
+        """A pandas.Dataframe of all documents with brief information. See `Database.get_docs`.
+
+        With `method="parallel"`, the readers run in `Database.executor` rather than in this
+        instance's thread pool, and only the statement of the task's own connection is
+        interrupted on cancellation.
+        """
+        # pylint: disable=too-many-arguments
+        return await self._call(
+            "get_docs", itemIDs, abs_attach_path, simplify_author, method, attachment_output,
+            compact)
+
+    async def update_index(self, fulltext=True, creators=True, texts=False):
+        """Build or incrementally update the persistent search indices.
+
+        See `Database.update_index`.
+        """
+        return await self._call("update_index", fulltext, creators, texts)
+
+    async def search_fields(self, keys, item_ids=None):
+        """Search all fields with the persistent index. See `Database.search_fields`."""
+        return await self._call("search_fields", keys, item_ids)
+
+    async def search_authors(self, keys, item_ids=None):
+        """Search authors' names with the persistent index. See `Database.search_authors`."""
+        return await self._call("search_authors", keys, item_ids)
+
+    async def search_full_texts(self, keys, item_ids=None):
+        """Search attachments' full texts with the persistent index.
+
+        See `Database.search_full_texts`.
+        """
+        return await self._call("search_full_texts", keys, item_ids)
+
+    async def search_ranked(self, keys, target="fields", limit=20, offset=0, item_ids=None,
+                            context=None):
+        """One page of the best matches ranked by BM25. See `Database.search_ranked`."""
+        # pylint: disable=too-many-arguments
+        return await self._call("search_ranked", keys, target, limit, offset, item_ids, context)
+
+    async def search_creators(self, key, mode="fuzzy", limit=10, items=False):
+        """Search creators' names with the persistent trigram index.
+
+        See `Database.search_creators`.
+        """
+        return await self._call("search_creators", key, mode, limit, items)
+
+    async def search(self, query):
+        """Search documents with a compound query. See `Database.search`."""
+        return await self._call("search", query)
@@ -0,0 +1,142 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+# vim:fenc=utf-8
+#
+# Copyright © 2020 Pi-Yueh Chuang <pychuang@pm.me>
+#
+# Distributed under terms of the BSD 3-Clause license.
+
+"""Read documents of many Zotero data folders (profiles) with a process pool.
+
+Usage:
+
+    docs = get_docs(["/archive/alice/Zotero", "/archive/bob/Zotero"], max_workers=8)
+
+    for result in iter_docs({"alice": "/archive/alice/Zotero", "bob": "/archive/bob/Zotero"}):
+        if result.error is None:
+            save(result.profile, result.docs)
+"""
+import typing
+import pathlib
+import warnings
+import concurrent.futures
+import pandas
+
+_PathLike = typing.Union[str, pathlib.Path]
+_Profiles = typing.Union[typing.Sequence[_PathLike], typing.Mapping[str, _PathLike]]
+
+
+class ProfileResult(typing.NamedTuple):
+    """The outcome of one profile. Either `docs` or `error` is None."""
+    profile: str
+    docs: typing.Optional[pandas.DataFrame]
+    error: typing.Optional[BaseException]
+
+
+def _read_profile(zotero_dir: _PathLike, db_options: dict, kwargs: dict) -> pandas.DataFrame:
+    """Runs in worker processes: read one profile with `Database.get_docs`."""
+    from .database import Database  # pylint: disable=import-outside-toplevel
+    return Database(zotero_dir, persistent=False, **db_options).get_docs(**kwargs)
+
+
+def _normalize(zotero_dirs: _Profiles) -> typing.Dict[str, _PathLike]:
+    """Returns a dict of {profile name: folder}. Profile names of a list are the folders."""
+    if isinstance(zotero_dirs, typing.Mapping):
+        return dict(zotero_dirs)
+    return {str(path): path for path in zotero_dirs}
+
+
+def iter_docs(
+    zotero_dirs: _Profiles, max_workers: typing.Optional[int] = None,
+    db_options: typing.Optional[dict] = None, **kwargs
+) -> typing.Iterator[ProfileResult]:
+    """Read documents of many profiles on a process pool, yielding each profile when it finishes.
+
+    Errors are isolated: a failing profile yields a result with the exception, and other profiles
+    are not affected.
+
+    Parameters
+    ----------
+    zotero_dirs : list-like of str/path-like, or dict of {str: str/path-like}
+        The folders of Zotero data, i.e., where `zotero.sqlite` is. If a dict, the keys are the
+        names of the profiles. Otherwise, the folders as strings are the names.
+    max_workers : None or int
+        The number of worker processes. If None, use the number of CPUs.
+    db_options : None or dict
+        Keyword arguments passed to `Database`, e.g., `{"mode": "immutable"}`.
+    **kwargs :
+        Keyword arguments passed to `Database.get_docs`.
+
+    Yields
+    ------
+    ProfileResult
+        In the order of completion.
+    """
+    profiles = _normalize(zotero_dirs)
+    db_options = {} if db_options is None else db_options
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers) as executor:
+        futures = {
+            executor.submit(_read_profile, path, db_options, kwargs): name
+            for name, path in profiles.items()
+        }
+
+        for future in concurrent.futures.as_completed(futures):
+            try:
+                yield ProfileResult(futures[future], future.result(), None)
+            except Exception as err:  # pylint: disable=broad-except
+                yield ProfileResult(futures[future], None, err)
+
+
+def get_docs(
+    zotero_dirs: _Profiles, max_workers: typing.Optional[int] = None, errors: str = "raise",
+    db_options: typing.Optional[dict] = None, **kwargs
+) -> pandas.DataFrame:
+    """Read documents of many profiles on a process pool into one pandas.DataFrame.
+
+    Parameters
+    ----------
+    zotero_dirs, max_workers, db_options, **kwargs :
+        See `iter_docs`.
+    errors : str
+        What to do with failing profiles. One of "raise" (default), "warn", and "ignore". With
+        "raise", the first error (in the order of `zotero_dirs`) is raised after all profiles
+        finish. With "warn" and "ignore", failing profiles are left out of the results.
+
+    Returns
+    -------
+    pandas.DataFrame
+        The results of `Database.get_docs` of all profiles, in the order of `zotero_dirs`, with
+        an additional column "profile". The index is still `itemID`, which is only unique within
+        a profile.
+    """
+
+    if errors not in ["raise", "warn", "ignore"]:
+        raise ValueError("Unrecognized errors: {}".format(errors))
+
+    names = list(_normalize(zotero_dirs))
+    results = {result.profile: result for result in iter_docs(
+        zotero_dirs, max_workers, db_options, **kwargs)}
+
+    for name in names:
+        error = results[name].error
+
+        if error is None:
+            continue
+
+        if errors == "raise":
+            raise RuntimeError("Failed to read profile {}".format(name)) from error
+
+        if errors == "warn":
+            warnings.warn("Failed to read profile {}: {!r}".format(name, error), RuntimeWarning)
+
+    frames = [results[name].docs for name in names if results[name].error is None]
+
+    if not frames:
+        return pandas.DataFrame(columns=["profile"])
+
+    docs: pandas.DataFrame = pandas.concat(
+        frames, keys=[name for name in names if results[name].error is None], names=["profile"])
+    docs: pandas.DataFrame = docs.reset_index(level="profile")
+
+    return docs
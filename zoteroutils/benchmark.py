@@ -0,0 +1,191 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+# vim:fenc=utf-8
+#
+# Copyright © 2020 Pi-Yueh Chuang <pychuang@pm.me>
+#
+# Distributed under terms of the BSD 3-Clause license.
+
+"""Time and memory benchmarks of public functions against synthetic databases.
+
+Usage from the command line:
+
+    python -m zoteroutils.benchmark [--sizes 1000 10000 100000] [--workdir DIR] [--repeat 3]
+
+Synthetic databases are generated with `zoteroutils.synthetic` and kept in the working directory,
+so later runs with the same sizes skip the generation.
+"""
+import time
+import typing
+import pathlib
+import tempfile
+import tracemalloc
+import numpy
+import pandas
+from .database import Database
+from . import search
+
+# benchmark cases: a name and a function taking the Zotero data folder and a Database instance
+CASES: typing.List[typing.Tuple[str, typing.Callable[[pathlib.Path, Database], typing.Any]]] = [
+    ("Database + mappings", lambda path, db: Database(path, persistent=False).doctype2id),
+    ("get_docs (join)", lambda path, db: db.get_docs()),
+    ("get_docs (single)", lambda path, db: db.get_docs(method="single")),
+    ("get_docs (parallel)", lambda path, db: db.get_docs(method="parallel")),
+    ("get_docs (compact)", lambda path, db: db.get_docs(compact=True)),
+    (
+        "iter_docs (single, 5000)",
+        lambda path, db: sum(len(chunk) for chunk in db.iter_docs(5000, method="single"))
+    ),
+    ("search.search_fields", lambda path, db: _with_conn(db, search.search_fields, "flow")),
+    ("search.search_authors", lambda path, db: _with_conn(db, search.search_authors, "Anne")),
+    ("search.search_full_texts", lambda path, db: _with_conn(db, search.search_full_texts, "gpu")),
+    ("index build", lambda path, db: _build_index(path)),
+    ("Database.search_fields", lambda path, db: db.search_fields("flow")),
+    ("Database.search_authors", lambda path, db: db.search_authors("Anne")),
+    ("Database.search_full_texts", lambda path, db: db.search_full_texts("gpu")),
+]
+
+
+def _with_conn(db: Database, func: typing.Callable, *args):
+    """Call a function taking a connection as the first argument."""
+    with db.engine.connect() as conn:
+        return func(conn, *args)
+
+
+def _build_index(path: pathlib.Path):
+    """Build the sidecar index from scratch."""
+    db = Database(path, persistent=False)
+    if db.index.exists():
+        db.index.unlink()
+    return db.update_index()
+
+
+def measure(func: typing.Callable[[], typing.Any], repeat: int = 3) -> typing.Dict[str, float]:
+    """Time a function and trace its peak memory usage.
+
+    Timing and memory tracing are done in separate calls because tracing slows down execution.
+
+    Parameters
+    ----------
+    func : callable
+        A function taking no argument.
+    repeat : int
+        The number of timed calls.
+
+    Returns
+    -------
+    dict
+        The keys are "seconds" (the best of the timed calls) and "peak MB" (of Python objects).
+    """
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        func()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    return {"seconds": min(timings), "peak MB": peak / 1024**2}
+
+
+def run(
+    sizes: typing.Sequence[int] = (1000, 10000),
+    workdir: typing.Optional[typing.Union[str, pathlib.Path]] = None,
+    repeat: int = 3,
+    cases: typing.Optional[typing.Sequence[str]] = None,
+    verbose: bool = True
+) -> pandas.DataFrame:
+    """Run benchmark cases against synthetic databases of different sizes.
+
+    Parameters
+    ----------
+    sizes : list-like of int
+        The numbers of documents in the synthetic databases.
+    workdir : None, str, or path-like
+        Where to keep the synthetic databases. If None, use the system's temporary folder.
+    repeat : int
+        The number of timed calls of each case.
+    cases : None or list-like of str
+        The names of the cases in `CASES` to run. If None, run all.
+    verbose : bool
+        Whether to print the results of each case when it finishes.
+
+    Returns
+    -------
+    pandas.DataFrame
+        Columns: "case", "size", "seconds", and "peak MB".
+    """
+    from .synthetic import generate
+
+    workdir = pathlib.Path(tempfile.gettempdir() if workdir is None else workdir)
+    selected = [case for case in CASES if cases is None or case[0] in cases]
+
+    records = []
+    for size in sizes:
+        path = workdir.joinpath("zoteroutils-bench-{}".format(size))
+        if not path.joinpath("zotero.sqlite").exists():
+            generate(path, size)
+
+        db = Database(path)
+        for name, func in selected:
+            result = measure(lambda: func(path, db), repeat)  # pylint: disable=cell-var-from-loop
+            records.append(dict(case=name, size=size, **result))
+
+            if verbose:
+                print("{0:>30s} {1:>9d}: {2[seconds]:10.4f} s {2[peak MB]:10.2f} MB".format(
+                    name, size, result))
+
+    return pandas.DataFrame.from_records(records, columns=["case", "size", "seconds", "peak MB"])
+
+
+def scaling(results: pandas.DataFrame) -> pandas.DataFrame:
+    """Summarize results of `run` as scaling curves.
+
+    Parameters
+    ----------
+    results : pandas.DataFrame
+        The returned value of `run`.
+
+    Returns
+    -------
+    pandas.DataFrame
+        Rows are cases, and columns are the timings at each size plus "exponent", the slope of
+        log(seconds) versus log(size). An exponent of 1 means linear scaling.
+    """
+
+    curves = results.pivot(index="case", columns="size", values="seconds")
+
+    if curves.shape[1] > 1:
+        logs = numpy.log(curves.columns.to_numpy(dtype=float))
+        curves["exponent"] = [
+            numpy.polyfit(logs, numpy.log(numpy.maximum(row, 1e-9)), 1)[0]
+            for row in curves.to_numpy()
+        ]
+
+    return curves
+
+
+def main(argv: typing.Optional[typing.Sequence[str]] = None):
+    """The command-line entry point."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--workdir", default=None)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--cases", nargs="+", default=None)
+    args = parser.parse_args(argv)
+
+    results = run(args.sizes, args.workdir, args.repeat, args.cases)
+    with pandas.option_context("display.width", 200, "display.max_columns", 20):
+        print(scaling(results))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+# vim:fenc=utf-8
+#
+# Copyright © 2020 Pi-Yueh Chuang <pychuang@pm.me>
+#
+# Distributed under terms of the BSD 3-Clause license.
+
+"""An LRU cache of query results invalidated when the database changes.
+
+Usage:
+
+    db = Database("~/Zotero", cache=True)
+    db.search_fields("flow")  # runs the search
+    db.search_fields("flow")  # returns the cached results until zotero.sqlite changes
+    print(db.cache.stats())
+"""
+import os
+import sys
+import typing
+import threading
+import collections
+
+
+def file_stamp(*paths: typing.Union[str, os.PathLike]) -> tuple:
+    """Returns the modification times (in ns) and sizes of files; None for missing files.
+
+    Every commit to an SQLite database modifies the database file or, in WAL mode, the `-wal`
+    file, so the stamp of both changes whenever the database changes. Getting the stamp costs a
+    few microseconds and no connection.
+    """
+    stamps = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+            stamps.append((stat.st_mtime_ns, stat.st_size))
+        except FileNotFoundError:
+            stamps.append(None)
+    return tuple(stamps)
+
+
+def freeze(obj: typing.Any) -> typing.Hashable:
+    """Returns a hashable equivalent of an argument, e.g., a tuple for a list of itemIDs."""
+
+    if isinstance(obj, (str, bytes, int, float, bool, type(None))):
+        return obj
+
+    if isinstance(obj, dict):
+        return tuple(sorted((key, freeze(val)) for key, val in obj.items()))
+
+    if isinstance(obj, (set, frozenset)):
+        return ("set", tuple(sorted(freeze(val) for val in obj)))
+
+    if isinstance(obj, tuple) and not hasattr(obj, "_fields"):  # but not named tuples
+        return tuple(freeze(val) for val in obj)
+
+    if getattr(obj, "ndim", None) == 0 and hasattr(obj, "item"):  # numpy scalars
+        return obj.item()
+
+    if isinstance(obj, typing.Hashable) and not hasattr(obj, "__array__"):
+        return obj
+
+    return tuple(freeze(val) for val in obj)  # lists, numpy arrays, pandas objects, etc.
+
+
+def nbytes(obj: typing.Any) -> int:
+    """Returns the approximate memory usage of a result in bytes."""
+
+    if hasattr(obj, "memory_usage"):  # pandas.DataFrame or pandas.Series
+        usage = obj.memory_usage(index=True, deep=True)
+        return int(usage.sum() if hasattr(usage, "sum") else usage)
+
+    return sys.getsizeof(obj)
+
+
+class ResultCache:
+    """A thread-safe LRU cache of query results stamped with the state of the database.
+
+    An entry is only returned if it was stored with the same stamp as the lookup. Entries with a
+    different stamp are dropped when looked up.
+
+    Parameters
+    ----------
+    max_entries : int
+        The maximum number of entries. The least recently used entries are evicted first.
+    max_bytes : int
+        The maximum total size of results (see `nbytes`). A result larger than this is not cached.
+    copy : bool
+        Whether to return copies of cached pandas objects, so callers modifying the returned
+        objects do not modify the cache.
+    """
+
+    _counters = ["hits", "misses", "invalidations", "evictions"]
+
+    def __init__(self, max_entries: int = 128, max_bytes: int = 256*1024**2, copy: bool = True):
+        self.max_entries: int = max_entries
+        self.max_bytes: int = max_bytes
+        self.copy: bool = copy
+        self._entries: collections.OrderedDict = collections.OrderedDict()
+        self._bytes: int = 0
+        self._lock: threading.Lock = threading.Lock()
+        self._counts: collections.Counter = collections.Counter()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key: typing.Hashable, stamp: typing.Hashable,
+            compute: typing.Callable[[], typing.Any]) -> typing.Any:
+        """Returns the cached result of a key, or computes, caches, and returns it.
+
+        Parameters
+        ----------
+        key : hashable
+            Identifies the query, e.g., the function name and the frozen arguments (see `freeze`).
+        stamp : hashable
+            The current state of the database, e.g., from `file_stamp`.
+        compute : callable
+            Called without arguments to compute the result on a miss.
+        """
+
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is not None and entry[0] == stamp:
+                self._entries.move_to_end(key)
+                self._counts["hits"] += 1
+                return self._output(entry[1])
+
+            if entry is not None:
+                self._pop(key)
+                self._counts["invalidations"] += 1
+
+            self._counts["misses"] += 1
+
+        # computing outside the lock lets other queries proceed; concurrent misses of the same key
+        # both compute, and the later one is kept
+        result = compute()
+        size = nbytes(result)
+
+        with self._lock:
+            if size <= self.max_bytes:
+                if key in self._entries:
+                    self._pop(key)
+
+                self._entries[key] = (stamp, result, size)
+                self._bytes += size
+
+                while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                    self._pop(next(iter(self._entries)))
+                    self._counts["evictions"] += 1
+
+        return self._output(result)
+
+    def _pop(self, key: typing.Hashable):
+        """Remove an entry. The lock must be held."""
+        self._bytes -= self._entries.pop(key)[2]
+
+    def _output(self, result: typing.Any) -> typing.Any:
+        """The object returned to callers."""
+        return result.copy() if self.copy and hasattr(result, "copy") else result
+
+    def clear(self):
+        """Remove all entries. Statistics are kept."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> typing.Dict[str, int]:
+        """Returns a dict of "hits", "misses", "invalidations", "evictions", "entries", and "bytes".
+        """
+        with self._lock:
+            stats = {key: self._counts[key] for key in self._counters}
+            stats.update(entries=len(self._entries), bytes=self._bytes)
+        return stats
@@ -8,32 +8,274 @@
 
 """A class that represents the SQLite database."""
 
+# PRAGMAs applied to every new connection: a 64 MiB page cache, 256 MiB of memory-mapped I/O, and
+# temporary tables/indices in memory
+DEFAULT_PRAGMAS = {"cache_size": -65536, "mmap_size": 268435456, "temp_store": "MEMORY"}
+
 
 class Database:
-    """A class that represents a Zotero's SQLite database."""
+    """A class that represents a Zotero's SQLite database.
+
+    Parameters
+    ----------
+    zotero_dir : str or path-like
+        The folder of Zotero data, i.e., where `zotero.sqlite` is.
+    mode : str
+        How to open `zotero.sqlite`. One of "live" (default), "snapshot", and "immutable".
+        "live" opens the database directly. "snapshot" copies the database with SQLite's backup
+        API and runs all queries against the copy, which isolates queries from the running Zotero
+        client; use `refresh` to re-take the snapshot. "immutable" opens the database read-only
+        with `immutable=1`, i.e., without any locking; it is only safe when no other process
+        modifies the database.
+    snapshot_path : None, str, or path-like
+        Only used by the "snapshot" mode. If None (default), the snapshot is kept in memory.
+        Otherwise, the snapshot is written to this file, e.g., one on a tmpfs.
+    pragmas : None or dict
+        PRAGMAs applied to every new connection, e.g., `{"cache_size": -16384}`. They are merged
+        into and override `DEFAULT_PRAGMAS`. Note `{"query_only": 1}` also forbids temporary
+        tables, which are needed when filtering by itemIDs and by the search indices.
+    persistent : bool
+        If True (default), connections are returned to a pool and reused, so SQLite's page cache
+        and temporary tables survive across calls. The pool keeps up to `max_workers + 5` idle
+        connections; more connections are opened when more threads query at the same time, and
+        those are closed when returned. If False, every call opens a new connection.
+    cache_maps : bool
+        Whether to cache the mappings of item types, fields, and creator types in a JSON file next
+        to `zotero.sqlite`. The cache is keyed by Zotero's schema versions and is rebuilt when
+        they change.
+    max_workers : None or int
+        The number of threads used by `get_docs(method="parallel")`. If None (default), use the
+        number of readers behind `get_docs` (i.e., 7) or the number of CPUs, whichever is smaller.
+        In the "live" mode, the threads open `zotero.sqlite` read-only.
+    cache : bool or cache.ResultCache
+        Whether to cache the results of `get_docs` and the `search*` methods in memory. If True,
+        use a `cache.ResultCache` with default limits; a `ResultCache` can also be given (and
+        shared by multiple instances). Cached results are dropped when `zotero.sqlite` (or its
+        `-wal` file) is modified or, in the "snapshot" mode, when the snapshot is re-taken.
+
+    Notes
+    -----
+    Use `close` (or a `with` block) to shut down the thread pool and close pooled connections.
+    The instance can still be used afterward; they are created again when needed.
+
+    Nothing is read from the database when initializing an instance. The SQLAlchemy engine (and
+    hence the snapshot, if any) is created when first used, and the mappings are read with the
+    standard library's `sqlite3` when first accessed. So looking up the mappings does not import
+    SQLAlchemy or pandas.
+    """
     # pylint: disable=import-outside-toplevel, relative-beyond-top-level
+    # pylint: disable=too-many-instance-attributes
 
-    def __init__(self, zotero_dir: str):
+    def __init__(
+        self, zotero_dir: str, mode: str = "live", snapshot_path: str = None,
+        pragmas: dict = None, persistent: bool = True, cache_maps: bool = False,
+        max_workers: int = None, cache=False
+    ):
+        # pylint: disable=too-many-arguments
+        from os import cpu_count
         from pathlib import Path
-        from .read import get_item_types_mapping, get_field_names_mapping, get_creator_types_mapping
+        from uuid import uuid4
+        from threading import local
         from .dummy_dict import DummyDict
-        from sqlalchemy import create_engine
+
+        if mode not in ["live", "snapshot", "immutable"]:
+            raise ValueError("Unrecognized mode: {}".format(mode))
 
         # initialize information regarding paths
         self._paths: DummyDict = DummyDict()
         self._paths.dir: Path = Path(zotero_dir).expanduser().resolve()
         self._paths.db: Path = self._paths.dir.joinpath("zotero.sqlite")
         self._paths.storage: Path = self._paths.dir.joinpath("storage")
+        self._paths.index: Path = self._paths.dir.joinpath("zoteroutils-index.sqlite")
+        self._paths.maps: Path = self._paths.dir.joinpath("zoteroutils-maps.json")
+        self._paths.manifest: Path = self._paths.dir.joinpath("zoteroutils-storage.sqlite")
+        self._paths.snapshot = None if snapshot_path is None else Path(snapshot_path).resolve()
+
+        # the URI used by connections other than those of the live mode
+        if mode == "immutable":
+            self._uri: str = self._paths.db.as_uri() + "?mode=ro&immutable=1"
+        elif mode == "snapshot" and self._paths.snapshot is None:
+            self._uri: str = "file:zoteroutils-{}?mode=memory&cache=shared".format(uuid4().hex)
+        elif mode == "snapshot":
+            self._uri: str = self._paths.snapshot.as_uri()
+        else:
+            self._uri: str = self._paths.db.as_uri() + "?mode=ro"
+
+        # engine; in snapshot mode, self._snapshot is the connection holding the snapshot
+        self._mode: str = mode
+        self._snapshot = None
+        self._pragmas: dict = dict(DEFAULT_PRAGMAS, **(pragmas if pragmas is not None else {}))
+        self._persistent: bool = persistent
+        self._engine = None
+        self._readonly_engine = None  # live mode only: the engine of the parallel readers
+        self._borrowed = local()  # the connection lent to the thread by an AsyncDatabase task
+
+        # the thread pool of the parallel get_docs; created when first used
+        self._max_workers: int = min(7, cpu_count() or 1) if max_workers is None else max_workers
+        self._executor = None
+
+        # frequently used mappings; loaded when first used
+        self._cache_maps: bool = cache_maps
+        self._maps = None
+
+        # the cache of query results; in snapshot mode, results are stamped with a unique ID of
+        # the snapshot, so instances sharing a cache never see each other's snapshots
+        if cache is True:
+            from .cache import ResultCache
+            cache = ResultCache()
+        self._cache = cache if cache is not False else None
+        self._snapshot_id = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        """Shut down the thread pool, close pooled connections, and release the snapshot.
+
+        Connections in use by other threads are closed when they are returned.
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+        for engine in [self._engine, self._readonly_engine]:
+            if engine is not None:
+                engine.dispose()
+
+        self._engine = self._readonly_engine = None
+
+        if self._snapshot is not None:
+            self._snapshot.close()
+            self._snapshot = None
+
+    def _create_engine(self, readonly=False):
+        """Create the sqlalchemy.engine.Engine based on the mode.
+
+        In the "live" mode, `readonly=True` opens connections with `mode=ro`. Connections of other
+        modes never write to `zotero.sqlite` anyway.
+        """
+        import sqlite3
+        from sqlalchemy import create_engine, event
+        from sqlalchemy.pool import NullPool, QueuePool
+        from . import instrument
+
+        # idle connections kept for the parallel readers plus a few callers' threads; the pool
+        # never blocks and never closes a connection in use
+        kwargs = {"poolclass": NullPool}
+        if self._persistent:
+            kwargs = {
+                "poolclass": QueuePool, "pool_size": self._max_workers + 5, "max_overflow": -1}
+
+        if self._mode == "live" and not readonly:
+            engine = create_engine(
+                "sqlite:///"+str(self._paths.db), connect_args={"check_same_thread": False},
+                **kwargs)
+        else:
+            self._connect_raw().close()  # takes the snapshot if not yet (in the snapshot mode)
+            uri = self._uri
+            engine = create_engine(
+                "sqlite://",
+                creator=lambda: sqlite3.connect(uri, uri=True, check_same_thread=False), **kwargs)
+
+        pragmas = ["PRAGMA {0}={1};".format(key, val) for key, val in self._pragmas.items()]
+
+        @event.listens_for(engine, "connect")
+        def apply_pragmas(dbapi_conn, conn_record):  # pylint: disable=unused-argument
+            for pragma in pragmas:
+                dbapi_conn.execute(pragma)
+
+        instrument.install(engine)
+        return engine
+
+    def _connect_raw(self):
+        """Returns a plain read-only sqlite3.Connection to the database (or the snapshot)."""
+        import sqlite3
+
+        if self._mode == "snapshot" and self._snapshot is None:
+            self._snapshot = sqlite3.connect(self._uri, uri=True, check_same_thread=False)
+            self._take_snapshot()
+
+        return sqlite3.connect(self._uri, uri=True)
+
+    def _take_snapshot(self):
+        """Copy the live database to the snapshot with SQLite's backup API."""
+        import sqlite3
+        from contextlib import closing
+        from uuid import uuid4
 
-        # engine
-        self._engine = create_engine("sqlite:///"+str(self._paths.db))
+        with closing(sqlite3.connect(self._paths.db.as_uri()+"?mode=ro", uri=True)) as source:
+            source.backup(self._snapshot)
+
+        self._snapshot_id = uuid4().hex
+
+    def _load_maps(self):
+        """Read frequently used mappings from the database or from the cache file."""
+        import os
+        import json
+        import threading
+        from contextlib import closing
+        from .misc import queries
+        from .dummy_dict import DummyDict
+
+        with closing(self._connect_raw()) as conn:
+            key, cache = None, {}
+
+            if self._cache_maps:
+                key = json.dumps(conn.execute(queries.schema_versions).fetchall())
+                try:
+                    with open(self._paths.maps, "r") as fobj:
+                        cache = json.load(fobj)
+                except (OSError, ValueError):
+                    pass
+
+            if key is None or cache.get("key") != key:
+                cache = {"key": key}
+                for name in ["all_type_map", "all_field_map", "all_creator_type_map"]:
+                    cache[name] = conn.execute(queries[name]).fetchall()
+
+                if self._cache_maps:  # atomically, so concurrent readers never see a partial file
+                    temp = self._paths.maps.with_name("{}.{}-{}.tmp".format(
+                        self._paths.maps.name, os.getpid(), threading.get_ident()))
+                    with open(temp, "w") as fobj:
+                        json.dump(cache, fobj)
+                    os.replace(temp, self._paths.maps)
 
-        # frequently used mappings
         self._maps = DummyDict()
-        with self._engine.connect() as conn:
-            self._maps.doctype2id, self._maps.id2doctype = get_item_types_mapping(conn)
-            self._maps.field2id, self._maps.id2field = get_field_names_mapping(conn)
-            self._maps.creatortype2id, self._maps.id2creatortype = get_creator_types_mapping(conn)
+        self._maps.doctype2id = {name: i for name, i in cache["all_type_map"]}
+        self._maps.id2doctype = {i: name for name, i in cache["all_type_map"]}
+        self._maps.field2id = {name: i for name, i in cache["all_field_map"]}
+        self._maps.id2field = {i: name for name, i in cache["all_field_map"]}
+        self._maps.creatortype2id = {name: i for name, i in cache["all_creator_type_map"]}
+        self._maps.id2creatortype = {i: name for name, i in cache["all_creator_type_map"]}
+
+        return self._maps
+
+    def refresh(self):
+        """Discard pooled connections, re-take the snapshot if any, and reload mappings.
+
+        In "live" and "immutable" modes, this only makes later queries use fresh connections.
+        """
+        for engine in [self._engine, self._readonly_engine]:
+            if engine is not None:
+                engine.dispose()
+
+        if self._snapshot is not None:
+            self._take_snapshot()
+
+        self._maps = None
+
+    @property
+    def pragmas(self):
+        """A dict of the PRAGMAs applied to every new connection."""
+        return dict(self._pragmas)
+
+    @property
+    def mode(self):
+        """How the database is opened: "live", "snapshot", or "immutable"."""
+        return self._mode
 
     @property
     def db(self):  # pylint: disable=invalid-name
@@ -50,42 +292,127 @@ class Database:
         """The path to the folder of attachments."""
         return self._paths.storage
 
+    @property
+    def index(self):
+        """The path to the sidecar database holding persistent search indices."""
+        return self._paths.index
+
+    @property
+    def manifest(self):
+        """The path to the manifest of files in the storage folder. See `check_storage`."""
+        return self._paths.manifest
+
     @property
     def engine(self):
         """The underlying sqlalchemy.engine.Engine."""
+        if self._engine is None:
+            self._engine = self._create_engine()
         return self._engine
 
+    def _connect(self):
+        """A new connection of `engine`, or the connection lent to this thread (see `_lend`).
+
+        The lent connection is not closed when the `with` block exits.
+        """
+        conn = getattr(self._borrowed, "conn", None)
+        if conn is None:
+            return self.engine.connect()
+
+        from contextlib import nullcontext
+        return nullcontext(conn)
+
+    def _lend(self, conn, func, *args, **kwargs):
+        """Call `func(*args, **kwargs)` with `conn` used by all `_connect()` in this thread."""
+        self._borrowed.conn = conn
+        try:
+            return func(*args, **kwargs)
+        finally:
+            self._borrowed.conn = None
+
+    @property
+    def _readonly(self):
+        """The engine of the parallel readers: `engine` except in the "live" mode."""
+        if self._mode != "live":
+            return self.engine
+        if self._readonly_engine is None:
+            self._readonly_engine = self._create_engine(readonly=True)
+        return self._readonly_engine
+
+    @property
+    def cache(self):
+        """The cache.ResultCache of query results, or None if caching is disabled."""
+        return self._cache
+
+    def _stamp(self):
+        """The state of the database that cached results depend on."""
+        if self._mode == "snapshot":
+            if self._snapshot is None:
+                self._connect_raw().close()  # takes the snapshot
+            return ("snapshot", self._snapshot_id)
+
+        from .cache import file_stamp
+        return file_stamp(self._paths.db, str(self._paths.db)+"-wal")
+
+    def _cached(self, name, compute, *args):
+        """Returns `compute()`, or its cached result keyed by `name` and `args` if caching is on."""
+        if self._cache is None:
+            return compute()
+
+        from .cache import freeze
+        key = (str(self._paths.db), name, freeze(args))
+        return self._cache.get(key, self._stamp(), compute)
+
+    @property
+    def executor(self):
+        """The concurrent.futures.ThreadPoolExecutor running the parallel readers of `get_docs`.
+
+        The threads live as long as this instance, and with `persistent=True` they reuse the warm
+        connections of the engine's pool.
+        """
+        if self._executor is None:
+            from concurrent.futures import ThreadPoolExecutor
+            self._executor = ThreadPoolExecutor(self._max_workers, "zoteroutils")
+        return self._executor
+
+    @property
+    def _mappings(self):
+        """The DummyDict holding frequently used mappings. Loaded when first used."""
+        return self._maps if self._maps is not None else self._load_maps()
+
     @property
     def doctype2id(self):
         """A dict of (str, int) of the mapping between document type names -> type id."""
-        return self._maps.doctype2id
+        return self._mappings.doctype2id
 
     @property
     def id2doctype(self):
         """A dict of (int, str) of the mapping between document type id -> type name."""
-        return self._maps.id2doctype
+        return self._mappings.id2doctype
 
     @property
     def field2id(self):
         """A dict of (str, int) of the mapping between document field names -> field id."""
-        return self._maps.field2id
+        return self._mappings.field2id
 
     @property
     def id2field(self):
         """A dict of (int, str) of the mapping between document field id -> field name."""
-        return self._maps.id2field
+        return self._mappings.id2field
 
     @property
     def creatortype2id(self):
         """A dict of (str, int) of the mapping between creator type names -> integer id."""
-        return self._maps.creatortype2id
+        return self._mappings.creatortype2id
 
     @property
     def id2creatortype(self):
         """A dict of (int, str) of the mapping between creator type id -> string name."""
-        return self._maps.id2creatortype
+        return self._mappings.id2creatortype
 
-    def get_docs(self, itemIDs=None, abs_attach_path=True, simplify_author=True):
+    def get_docs(
+        self, itemIDs=None, abs_attach_path=True, simplify_author=True, method="join",
+        attachment_output="path", compact=False
+    ):
         """A pandas.Dataframe of all documents with brief information.
 
         Parameters
@@ -93,34 +420,496 @@ class Database:
         abs_attach_path : bool
             Whether to use absolute paths for attachment paths. If false, the paths are relative
             to the Zotero data directory.
+        attachment_output : str
+            One of "path" (default), "str", and "explode". See `read.get_doc_attachments`. With
+            "explode", a document with multiple attachments occupies multiple rows.
+        method : str
+            One of "join" (default), "single", and "parallel". "join" runs one query per column
+            and joins the results in pandas. "single" fetches the whole table with one SQL
+            statement, which scans `items` only once and is usually faster for large libraries.
+            "parallel" is "join" with each query running on its own connection in `executor`;
+            SQLite and pandas release the GIL for most of the work, so this is usually the
+            fastest on multi-core hosts. Readers never block each other in "snapshot" (with a
+            `snapshot_path`) and "immutable" modes. In-memory snapshots use SQLite's shared cache,
+            which serializes some of the reading.
+        compact : bool
+            Whether to use memory-compact dtypes (categoricals, Arrow-backed strings, integer
+            years, and datetime64), with missing values instead of empty strings. See
+            `process.compact_docs`, and `process.memory_report` to compare the two modes.
 
         Returns
         -------
         pandas.DataFrame
             A dataframe containing all items (except items with itemTypes of note and attachment).
         """
+        # pylint: disable=too-many-arguments
+        from .process import compact_docs
+
+        def compute():
+            with self._connect() as conn:
+                results = self._read_docs(
+                    conn, itemIDs, abs_attach_path, simplify_author, method, attachment_output)
+            return compact_docs(results) if compact else results
+
+        return self._cached(
+            "get_docs", compute, itemIDs, abs_attach_path, simplify_author, method,
+            attachment_output, compact)
+
+    def iter_docs(
+        self, chunksize=10000, abs_attach_path=True, simplify_author=True, method="join",
+        attachment_output="path"
+    ):
+        """Iterate through all documents in chunks of brief information ordered by itemIDs.
+
+        Each chunk is read with the itemIDs of that chunk only, so the peak memory usage is bounded
+        by the chunk size rather than the library size. A connection is held open until the
+        iteration finishes or the generator is closed.
+
+        Parameters
+        ----------
+        chunksize : int
+            The maximum number of documents in each chunk. Must be positive.
+        abs_attach_path, simplify_author, method, attachment_output :
+            See `get_docs`.
+
+        Yields
+        ------
+        pandas.DataFrame
+            Same as the results of `get_docs` with the itemIDs of a chunk.
+        """
         from . import read
-        from . import process
-        with self._engine.connect() as conn:
-            types = read.get_doc_types(conn, itemIDs=itemIDs, **self.doctype2id)
-            titles = read.get_doc_titles(conn, itemIDs=itemIDs, **self.doctype2id, **self.field2id)
-            pubs = read.get_doc_publications(
-                conn, itemIDs=itemIDs, **self.doctype2id, **self.field2id)
-            years = read.get_doc_years(
-                conn, itemIDs=itemIDs, **self.doctype2id, **self.field2id)
-            added = read.get_doc_added_dates(
-                conn, itemIDs=itemIDs, **self.doctype2id, **self.field2id)
-            authors = read.get_doc_authors(
-                conn, itemIDs=itemIDs, **self.doctype2id, **self.creatortype2id)
-
-            if abs_attach_path:
-                atts = read.get_doc_attachments(
-                    conn, itemIDs=itemIDs, prefix=self.storage, **self.doctype2id)
-            else:
-                atts = read.get_doc_attachments(conn, itemIDs=itemIDs, **self.doctype2id)
-
-        results = authors.join([types, titles, pubs, years, added, atts], None, "outer").fillna("")
-
-        if simplify_author:
-            results["author"] = results["author"].map(process.authors_agg)
+
+        with self.engine.connect() as conn:
+            for itemIDs in read.iter_doc_ids(conn, chunksize, **self.doctype2id):
+                yield self._read_docs(
+                    conn, itemIDs, abs_attach_path, simplify_author, method, attachment_output)
+
+    def get_fields(self, fields, itemIDs=None, categories=False):
+        """A pandas.DataFrame of arbitrary fields of items, one column per field.
+
+        Parameters
+        ----------
+        fields : list-like of str
+            The names of the fields (see `field2id`), e.g., `["DOI", "volume", "pages"]`.
+        itemIDs : list-like of str/int or None
+            The itemID of interest. If None, consider all items.
+        categories : bool or list-like of str
+            The fields converted to the categorical dtype. If True, all fields.
+
+        Returns
+        -------
+        pandas.DataFrame
+            See `read.get_item_fields`.
+        """
+        from . import read
+
+        def compute():
+            with self._connect() as conn:
+                return read.get_item_fields(conn, fields, itemIDs, categories, **self.field2id)
+
+        return self._cached("get_fields", compute, fields, itemIDs, categories)
+
+    def export(self, directory, format="feather", fields=None, creators=False):
+        """Write the documents (and optionally fields and creators) to columnar files.
+
+        Parameters
+        ----------
+        directory : str or path-like
+            The folder of the files.
+        format : str
+            "feather" (default; Arrow IPC) or "parquet".
+        fields : None, True, or list-like of str
+            The fields also exported as the table "fields". True for all fields.
+        creators : bool
+            Whether to also export the table "creators".
+
+        Returns
+        -------
+        dict
+            The manifest. See `export.export`.
+        """
+        # pylint: disable=redefined-builtin
+        from . import export
+        return export.export(self, directory, format, fields, creators)
+
+    def load(self, directory, format="feather", fields=None, creators=False, arrow=False):
+        """Load the tables exported by `export`, exporting them again if the library changed.
+
+        Parameters
+        ----------
+        directory, format, fields, creators :
+            See `export`.
+        arrow : bool
+            Whether to return memory-mapped `pyarrow.Table`s rather than `pandas.DataFrame`s.
+
+        Returns
+        -------
+        DummyDict
+            The tables "docs", and "fields" and "creators" if requested.
+        """
+        # pylint: disable=redefined-builtin, too-many-arguments
+        from . import export
+        return export.load(self, directory, format, fields, creators, arrow)
+
+    def track_docs(
+        self, abs_attach_path=True, simplify_author=True, method="join", attachment_output="path"
+    ):
+        """Returns a tracker of `get_docs` results that re-reads only changed documents.
+
+        Parameters
+        ----------
+        abs_attach_path, simplify_author, method, attachment_output :
+            See `get_docs`.
+
+        Returns
+        -------
+        tracking.DocsTracker
+            Use its `docs` for the results and `refresh()` to bring them up-to-date.
+        """
+        from .tracking import DocsTracker
+        return DocsTracker(
+            self, abs_attach_path=abs_attach_path, simplify_author=simplify_author, method=method,
+            attachment_output=attachment_output)
+
+    def _read_docs(
+        self, conn, itemIDs, abs_attach_path, simplify_author, method, attachment_output
+    ):
+        """Underlying implementation of `get_docs` with an opened connection."""
+        # pylint: disable=too-many-arguments
+        from . import read, instrument
+
+        if method == "single":
+            return read.get_docs_single_pass(
+                conn, prefix=self.storage if abs_attach_path else "", itemIDs=itemIDs,
+                output=attachment_output, author_output="short" if simplify_author else "list",
+                **self.doctype2id, **self.field2id, **self.creatortype2id)
+
+        readers = self._readers(itemIDs, abs_attach_path, simplify_author, attachment_output)
+
+        if method == "join":
+            frames = [func(conn, **kwargs) for func, kwargs in readers]
+        elif method == "parallel":
+            frames = self._read_parallel(readers)
+        else:
+            raise ValueError("Unrecognized method: {}".format(method))
+
+        authors, types, titles, pubs, years, added, atts = frames
+
+        with instrument.span("database.join"):
+            results = authors.join(
+                [types, titles, pubs, years, added, atts], None, "outer").fillna("")
         return results
+
+    def _readers(self, itemIDs, abs_attach_path, simplify_author, attachment_output):
+        """The independent readers behind `get_docs`: a list of (function, keyword arguments).
+
+        Each function takes a connection as the first argument.
+        """
+        from . import read
+
+        itemIDs = None if itemIDs is None else list(itemIDs)
+        fields = dict(itemIDs=itemIDs, **self.doctype2id, **self.field2id)
+        prefix = {"prefix": self.storage} if abs_attach_path else {}
+
+        return [
+            (read.get_doc_authors, dict(
+                itemIDs=itemIDs, output="short" if simplify_author else "list",
+                **self.doctype2id, **self.creatortype2id)),
+            (read.get_doc_types, dict(itemIDs=itemIDs, **self.doctype2id)),
+            (read.get_doc_titles, fields),
+            (read.get_doc_publications, fields),
+            (read.get_doc_years, fields),
+            (read.get_doc_added_dates, fields),
+            (read.get_doc_attachments, dict(
+                itemIDs=itemIDs, output=attachment_output, **prefix, **self.doctype2id)),
+        ]
+
+    def _read_parallel(self, readers):
+        """Run readers in `executor`, each with its own read-only connection from the pool."""
+        import contextvars
+
+        engine = self._readonly  # creates the engine (and the snapshot) in the caller's thread
+
+        def task(func, kwargs):
+            with engine.connect() as conn:
+                return func(conn, **kwargs)
+
+        # copying the context lets a profiler active in the caller record the readers
+        futures = [
+            self.executor.submit(contextvars.copy_context().run, task, func, kwargs)
+            for func, kwargs in readers
+        ]
+        return [future.result() for future in futures]
+
+    def profile(self, callback=None, explain=False):
+        """A context manager recording timings of SQL statements and post-processing stages.
+
+        Parameters
+        ----------
+        callback : None or callable
+            Called with each finished event (a dict). See `instrument.Profiler`.
+        explain : bool
+            Whether to capture `EXPLAIN QUERY PLAN` of SELECT statements.
+
+        Returns
+        -------
+        instrument.Profiler
+            Use `report()` or `summary()` of the profiler after the `with` block.
+
+        Examples
+        --------
+        >>> with db.profile() as prof:
+        ...     docs = db.get_docs()
+        >>> prof.summary()
+        """
+        from . import instrument
+        return instrument.Profiler(callback, explain)
+
+    def update_index(self, fulltext=True, creators=True, texts=False):
+        """Build or incrementally update the persistent search indices in the sidecar database.
+
+        Parameters
+        ----------
+        fulltext : bool
+            Whether to also update the index of attachments' full texts.
+        creators : bool
+            Whether to also update the trigram index of creators' names used by `search_creators`.
+        texts : bool
+            Whether to also update the positional index of the texts extracted from attachments
+            used by `search_texts`. It reads the cache files in the storage folder, so it is off
+            by default.
+
+        Returns
+        -------
+        int
+            The number of items (and attachments and creators) re-indexed or removed. Zero if the
+            indices are up-to-date.
+        """
+        from . import index
+        with self._connect() as conn:
+            index.attach_index(conn, self.index)
+            count = index.update_index(conn)
+            if fulltext:
+                count += index.update_fulltext_index(conn)
+            if creators:
+                count += index.update_creator_index(conn)
+            if texts:
+                from .texts import update_text_index
+                count += update_text_index(conn, self.storage, self._max_workers)
+        return count
+
+    def check_storage(self, algorithm=None, max_workers=None):
+        """Scan the storage folder and find missing, orphaned, and duplicate attachment files.
+
+        Sizes, modification times, and hashes are kept in the manifest (see `manifest`), so later
+        calls only hash new or modified files.
+
+        Parameters
+        ----------
+        algorithm : None or str
+            A hash algorithm of `hashlib`, e.g., "sha1". Required to find duplicates. If None,
+            files are only stat-ed.
+        max_workers : None or int
+            The number of threads scanning and hashing files.
+
+        Returns
+        -------
+        storage.StorageReport
+            The data frames `files`, `missing`, `orphans`, and `duplicates`. See `storage.check`.
+        """
+        from . import storage
+
+        files = storage.scan(self._paths.storage, self._paths.manifest, algorithm, max_workers)
+
+        with self._connect() as conn:
+            attachments = storage.get_attachment_files(conn, **self.doctype2id)
+
+        return storage.check(files, attachments)
+
+    def search_fields(self, keys, item_ids=None):
+        """Search all fields with the persistent index. Allow searching multiple words.
+
+        Parameters
+        ----------
+        keys : str
+            A single string containing all tokens/keys. Tokens/keys are separated by spaces.
+        item_ids : None or a list-like of int/str
+            Limit the candidate items to these item_ids. If None, search all items.
+
+        Returns
+        -------
+        pandas.DataFrame
+            A dataframe with only `itemID`s.
+        """
+        return self._connect_and_search("search_fields", keys, item_ids)
+
+    def search_authors(self, keys, item_ids=None):
+        """Search authors' names with the persistent index. Allow searching multiple words.
+
+        Parameters
+        ----------
+        keys : str
+            A single string containing all tokens/keys. Tokens/keys are separated by spaces.
+        item_ids : None or a list-like of int/str
+            Limit the candidate items to these item_ids. If None, search all items.
+
+        Returns
+        -------
+        pandas.DataFrame
+            A dataframe with only `itemID`s.
+        """
+        return self._connect_and_search("search_authors", keys, item_ids)
+
+    def search(self, query):
+        """Search documents with a compound query using the persistent indices.
+
+        Parameters
+        ----------
+        query : str, or a tree of query.Term, query.And, query.Or, and query.Not
+            E.g., 'author:smith fulltext:"navier stokes" type:journalArticle'. See
+            `zoteroutils.query` for the syntax.
+
+        Returns
+        -------
+        pandas.DataFrame
+            A dataframe with only `itemID`s of documents.
+        """
+        from . import index, query as _query
+
+        def compute():
+            with self._connect() as conn:
+                index.attach_index(conn, self.index)
+                index.update_index(conn)
+                index.update_fulltext_index(conn)
+                return _query.search(conn, query, **self.field2id)
+
+        return self._cached("search", compute, query)
+
+    def search_creators(self, key, mode="fuzzy", limit=10, items=False):
+        """Search creators' names with the persistent trigram index.
+
+        Matching ignores case and diacritics and, in the "fuzzy" mode, tolerates typos.
+
+        Parameters
+        ----------
+        key : str
+            The (partial) name to search.
+        mode : str
+            One of "fuzzy" (default), "substring", and "prefix". See `index.search_creators`.
+        limit : int
+            The maximum number of creators returned.
+        items : bool
+            If True, returns the items of the matched creators instead of the creators.
+
+        Returns
+        -------
+        pandas.DataFrame
+            Creators ("creatorID", "firstName", "lastName", and "distance") or items ("itemID" and
+            "distance") sorted by the edit distance to the key.
+        """
+        from . import index
+
+        def compute():
+            with self._connect() as conn:
+                index.attach_index(conn, self.index)
+                index.update_creator_index(conn)
+                return index.search_creators(conn, key, mode, limit, items)
+
+        return self._cached("search_creators", compute, key, mode, limit, items)
+
+    def search_full_texts(self, keys, item_ids=None):
+        """Search attachments' full texts with the persistent index. Allow searching multiple words.
+
+        Parameters
+        ----------
+        keys : str
+            A single string containing all tokens/keys. Tokens/keys are separated by spaces.
+        item_ids : None or a list-like of int/str
+            Limit the candidate items to these item_ids. If None, search all items.
+
+        Returns
+        -------
+        pandas.DataFrame
+            A dataframe with only `itemID`s. The `itemID`s are those of the attachments' parents.
+        """
+        return self._connect_and_search("search_full_texts", keys, item_ids)
+
+    def search_texts(self, keys, mode="all", distance=10, item_ids=None):
+        """Search the texts extracted from attachments, with phrase and proximity queries.
+
+        The index is not updated automatically, because updating it reads files in the storage
+        folder. Call `update_index(texts=True)` first.
+
+        Parameters
+        ----------
+        keys : str
+            A single string containing all tokens/keys. Tokens/keys are separated by spaces.
+        mode : str
+            One of "all" (default), "phrase", and "near". See `texts.search_texts`.
+        distance : int
+            The maximum number of words between the keys in "near" mode.
+        item_ids : None or a list-like of int/str
+            Limit the candidate items to these item_ids. If None, search all items.
+
+        Returns
+        -------
+        pandas.DataFrame
+            A dataframe with columns "itemID" (the attachments' parents) and "attachmentID".
+        """
+        from . import index, texts
+
+        # not cached: the index changes with the cache files rather than with the database
+        with self._connect() as conn:
+            index.attach_index(conn, self.index)
+            return texts.search_texts(conn, keys, mode, distance, item_ids)
+
+    def search_ranked(self, keys, target="fields", limit=20, offset=0, item_ids=None,
+                      context=None):
+        """Returns one page of the best matches of a search, ranked by BM25.
+
+        Parameters
+        ----------
+        keys : str
+            A single string containing all tokens/keys. Tokens/keys are separated by spaces.
+        target : str
+            What to search: "fields" (default), "authors", or "full_texts".
+        limit : int
+            The maximum number of rows, i.e., the page size.
+        offset : int
+            The number of best matches to skip, e.g., `2 * limit` for the third page.
+        item_ids : None or a list-like of int/str
+            Limit the candidate items to these item_ids. If None, search all items.
+        context : None or str
+            None, "snippet", or "highlight". See `index.search_ranked`.
+
+        Returns
+        -------
+        pandas.DataFrame
+            A dataframe with `itemID`s and their `score`s (higher is more relevant), plus a column
+            named by `context` if it is not None, sorted by the scores.
+        """
+        # pylint: disable=too-many-arguments
+        return self._connect_and_search(
+            "search_ranked", keys, item_ids, target=target, limit=limit, offset=offset,
+            context=context)
+
+    def _connect_and_search(self, name, keys, item_ids, **kwargs):
+        """Call `_search` with a new connection, or return the cached results."""
+
+        def compute():
+            with self._connect() as conn:
+                return self._search(conn, name, keys, item_ids, **kwargs)
+
+        return self._cached(name, compute, keys, item_ids, kwargs)
+
+    def _search(self, conn, name, keys, item_ids, **kwargs):
+        """Underlying implementation of `search_*` with an opened connection."""
+        from . import index
+
+        index.attach_index(conn, self.index)
+        if name == "search_full_texts" or kwargs.get("target") == "full_texts":
+            index.update_fulltext_index(conn)
+        else:
+            index.update_index(conn)
+
+        return getattr(index, name)(conn, keys, item_ids=item_ids, **kwargs)
@@ -0,0 +1,245 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+# vim:fenc=utf-8
+#
+# Copyright © 2020 Pi-Yueh Chuang <pychuang@pm.me>
+#
+# Distributed under terms of the BSD 3-Clause license.
+
+"""Export the library to columnar files and load them back without reading SQLite.
+
+Usage:
+
+    tables = db.load("~/zotero-export", fields=["DOI", "volume"], creators=True)
+    tables.docs       # the compact results of `get_docs`
+    tables.fields     # the results of `get_fields`
+    tables.creators   # one row per item and creator
+
+The files are Arrow IPC (Feather v2, uncompressed, memory-mapped on loading) or Parquet files in
+a folder, together with `manifest.json`, which records the state of `zotero.sqlite` they were
+exported from. `load` exports again only if the database changed. Requires pyarrow.
+"""
+import os
+import json
+import typing
+import pathlib
+import threading
+from .dummy_dict import DummyDict
+from .instrument import span as _span
+
+FORMATS = {"feather": ".arrow", "parquet": ".parquet"}
+
+MANIFEST = "manifest.json"
+
+_PathLike = typing.Union[str, pathlib.Path]
+
+
+def _pyarrow():
+    """Import pyarrow's modules used in this module."""
+    try:
+        # pylint: disable=import-outside-toplevel
+        import pyarrow
+        import pyarrow.feather
+        import pyarrow.parquet
+    except ImportError as err:
+        raise ImportError("zoteroutils.export requires pyarrow") from err
+    return pyarrow
+
+
+def _temp_path(path: pathlib.Path) -> pathlib.Path:
+    """A temporary path next to `path`, unique to the thread, to be renamed to `path`."""
+    return path.with_name("{}.{}-{}.tmp".format(path.name, os.getpid(), threading.get_ident()))
+
+
+def _write_manifest(directory: pathlib.Path, manifest: dict):
+    """Write `manifest.json` atomically, so concurrent readers never see a partial file."""
+    path = directory.joinpath(MANIFEST)
+    temp = _temp_path(path)
+
+    with open(temp, "w") as fobj:
+        json.dump(manifest, fobj)
+
+    os.replace(temp, path)
+
+
+def state(db) -> dict:
+    """Returns the state of a Database's `zotero.sqlite` recorded in manifests.
+
+    "files" (modification times and sizes of the database and its WAL file) is checked first
+    because it needs no connection. "items" (see `index.items_fingerprint`) only changes when
+    items change, not when Zotero writes other data, e.g., settings.
+    """
+    from .cache import file_stamp  # pylint: disable=import-outside-toplevel
+    from .index import items_fingerprint  # pylint: disable=import-outside-toplevel
+
+    with db.engine.connect() as conn:
+        items = items_fingerprint(conn)
+
+    return {"files": file_stamp(db.db, str(db.db)+"-wal"), "items": items}
+
+
+def _options(format: str, fields, creators: bool) -> dict:
+    """The options recorded in manifests. `fields` is True for all fields."""
+    # pylint: disable=redefined-builtin
+    if format not in FORMATS:
+        raise ValueError("Unrecognized format: {}".format(format))
+    return {"format": format, "fields": fields if fields in [None, True] else list(fields),
+            "creators": bool(creators)}
+
+
+def export(
+    db, directory: _PathLike, format: str = "feather",
+    fields: typing.Union[None, bool, typing.Sequence[str]] = None, creators: bool = False
+) -> dict:
+    """Write the tables of a Database to columnar files and a manifest.
+
+    Parameters
+    ----------
+    db : Database
+        The database.
+    directory : str or path-like
+        The folder of the files. It will be created if not exist.
+    format : str
+        "feather" (default; Arrow IPC files, which `load` memory-maps without copying) or
+        "parquet" (smaller files, decoded on loading).
+    fields : None, True, or list-like of str
+        The fields exported as the table "fields" (see `Database.get_fields`). True for all fields.
+        None (default) does not export the table.
+    creators : bool
+        Whether to export the table "creators" (see `read.get_item_creators`).
+
+    Returns
+    -------
+    dict
+        The manifest.
+    """
+    # pylint: disable=redefined-builtin
+    from . import read  # pylint: disable=import-outside-toplevel
+
+    pyarrow = _pyarrow()
+    options = _options(format, fields, creators)
+    directory = pathlib.Path(directory).expanduser()
+    directory.mkdir(parents=True, exist_ok=True)
+
+    # the state before reading, so changes made while exporting trigger the next export
+    manifest = dict(state(db), **options, tables=[])
+
+    tables = {"docs": lambda: db.get_docs(attachment_output="str", compact=True)}
+
+    if fields is not None:
+        names = sorted(db.field2id) if fields is True else list(fields)
+        tables["fields"] = lambda: db.get_fields(names).astype("string")
+
+    if creators:
+        def read_creators():
+            with db.engine.connect() as conn:
+                return read.get_item_creators(conn, **db.creatortype2id)
+        tables["creators"] = read_creators
+
+    for name, reader in tables.items():
+        path = directory.joinpath(name + FORMATS[format])
+
+        with _span("export.{}".format(name)):
+            table = pyarrow.Table.from_pandas(reader())
+            temp = _temp_path(path)
+
+            if format == "feather":
+                pyarrow.feather.write_feather(table, str(temp), compression="uncompressed")
+            else:
+                pyarrow.parquet.write_table(table, str(temp))
+
+            os.replace(temp, path)
+
+        manifest["tables"].append(name)
+
+    _write_manifest(directory, manifest)
+    return manifest
+
+
+def _up_to_date(db, directory: pathlib.Path, options: dict) -> bool:
+    """Whether the files in the folder were exported with the options from the current database.
+
+    The manifest's file state is refreshed if only the database files changed.
+    """
+    try:
+        with open(directory.joinpath(MANIFEST), "r") as fobj:
+            manifest = json.load(fobj)
+    except (FileNotFoundError, ValueError):
+        return False
+
+    if any(manifest.get(key) != value for key, value in options.items()):
+        return False
+
+    extension = FORMATS[options["format"]]
+    if not all(directory.joinpath(name + extension).is_file() for name in manifest["tables"]):
+        return False
+
+    from .cache import file_stamp  # pylint: disable=import-outside-toplevel
+
+    files = json.loads(json.dumps(file_stamp(db.db, str(db.db)+"-wal")))  # tuples to lists
+    if manifest["files"] == files:
+        return True
+
+    current = state(db)
+    if manifest["items"] != current["items"]:
+        return False
+
+    manifest["files"] = current["files"]
+    _write_manifest(directory, manifest)
+
+    return True
+
+
+def load(
+    db, directory: _PathLike, format: str = "feather",
+    fields: typing.Union[None, bool, typing.Sequence[str]] = None, creators: bool = False,
+    arrow: bool = False
+) -> DummyDict:
+    """Load the exported tables of a Database, exporting them first if missing or outdated.
+
+    Checking whether the files are up-to-date costs a `stat` of the database files and, only if
+    they changed, a cheap query (see `state`).
+
+    Parameters
+    ----------
+    db : Database
+        The database.
+    directory, format, fields, creators :
+        See `export`. The files are exported again if they were exported with other options.
+    arrow : bool
+        Whether to return `pyarrow.Table`s rather than `pandas.DataFrame`s. Tables of Feather
+        files are memory-mapped without copying, and so cost almost nothing until used; converting
+        them to pandas copies strings and lists.
+
+    Returns
+    -------
+    DummyDict
+        The tables "docs", and "fields" and "creators" if requested.
+    """
+    # pylint: disable=redefined-builtin, too-many-arguments
+    pyarrow = _pyarrow()
+    options = _options(format, fields, creators)
+    directory = pathlib.Path(directory).expanduser()
+
+    with _span("export.check"):
+        up_to_date = _up_to_date(db, directory, options)
+
+    if not up_to_date:
+        export(db, directory, format, fields, creators)
+
+    names = ["docs"] + (["fields"] if fields is not None else []) + \
+        (["creators"] if creators else [])
+
+    results = DummyDict()
+    for name in names:
+        path = str(directory.joinpath(name + FORMATS[format]))
+
+        with _span("export.load.{}".format(name)):
+            if format == "feather":
+                table = pyarrow.feather.read_table(path, memory_map=True)
+            else:
+                table = pyarrow.parquet.read_table(path, memory_map=True)
+
+            results[name] = table if arrow else table.to_pandas()
+
+    return results
@@ -0,0 +1,894 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+# vim:fenc=utf-8
+#
+# Copyright © 2020 Pi-Yueh Chuang <pychuang@pm.me>
+#
+# Distributed under terms of the BSD 3-Clause license.
+
+"""Persistent full-text search indices stored in a sidecar SQLite database.
+
+The sidecar database lives next to `zotero.sqlite` and is attached to a connection under a schema
+name (`zindex` by default). Zotero's own database is only read; all index tables are created and
+written in the attached sidecar database.
+"""
+import typing
+import itertools
+import threading
+import contextlib
+import collections
+import unicodedata
+import pandas
+import sqlalchemy
+from .instrument import span as _span
+from .read import load_item_ids, _read_sql
+
+
+# locks serializing updates of each sidecar database (by path) within this process
+_LOCKS: typing.Dict[str, threading.Lock] = {}
+_LOCKS_GUARD = threading.Lock()
+
+
+@contextlib.contextmanager
+def _sidecar_lock(conn: sqlalchemy.engine.Connection, schema: str):
+    """Hold the lock of the sidecar database attached as `schema`. For internal use.
+
+    Updates on different connections would otherwise race for the sidecar's write lock, and all
+    but one of them fail with "database is locked".
+    """
+    path = next(row[2] for row in conn.execute("PRAGMA database_list;") if row[1] == schema)
+
+    with _LOCKS_GUARD:
+        lock = _LOCKS.setdefault(path, threading.Lock())
+
+    with lock:
+        yield
+
+
+def attach_index(conn: sqlalchemy.engine.Connection, path: str, schema: str = "zindex"):
+    """Attach the sidecar index database to a connection and create missing index tables.
+
+    Parameters
+    ----------
+    conn : sqlalchemy.engine.Connection
+        Connection object to Zotero's database.
+    path : str or path-like
+        The path to the sidecar database. It will be created if not exist.
+    schema : str
+        The schema name used to attach the sidecar database.
+    """
+
+    attached = [row[1] for row in conn.execute("PRAGMA database_list;")]
+
+    if schema not in attached:
+        conn.execute("ATTACH DATABASE ? AS {0};".format(schema), (str(path),))
+
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS {0}.meta (name TEXT PRIMARY KEY, value);".format(schema))
+
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS {0}.item_states "
+        "(itemID INTEGER PRIMARY KEY, version INT, dateModified TEXT);".format(schema)
+    )
+
+    # rowids of the FTS tables are the itemIDs, so updating an item does not need a full scan
+    conn.execute(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS {0}.fields_fts USING FTS5(value);".format(schema))
+    conn.execute(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS {0}.authors_fts USING FTS5(firstName, lastName);"
+        .format(schema)
+    )
+
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS {0}.fulltext_states "
+        "(itemID INTEGER PRIMARY KEY, state TEXT);".format(schema)
+    )
+
+    # one row per attachment (rowid = attachment's itemID) holding all words Zotero indexed
+    conn.execute(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS {0}.fulltext_fts USING FTS5(words);".format(schema))
+
+
+def items_fingerprint(conn: sqlalchemy.engine.Connection) -> str:
+    """Returns a cheap string summarizing the current state of the `items` table.
+
+    The fingerprint changes whenever items are added, modified, synced, or purged from the database.
+
+    Parameters
+    ----------
+    conn : sqlalchemy.engine.Connection
+        Connection object to Zotero's database.
+
+    Returns
+    -------
+    str
+    """
+
+    row = conn.execute(
+        "SELECT COUNT(*), MAX(itemID), MAX(version), MAX(dateModified), MAX(clientDateModified) "
+        "FROM items;"
+    ).fetchone()
+
+    return "|".join(map(str, row))
+
+
+def update_index(conn: sqlalchemy.engine.Connection, schema: str = "zindex") -> int:
+    """Incrementally update the field and author indices in an attached sidecar database.
+
+    Only items whose `version` or `dateModified` differ from the recorded states are re-indexed.
+    Items purged from Zotero's database are removed from the indices.
+
+    Parameters
+    ----------
+    conn : sqlalchemy.engine.Connection
+        Connection object to Zotero's database, with the sidecar database attached.
+    schema : str
+        The schema name of the attached sidecar database.
+
+    Returns
+    -------
+    int
+        The number of items re-indexed or removed. Zero if the indices are up-to-date.
+    """
+
+    # nothing was committed to Zotero's database by others since the last check on this connection
+    data_version = conn.execute("PRAGMA main.data_version;").fetchone()[0]
+    if conn.info.get("zoteroutils.items.{}".format(schema)) == data_version:
+        return 0
+
+    fingerprint = items_fingerprint(conn)
+
+    # updates of the same sidecar database are serialized; once the lock is held, check again
+    # whether another thread has brought the index up-to-date in the meantime
+    with _sidecar_lock(conn, schema):
+        recorded = conn.execute(
+            "SELECT value FROM {0}.meta WHERE name = 'items';".format(schema)).fetchone()
+
+        if recorded is not None and recorded[0] == fingerprint:
+            conn.info["zoteroutils.items.{}".format(schema)] = data_version
+            return 0
+
+        # delete residual table from past failed operations
+        conn.execute("DROP TABLE IF EXISTS temp.zu_changed;")
+
+        with conn.begin():
+            conn.execute(
+                """CREATE TEMP TABLE zu_changed AS
+                    SELECT items.itemID AS itemID, items.version AS version,
+                        items.dateModified AS dateModified
+                    FROM items LEFT JOIN {0}.item_states AS states USING(itemID)
+                    WHERE
+                        states.itemID IS NULL OR
+                        states.version IS NOT items.version OR
+                        states.dateModified IS NOT items.dateModified
+                    UNION ALL
+                    SELECT itemID, NULL, NULL FROM {0}.item_states
+                    WHERE itemID NOT IN (SELECT itemID FROM items);
+                """.format(schema)
+            )
+
+            subquery = "SELECT itemID FROM temp.zu_changed"
+
+            for table in ["fields_fts", "authors_fts", "item_states"]:
+                column = "itemID" if table == "item_states" else "rowid"
+                conn.execute(
+                    "DELETE FROM {0}.{1} WHERE {2} IN ({3});".format(
+                        schema, table, column, subquery))
+
+            conn.execute(
+                """INSERT INTO {0}.fields_fts(rowid, value)
+                    SELECT itemID, GROUP_CONCAT(value) FROM itemData
+                    INNER JOIN itemDataValues USING(valueID)
+                    WHERE itemID IN ({1}) GROUP BY itemID;
+                """.format(schema, subquery)
+            )
+
+            conn.execute(
+                """INSERT INTO {0}.authors_fts(rowid, firstName, lastName)
+                    SELECT itemID, GROUP_CONCAT(firstName), GROUP_CONCAT(lastName)
+                    FROM itemCreators INNER JOIN creators USING(creatorID)
+                    WHERE itemID IN ({1}) GROUP BY itemID;
+                """.format(schema, subquery)
+            )
+
+            conn.execute(
+                """INSERT INTO {0}.item_states
+                    SELECT itemID, version, dateModified FROM temp.zu_changed
+                    WHERE version IS NOT NULL;
+                """.format(schema)
+            )
+
+            conn.execute(
+                "INSERT OR REPLACE INTO {0}.meta VALUES ('items', ?);".format(schema),
+                (fingerprint,))
+
+            count = conn.execute("SELECT COUNT(*) FROM temp.zu_changed;").fetchone()[0]
+
+        conn.execute("DROP TABLE IF EXISTS temp.zu_changed;")
+        conn.info["zoteroutils.items.{}".format(schema)] = data_version
+
+    return count
+
+
+def fulltext_fingerprint(conn: sqlalchemy.engine.Connection) -> str:
+    """Returns a cheap string summarizing the current state of the `fulltextItems` table.
+
+    Parameters
+    ----------
+    conn : sqlalchemy.engine.Connection
+        Connection object to Zotero's database.
+
+    Returns
+    -------
+    str
+    """
+
+    row = conn.execute(
+        "SELECT COUNT(*), MAX(itemID), TOTAL(version), TOTAL(indexedChars), TOTAL(indexedPages) "
+        "FROM fulltextItems;"
+    ).fetchone()
+
+    return "|".join(map(str, row))
+
+
+def update_fulltext_index(conn: sqlalchemy.engine.Connection, schema: str = "zindex") -> int:
+    """Incrementally update the full-text index in an attached sidecar database.
+
+    An attachment is re-indexed only when its row in `fulltextItems` changes, i.e., when Zotero
+    re-indexes the file. Attachments no longer in `fulltextItems` are removed from the index. The
+    cost of an update is hence proportional to the number of changed attachments rather than the
+    size of `fulltextItemWords`.
+
+    Parameters
+    ----------
+    conn : sqlalchemy.engine.Connection
+        Connection object to Zotero's database, with the sidecar database attached.
+    schema : str
+        The schema name of the attached sidecar database.
+
+    Returns
+    -------
+    int
+        The number of attachments re-indexed or removed. Zero if the index is up-to-date.
+    """
+
+    # nothing was committed to Zotero's database by others since the last check on this connection
+    data_version = conn.execute("PRAGMA main.data_version;").fetchone()[0]
+    if conn.info.get("zoteroutils.fulltext.{}".format(schema)) == data_version:
+        return 0
+
+    fingerprint = fulltext_fingerprint(conn)
+
+    # updates of the same sidecar database are serialized; once the lock is held, check again
+    # whether another thread has brought the index up-to-date in the meantime
+    with _sidecar_lock(conn, schema):
+        recorded = conn.execute(
+            "SELECT value FROM {0}.meta WHERE name = 'fulltext';".format(schema)).fetchone()
+
+        if recorded is not None and recorded[0] == fingerprint:
+            conn.info["zoteroutils.fulltext.{}".format(schema)] = data_version
+            return 0
+
+        # delete residual table from past failed operations
+        conn.execute("DROP TABLE IF EXISTS temp.zu_changed;")
+
+        state = "indexedPages || '|' || indexedChars || '|' || totalPages || '|' || totalChars " \
+            "|| '|' || version"
+
+        with conn.begin():
+            conn.execute(
+                """CREATE TEMP TABLE zu_changed AS
+                    SELECT fulltextItems.itemID AS itemID, {1} AS state
+                    FROM fulltextItems LEFT JOIN {0}.fulltext_states AS states USING(itemID)
+                    WHERE states.itemID IS NULL OR states.state IS NOT ({1})
+                    UNION ALL
+                    SELECT itemID, NULL FROM {0}.fulltext_states
+                    WHERE itemID NOT IN (SELECT itemID FROM fulltextItems);
+                """.format(schema, state)
+            )
+
+            subquery = "SELECT itemID FROM temp.zu_changed"
+
+            conn.execute(
+                "DELETE FROM {0}.fulltext_fts WHERE rowid IN ({1});".format(schema, subquery))
+            conn.execute(
+                "DELETE FROM {0}.fulltext_states WHERE itemID IN ({1});".format(schema, subquery))
+
+            # fulltextItemWords is indexed on itemID, so only the changed attachments' rows are read
+            conn.execute(
+                """INSERT INTO {0}.fulltext_fts(rowid, words)
+                    SELECT itemID, GROUP_CONCAT(word, ' ') FROM fulltextItemWords
+                    INNER JOIN fulltextWords USING(wordID)
+                    WHERE itemID IN ({1}) GROUP BY itemID;
+                """.format(schema, subquery)
+            )
+
+            conn.execute(
+                """INSERT INTO {0}.fulltext_states
+                    SELECT itemID, state FROM temp.zu_changed WHERE state IS NOT NULL;
+                """.format(schema)
+            )
+
+            conn.execute(
+                "INSERT OR REPLACE INTO {0}.meta VALUES ('fulltext', ?);".format(schema),
+                (fingerprint,)
+            )
+
+            count = conn.execute("SELECT COUNT(*) FROM temp.zu_changed;").fetchone()[0]
+
+        conn.execute("DROP TABLE IF EXISTS temp.zu_changed;")
+        conn.info["zoteroutils.fulltext.{}".format(schema)] = data_version
+
+    return count
+
+
+def _search(
+    conn: sqlalchemy.engine.Connection,
+    table: str,
+    keys: str,
+    item_ids: typing.Optional[typing.Sequence[typing.Union[str, int]]],
+    schema: str
+) -> pandas.DataFrame:
+    """Search an FTS table in the sidecar database. For internal use."""
+
+    keys = " ".join(["\"{}\"".format(key.replace("\"", "\"\"")) for key in keys.split()])
+
+    query = "SELECT rowid AS itemID FROM {0}.{1} WHERE {1} MATCH ?".format(schema, table)
+
+    if item_ids is not None:
+        query += " AND rowid IN ({0})".format(load_item_ids(conn, item_ids))
+
+    return _read_sql(
+        "index.{}.query".format(table), query + " ORDER BY rank;", conn, params=(keys,))
+
+
+def search_fields(
+    conn: sqlalchemy.engine.Connection,
+    keys: str,
+    item_ids: typing.Optional[typing.Sequence[typing.Union[str, int]]] = None,
+    schema: str = "zindex"
+) -> pandas.DataFrame:
+    """Search all fields using the persistent index. Allow searching multiple words.
+
+    The results are the same as `zoteroutils.search.search_fields`, but the index is not rebuilt.
+    Call `update_index` first to bring the index up-to-date.
+
+    Parameters
+    ----------
+    conn : sqlalchemy.engine.Connection
+        Connection object to Zotero's database, with the sidecar database attached.
+    keys : str
+        A single string containing all tokens/keys. Tokens/keys are separated by spaces.
+    item_ids : None or a list-like of int/str
+        Limit the candidate items to these item_ids. If None, search all items.
+    schema : str
+        The schema name of the attached sidecar database.
+
+    Returns
+    -------
+    pandas.DataFrame
+        A dataframe with only `itemID`s.
+    """
+    return _search(conn, "fields_fts", keys, item_ids, schema)
+
+
+def search_authors(
+    conn: sqlalchemy.engine.Connection,
+    keys: str,
+    item_ids: typing.Optional[typing.Sequence[typing.Union[str, int]]] = None,
+    schema: str = "zindex"
+) -> pandas.DataFrame:
+    """Search authors' names using the persistent index. Allow searching multiple words.
+
+    The results are the same as `zoteroutils.search.search_authors`, but the index is not rebuilt.
+    Call `update_index` first to bring the index up-to-date.
+
+    Parameters
+    ----------
+    conn : sqlalchemy.engine.Connection
+        Connection object to Zotero's database, with the sidecar database attached.
+    keys : str
+        A single string containing all tokens/keys. Tokens/keys are separated by spaces.
+    item_ids : None or a list-like of int/str
+        Limit the candidate items to these item_ids. If None, search all items.
+    schema : str
+        The schema name of the attached sidecar database.
+
+    Returns
+    -------
+    pandas.DataFrame
+        A dataframe with only `itemID`s.
+    """
+    return _search(conn, "authors_fts", keys, item_ids, schema)
+
+
+def search_full_texts(
+    conn: sqlalchemy.engine.Connection,
+    keys: str,
+    item_ids: typing.Optional[typing.Sequence[typing.Union[str, int]]] = None,
+    schema: str = "zindex"
+) -> pandas.DataFrame:
+    """Search attachments' full texts using the persistent index. Allow searching multiple words.
+
+    The results are the same as `zoteroutils.search.search_full_texts`, but nothing is written to
+    Zotero's database and the index is not rebuilt. Call `update_fulltext_index` first to bring the
+    index up-to-date.
+
+    Parameters
+    ----------
+    conn : sqlalchemy.engine.Connection
+        Connection object to Zotero's database, with the sidecar database attached.
+    keys : str
+        A single string containing all tokens/keys. Tokens/keys are separated by spaces.
+    item_ids : None or a list-like of int/str
+        Limit the candidate items to these item_ids. If None, search all items.
+    schema : str
+        The schema name of the attached sidecar database.
+
+    Returns
+    -------
+    pandas.DataFrame
+        A dataframe with only `itemID`s. The `itemID`s are those of the attachments' parents.
+    """
+
+    keys = " ".join(["\"{}\"".format(key.replace("\"", "\"\"")) for key in keys.split()])
+
+    query = """
+        SELECT parentItemID AS itemID FROM {0}.fulltext_fts
+        INNER JOIN itemAttachments ON itemAttachments.itemID = fulltext_fts.rowid
+        WHERE fulltext_fts MATCH ?
+    """.format(schema)
+
+    if item_ids is not None:
+        item_ids = load_item_ids(conn, item_ids)
+        query += " AND (itemAttachments.itemID IN ({0}) OR parentItemID IN ({0}))".format(item_ids)
+
+    return _read_sql("index.fulltext_fts.query", query + " ORDER BY rank;", conn, params=(keys,))
+
+
+# the FTS tables searched by `search_ranked` and their numbers of columns
+_RANKED = {
+    "fields": ("fields_fts", 1), "authors": ("authors_fts", 2), "full_texts": ("fulltext_fts", 1)}
+
+
+def search_ranked(
+    conn: sqlalchemy.engine.Connection,
+    keys: str,
+    target: str = "fields",
+    limit: int = 20,
+    offset: int = 0,
+    item_ids: typing.Optional[typing.Sequence[typing.Union[str, int]]] = None,
+    context: typing.Optional[str] = None,
+    markers: typing.Tuple[str, str] = ("[", "]"),
+    schema: str = "zindex"
+) -> pandas.DataFrame:
+    """Returns one page of the best matches of a search, ranked by BM25, using a persistent index.
+
+    SQLite still scores every match (and, for "full_texts", groups all matching attachments by
+    their parents), but only the rows of the requested page are returned to Python, and snippets or
+    highlights, which are much more expensive than scores, are only generated for these rows. Call
+    `update_index` (or `update_fulltext_index` for "full_texts") first to bring the index
+    up-to-date.
+
+    Parameters
+    ----------
+    conn : sqlalchemy.engine.Connection
+        Connection object to Zotero's database, with the sidecar database attached.
+    keys : str
+        A single string containing all tokens/keys. Tokens/keys are separated by spaces.
+    target : str
+        What to search: "fields" (default), "authors", or "full_texts".
+    limit : int
+        The maximum number of rows, i.e., the page size.
+    offset : int
+        The number of best matches to skip, e.g., `2 * limit` for the third page.
+    item_ids : None or a list-like of int/str
+        Limit the candidate items to these item_ids. If None, search all items.
+    context : None or str
+        None (default), "snippet" for a column of short fragments around the matched words, or
+        "highlight" for a column of the whole indexed text. Matched words are enclosed in
+        `markers` in both cases.
+    markers : tuple of two str
+        The strings inserted before and after each matched word.
+    schema : str
+        The schema name of the attached sidecar database.
+
+    Returns
+    -------
+    pandas.DataFrame
+        A dataframe with `itemID`s and their `score`s (the negated BM25 scores, so higher is more
+        relevant), plus a column named by `context` if it is not None, sorted by the scores (ties by
+        `itemID`s). For "full_texts", the `itemID`s are those of the attachments' parents, and each
+        parent's score is that of its best matching attachment. Attachments without parents are not
+        returned.
+    """
+    # pylint: disable=too-many-arguments
+
+    if target not in _RANKED:
+        raise ValueError("Unrecognized target: {}".format(target))
+
+    if context not in [None, "snippet", "highlight"]:
+        raise ValueError("Unrecognized context: {}".format(context))
+
+    table, ncols = _RANKED[target]
+    keys = " ".join(["\"{}\"".format(key.replace("\"", "\"\"")) for key in keys.split()])
+    columns = ["itemID", "score"] + ([] if context is None else [context])
+
+    if not keys or limit <= 0:
+        return pandas.DataFrame({column: [] for column in columns})
+
+    if target == "full_texts":  # the best attachment of each parent
+        query = """
+            SELECT parentItemID AS itemID, fulltext_fts.rowid AS rowid, MIN(rank) AS best
+            FROM {0}.fulltext_fts
+            INNER JOIN itemAttachments ON itemAttachments.itemID = fulltext_fts.rowid
+            WHERE fulltext_fts MATCH ? AND parentItemID IS NOT NULL
+        """.format(schema)
+        if item_ids is not None:
+            query += " AND (itemAttachments.itemID IN ({0}) OR parentItemID IN ({0}))".format(
+                load_item_ids(conn, item_ids))
+        query += " GROUP BY parentItemID ORDER BY best, parentItemID"
+    else:
+        query = "SELECT rowid AS itemID, rowid, rank AS best FROM {0}.{1} WHERE {1} MATCH ?".format(
+            schema, table)
+        if item_ids is not None:
+            query += " AND rowid IN ({0})".format(load_item_ids(conn, item_ids))
+        query += " ORDER BY rank, rowid"
+
+    with _span("index.ranked.{}.query".format(target)) as stage:
+        page = conn.execute(
+            query + " LIMIT ? OFFSET ?;", (keys, int(limit), max(int(offset), 0))).fetchall()
+        stage.rows = len(page)
+
+    results = pandas.DataFrame.from_records(
+        [(item_id, -best) for item_id, _, best in page], columns=["itemID", "score"])
+
+    if context is None or not page:
+        return results.reindex(columns=columns)
+
+    if context == "snippet":
+        func = "snippet({0}, -1, ?, ?, '…', 16)".format(table)
+        params = list(markers)
+    else:  # all columns of a row, separated by spaces
+        func = " || ' ' || ".join(
+            "highlight({0}, {1}, ?, ?)".format(table, i) for i in range(ncols))
+        params = list(markers) * ncols
+
+    with _span("index.ranked.{}.{}".format(target, context)):
+        texts = dict(conn.execute(
+            "SELECT rowid, {0} FROM {1}.{2} WHERE {2} MATCH ? AND rowid IN ({3});".format(
+                func, schema, table, ", ".join(str(int(row[1])) for row in page)),
+            tuple(params) + (keys,)
+        ).fetchall())
+
+    results[context] = [texts.get(row[1]) for row in page]
+    return results
+
+
+def fold(text: typing.Optional[str]) -> str:
+    """Returns the case-folded `text` without diacritics, e.g., "José Müller" -> "jose muller".
+
+    Parameters
+    ----------
+    text : None or str
+
+    Returns
+    -------
+    str
+        An empty string if `text` is None.
+    """
+    text = unicodedata.normalize("NFKD", text if text is not None else "")
+    return "".join(char for char in text if not unicodedata.combining(char)).casefold()
+
+
+def edit_distance(first: str, second: str, bound: typing.Optional[int] = None) -> int:
+    """Returns the edit distance between two strings.
+
+    Edits are insertions, deletions, substitutions, and transpositions of adjacent characters,
+    i.e., the optimal string alignment distance.
+
+    Parameters
+    ----------
+    first, second : str
+    bound : None or int
+        If not None, stop early and return `bound + 1` once the distance is known to exceed it.
+
+    Returns
+    -------
+    int
+    """
+
+    if len(first) < len(second):
+        first, second = second, first
+
+    before, previous = None, list(range(len(second)+1))
+    for i, char1 in enumerate(first, 1):
+        current = [i]
+        for j, char2 in enumerate(second, 1):
+            current.append(min(previous[j]+1, current[j-1]+1, previous[j-1]+(char1 != char2)))
+            if i > 1 and j > 1 and char1 == second[j-2] and first[i-2] == char2:
+                current[j] = min(current[j], before[j-2]+1)
+
+        # a transposition may use the previous row, so both rows must exceed the bound
+        if bound is not None and min(current) > bound and min(previous) > bound:
+            return bound + 1
+
+        before, previous = previous, current
+
+    return previous[-1] if bound is None else min(previous[-1], bound+1)
+
+
+def _trigrams(text: str) -> typing.Set[str]:
+    """Returns the set of trigrams in a string, the same as FTS5's `trigram` tokenizer."""
+    return {text[i:i+3] for i in range(len(text)-2)}
+
+
+def update_creator_index(conn: sqlalchemy.engine.Connection, schema: str = "zindex") -> int:
+    """Incrementally update the trigram index of creators' names in an attached sidecar database.
+
+    Each row of the index is the folded (see `fold`) full name of a creator, with the creatorID as
+    the rowid. The numbers of names containing each trigram are kept in the table
+    `creator_grams` so searches can pick the rarest trigrams of a key. Zotero does not modify rows
+    of `creators` in place (editing a name points the item to another row), so updating only
+    inserts new creatorIDs and deletes purged ones.
+
+    The index uses FTS5's `trigram` tokenizer, which requires SQLite 3.34 or later.
+
+    Parameters
+    ----------
+    conn : sqlalchemy.engine.Connection
+        Connection object to Zotero's database, with the sidecar database attached.
+    schema : str
+        The schema name of the attached sidecar database.
+
+    Returns
+    -------
+    int
+        The number of creators indexed or removed. Zero if the index is up-to-date.
+    """
+
+    # nothing was committed to Zotero's database by others since the last check on this connection
+    data_version = conn.execute("PRAGMA main.data_version;").fetchone()[0]
+    if conn.info.get("zoteroutils.creators.{}".format(schema)) == data_version:
+        return 0
+
+    conn.execute(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS {0}.creators_trigram "
+        "USING FTS5(name, tokenize='trigram');".format(schema)
+    )
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS {0}.creator_grams "
+        "(gram TEXT PRIMARY KEY, df INT) WITHOUT ROWID;".format(schema)
+    )
+
+    fingerprint = "|".join(map(str, conn.execute(
+        "SELECT COUNT(*), MAX(creatorID), TOTAL(creatorID) FROM creators;").fetchone()))
+
+    # updates of the same sidecar database are serialized; once the lock is held, check again
+    # whether another thread has brought the index up-to-date in the meantime
+    with _sidecar_lock(conn, schema):
+        recorded = conn.execute(
+            "SELECT value FROM {0}.meta WHERE name = 'creators';".format(schema)).fetchone()
+
+        if recorded is not None and recorded[0] == fingerprint:
+            conn.info["zoteroutils.creators.{}".format(schema)] = data_version
+            return 0
+
+        with conn.begin():
+            removed = conn.execute(
+                "SELECT rowid, name FROM {0}.creators_trigram "
+                "WHERE rowid NOT IN (SELECT creatorID FROM creators);".format(schema)
+            ).fetchall()
+
+            conn.execute(
+                "DELETE FROM {0}.creators_trigram WHERE rowid IN ({1});"
+                .format(schema, ",".join(str(row[0]) for row in removed))
+            )
+
+            added = conn.execute(
+                "SELECT creatorID, firstName, lastName FROM creators "
+                "WHERE creatorID NOT IN (SELECT rowid FROM {0}.creators_trigram);".format(schema)
+            ).fetchall()
+            added = [(row[0], fold(" ".join(filter(None, row[1:])))) for row in added]
+
+            if added:
+                conn.execute(
+                    "INSERT INTO {0}.creators_trigram(rowid, name) VALUES (?, ?);".format(schema),
+                    added
+                )
+
+            counts = collections.Counter()
+            for _, name in added:
+                counts.update(_trigrams(name))
+            for _, name in removed:
+                counts.subtract(_trigrams(name))
+
+            if counts:
+                conn.execute(
+                    "INSERT INTO {0}.creator_grams VALUES (?, ?) "
+                    "ON CONFLICT(gram) DO UPDATE SET df = df + excluded.df;".format(schema),
+                    list(counts.items())
+                )
+
+            conn.execute(
+                "INSERT OR REPLACE INTO {0}.meta VALUES ('creators', ?);".format(schema),
+                (fingerprint,)
+            )
+
+        conn.info["zoteroutils.creators.{}".format(schema)] = data_version
+
+    return len(removed) + len(added)
+
+
+def search_creators(
+    conn: sqlalchemy.engine.Connection,
+    key: str,
+    mode: str = "fuzzy",
+    limit: int = 10,
+    items: bool = False,
+    schema: str = "zindex"
+) -> pandas.DataFrame:
+    """Search creators' names with the trigram index, tolerating diacritics, case, and typos.
+
+    Call `update_creator_index` first to bring the index up-to-date.
+
+    The costs of searches are bounded by the number of index entries read rather than the number
+    of creators: "substring" and "prefix" searches rank at most `50 * limit` (at least 500)
+    matches in the order of creatorIDs, and "fuzzy" searches rank the `10 * limit` (at least 100)
+    names sharing the most of the rarest trigrams of the key, reading about 5000 index entries.
+    A single edit may leave a key of at most five characters without any intact trigram, e.g.,
+    "smyth" for "smith", so "fuzzy" searches of such keys instead scan the index for names
+    containing one of the single edits of the key, and rank at most `50 * limit` of them.
+
+    Parameters
+    ----------
+    conn : sqlalchemy.engine.Connection
+        Connection object to Zotero's database, with the sidecar database attached.
+    key : str
+        The (partial) name to search, e.g., "jose smi" or "Smtih".
+    mode : str
+        One of "fuzzy" (default), "substring", and "prefix". "substring" matches names containing
+        the key. "prefix" matches names with a word starting with the key. "fuzzy" matches names
+        within an edit distance (see `edit_distance`) of a third of the key's length (at least 1)
+        from the full name or one of its words. Keys shorter than three characters do not have
+        trigrams, so such searches scan the index, and "fuzzy" ones fall back to "prefix".
+    limit : int
+        The maximum number of creators returned.
+    items : bool
+        If True, returns the items of the matched creators instead of the creators.
+    schema : str
+        The schema name of the attached sidecar database.
+
+    Returns
+    -------
+    pandas.DataFrame
+        Columns "creatorID", "firstName", "lastName", and "distance", the edit distance between
+        the key and the closest of the full name and its words, sorted by "distance". If `items`
+        is True, columns "itemID" and "distance" (of the item's closest creator) instead.
+    """
+    # pylint: disable=too-many-arguments, too-many-locals
+
+    if mode not in ["fuzzy", "substring", "prefix"]:
+        raise ValueError("Unrecognized mode: {}".format(mode))
+
+    folded = " ".join(fold(key).split())
+    escaped = folded.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+    # without trigrams, edit distances to a one- or two-character key are meaningless
+    mode = "prefix" if mode == "fuzzy" and len(folded) < 3 else mode
+
+    if mode == "fuzzy" and len(folded) <= 5:
+        # every single edit of the key as a LIKE pattern; the tolerance of such keys is one edit
+        pieces = [piece.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+                  for piece in folded]
+        patterns = {"".join(pieces)}
+        for i in range(len(pieces)+1):
+            patterns.add("".join(pieces[:i] + ["_"] + pieces[i:]))  # insertion
+            patterns.add("".join(pieces[:i] + ["_"] + pieces[i+1:]))  # substitution
+            patterns.add("".join(pieces[:i] + pieces[i+1:]))  # deletion
+            patterns.add("".join(  # transposition
+                pieces[:i] + pieces[i+1:i+2] + pieces[i:i+1] + pieces[i+2:]))
+
+        query = "SELECT rowid, name FROM {0}.creators_trigram WHERE {1} LIMIT {2}".format(
+            schema, " OR ".join(["name LIKE ? ESCAPE '\\'"] * len(patterns)), max(500, 50*limit))
+        params = ["%{}%".format(pattern) for pattern in sorted(patterns)]
+    elif mode == "fuzzy":
+        # trigrams of the key, of the key missing one character, e.g., "smith" for "smtih", and of
+        # the key with two adjacent characters swapped, e.g., "smith" for "simth"
+        grams = _trigrams(folded).union(*[
+            _trigrams(folded[:i]+folded[i+1:]) for i in range(len(folded))])
+        grams = list(grams.union(*[
+            _trigrams(folded[:i]+folded[i+1]+folded[i]+folded[i+2:])
+            for i in range(len(folded)-1)]))
+
+        # the rarest trigrams, as many as reading about 5000 index entries allows
+        frequencies = conn.execute(
+            "SELECT gram, df FROM {0}.creator_grams WHERE df > 0 AND gram IN ({1}) ORDER BY df;"
+            .format(schema, ",".join("?"*len(grams))), grams).fetchall()
+        totals = itertools.accumulate([0] + [row[1] for row in frequencies])
+        grams = [row[0] for row, total in zip(frequencies, totals) if total < 5000]
+
+        # names sharing the most of these trigrams; reading only rowids skips the names and bm25
+        subquery = " UNION ALL ".join(
+            ["SELECT * FROM (SELECT rowid FROM {0}.creators_trigram "
+             "WHERE creators_trigram MATCH ? LIMIT 5000)".format(schema)] * len(grams))
+        query = (
+            "SELECT rowid, name FROM {0}.creators_trigram WHERE rowid IN ("
+            "SELECT rowid FROM ({1}) GROUP BY rowid ORDER BY COUNT(*) DESC, rowid LIMIT {2})"
+        ).format(schema, subquery, max(100, 10*limit))
+        params = ["\"{}\"".format(gram.replace("\"", "\"\"")) for gram in grams]
+    else:
+        query = "SELECT rowid, name FROM {0}.creators_trigram WHERE ".format(schema)
+
+        if len(folded) >= 3:  # a quoted key matches all names containing it
+            query += "creators_trigram MATCH ?"
+            params = ["\"{}\"".format(folded.replace("\"", "\"\""))]
+        else:  # no trigram in the key; scan the index
+            query += "name LIKE ? ESCAPE '\\'"
+            params = ["%{}%".format(escaped)]
+
+        if mode == "prefix":
+            query += " AND (' ' || name) LIKE ? ESCAPE '\\'"
+            params.append("% {}%".format(escaped))
+
+        query += " LIMIT {}".format(max(500, 50*limit))
+
+    with _span("index.creators_trigram.query") as stage:
+        found = bool(folded and params)  # an empty key or no known trigram matches nothing
+        candidates = conn.execute(query + ";", tuple(params)).fetchall() if found else []
+        stage.rows = len(candidates)
+
+    with _span("index.creators_trigram.rank"):
+        ranked = []
+        for creator_id, name in candidates:
+            distance = _name_distance(folded, name, mode)
+            if distance is not None:
+                ranked.append((distance, creator_id))
+        ranked = sorted(ranked)[:limit]
+
+    ids = ",".join(str(creator_id) for _, creator_id in ranked)
+
+    if items:
+        distances = {creator_id: distance for distance, creator_id in ranked}
+        closest = {}
+        for item_id, creator_id in conn.execute(
+                "SELECT itemID, creatorID FROM itemCreators WHERE creatorID IN ({});".format(ids)):
+            distance = distances[creator_id]
+            closest[item_id] = min(closest.get(item_id, distance), distance)
+        return pandas.DataFrame.from_records(
+            sorted(closest.items(), key=lambda item: item[::-1]), columns=["itemID", "distance"])
+
+    names = {row[0]: row[1:] for row in conn.execute(
+        "SELECT creatorID, firstName, lastName FROM creators WHERE creatorID IN ({});".format(ids))}
+
+    return pandas.DataFrame.from_records(
+        [(creator_id, *names.get(creator_id, (None, None)), distance)
+         for distance, creator_id in ranked],
+        columns=["creatorID", "firstName", "lastName", "distance"]
+    )
+
+
+def _name_distance(key: str, name: str, mode: str) -> typing.Optional[int]:
+    """The edit distance between a folded key and the closest of a folded name and its words.
+
+    Returns None if the name does not match in the mode. For internal use.
+    """
+
+    words = [name] + name.split()
+
+    if mode == "fuzzy":
+        tolerance = max(1, len(key)//3)
+        distances = [
+            edit_distance(key, word, tolerance)
+            for word in words if abs(len(word)-len(key)) <= tolerance
+        ]
+        distance = min(distances, default=tolerance+1)
+        return distance if distance <= tolerance else None
+
+    # a word containing the key differs from the key by only insertions
+    if mode == "prefix":
+        distances = [len(word) - len(key) for word in words if word.startswith(key)]
+    else:
+        distances = [len(word) - len(key) for word in words if key in word]
+
+    return min(distances, default=None)
@@ -0,0 +1,198 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+# vim:fenc=utf-8
+#
+# Copyright © 2020 Pi-Yueh Chuang <pychuang@pm.me>
+#
+# Distributed under terms of the BSD 3-Clause license.
+
+"""Instrumentation of SQL statements and post-processing stages.
+
+Usage:
+
+    with db.profile(explain=True) as prof:
+        db.get_docs()
+    print(prof.report())
+
+SQL statements are recorded through SQLAlchemy event listeners installed on an engine (see
+`install`). Post-processing stages are recorded by `span`s in this package's functions. Both are
+no-ops when no `Profiler` is active in the current context.
+"""
+import time
+import typing
+import contextlib
+import contextvars
+
+# the profiler active in the current context
+_current: contextvars.ContextVar = contextvars.ContextVar("zoteroutils_profiler", default=None)
+
+
+class Span:
+    """A timed stage. Code inside the stage can set `rows` to report the size of its results."""
+    # pylint: disable=too-few-public-methods
+
+    def __init__(self, name: str):
+        self.name: str = name
+        self.rows: typing.Optional[int] = None
+
+
+class Profiler:
+    """Collect timings of SQL statements and post-processing stages.
+
+    A profiler is active inside its `with` block (including nested function calls).
+
+    Parameters
+    ----------
+    callback : None or callable
+        Called with each event (a dict, see `events`) when the event finishes. Use this to feed
+        events into other metric systems.
+    explain : bool
+        Whether to capture `EXPLAIN QUERY PLAN` of every SELECT statement.
+
+    Attributes
+    ----------
+    events : list of dict
+        The finished events. Keys: "kind" ("sql" or "span"), "name" (the statement or the span
+        name), "start" (seconds since the profiler was entered), "seconds", "rows", and "plan".
+        For SQL statements, "seconds" covers executing the statement up to the first row, and
+        "rows" is `cursor.rowcount`, i.e., None for SELECT statements. The spans around queries
+        report the numbers of fetched rows instead.
+    """
+
+    def __init__(self, callback: typing.Optional[typing.Callable[[dict], None]] = None,
+                 explain: bool = False):
+        self.callback = callback
+        self.explain: bool = explain
+        self.events: typing.List[dict] = []
+        self._origin: float = time.perf_counter()
+        self._token = None
+
+    def __enter__(self):
+        self._origin = time.perf_counter()
+        self._token = _current.set(self)
+        return self
+
+    def __exit__(self, *args):
+        _current.reset(self._token)
+        self._token = None
+
+    def record(self, kind: str, name: str, start: float, seconds: float,
+               rows: typing.Optional[int] = None, plan: typing.Optional[typing.List[str]] = None):
+        """Record a finished event. `start` is from `time.perf_counter`."""
+        # pylint: disable=too-many-arguments
+        event = dict(
+            kind=kind, name=name, start=start-self._origin, seconds=seconds, rows=rows, plan=plan)
+        self.events.append(event)
+
+        if self.callback is not None:
+            self.callback(event)
+
+    def report(self):
+        """Returns all events as a pandas.DataFrame, one row per event."""
+        import pandas
+        columns = ["kind", "name", "start", "seconds", "rows", "plan"]
+        return pandas.DataFrame.from_records(self.events, columns=columns)
+
+    def summary(self):
+        """Returns a pandas.DataFrame of total time, number of calls, and rows of each event name.
+
+        Rows are sorted by the total time in descending order.
+        """
+        report = self.report()
+        results = report.groupby(["kind", "name"], sort=False).agg(
+            seconds=("seconds", "sum"), calls=("seconds", "size"),
+            rows=("rows", lambda rows: rows.sum(min_count=1)))
+        return results.sort_values("seconds", ascending=False)
+
+
+def active() -> typing.Optional[Profiler]:
+    """Returns the profiler active in the current context, or None."""
+    return _current.get()
+
+
+@contextlib.contextmanager
+def span(name: str):
+    """A context manager recording a stage to the active profiler, if any.
+
+    Parameters
+    ----------
+    name : str
+        The name of the stage, e.g., "read.author.postprocess".
+
+    Yields
+    ------
+    Span
+        Set its `rows` attribute to report the number of rows the stage produced.
+    """
+    profiler = _current.get()
+    stage = Span(name)
+
+    if profiler is None:
+        yield stage
+        return
+
+    start = time.perf_counter()
+    try:
+        yield stage
+    finally:
+        profiler.record("span", name, start, time.perf_counter()-start, stage.rows)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    """SQLAlchemy listener: capture the query plan and the start time."""
+    # pylint: disable=unused-argument, too-many-arguments
+    profiler = _current.get()
+
+    if profiler is None:
+        return
+
+    plan = None
+    select = statement.lstrip()[:6].upper() in ["SELECT", "WITH"]
+    if profiler.explain and select and not executemany:
+        try:
+            rows = cursor.connection.execute("EXPLAIN QUERY PLAN " + statement, parameters)
+            plan = [row[-1] for row in rows.fetchall()]
+        except Exception:  # pylint: disable=broad-except
+            plan = None
+
+    conn.info.setdefault("zoteroutils.profiler", []).append((statement, time.perf_counter(), plan))
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    """SQLAlchemy listener: record the statement to the active profiler."""
+    # pylint: disable=unused-argument, too-many-arguments
+    profiler = _current.get()
+    stack = conn.info.get("zoteroutils.profiler")
+
+    if profiler is None or not stack:
+        return
+
+    _, start, plan = stack.pop()
+    rows = cursor.rowcount if cursor.rowcount is not None and cursor.rowcount >= 0 else None
+    profiler.record("sql", statement.strip(), start, time.perf_counter()-start, rows, plan)
+
+
+def _handle_error(context):
+    """SQLAlchemy listener: discard the start time of a statement that raised."""
+    stack = context.connection.info.get("zoteroutils.profiler") if context.connection else None
+
+    if stack and stack[-1][0] == context.statement:
+        stack.pop()
+
+
+def install(engine):
+    """Install the listeners recording SQL statements on a sqlalchemy.engine.Engine.
+
+    `Database` installs them on its own engine. The listeners do nothing unless a `Profiler` is
+    active.
+
+    Parameters
+    ----------
+    engine : sqlalchemy.engine.Engine
+    """
+    from sqlalchemy import event
+
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(engine, "handle_error", _handle_error)
@@ -23,6 +23,10 @@ queries.all_items_types = "SELECT * FROM items WHERE itemTypeID IN ({0})"
 queries.all_items_not_types = "SELECT * FROM items WHERE itemTypeID NOT IN ({0})"
 queries.itemdata_fields = "SELECT * FROM itemData WHERE itemID In ({0}) AND fieldID IN ({1})"
 queries.all_itemdata_fields = "SELECT * FROM itemData WHERE fieldID IN ({0})"
+queries.all_type_map = "SELECT typeName, itemTypeID FROM itemTypes"
+queries.all_field_map = "SELECT fieldName, fieldID FROM fieldsCombined"
+queries.all_creator_type_map = "SELECT creatorType, creatorTypeID FROM creatorTypes"
+queries.schema_versions = "SELECT schema, version FROM version ORDER BY schema"
 
 # short hand for frequently used combination when requesting brief information
 short_info = DummyDict()
@@ -8,6 +8,7 @@
 
 """Functions that process data."""
 import typing
+from pathlib import PurePath as _PurePath
 import pandas
 
 
@@ -44,3 +45,175 @@ def authors_agg(data: typing.Sequence[str]) -> str:
 def extract_year(data: typing.Union[pandas.Series, pandas.DataFrame]):
     """Extract only the year from date-time strings."""
     return data.replace(r"(?P<year>\d{4}).*", r"\g<year>", regex=True)
+
+
+def authors_short(
+    count: pandas.Series, first: pandas.Series, second: pandas.Series
+) -> pandas.Series:
+    """Vectorized version of `authors_agg` using precomputed author counts and last names.
+
+    Parameters
+    ----------
+    count : pandas.Series
+        The numbers of authors.
+    first : pandas.Series
+        The first authors' last names. Missing values are allowed when `count` is 0.
+    second : pandas.Series
+        The second authors' last names. Missing values are allowed when `count` is less than 2.
+
+    Returns
+    -------
+    pandas.Series of str
+        Same as applying `authors_agg` to each document.
+    """
+
+    first = first.astype(object).fillna("")
+    second = second.astype(object).fillna("")
+    results = first.where(count < 3, first + " et al.")
+    results = results.where(count != 2, first + " and " + second)
+    return results.rename("author")
+
+
+def authors_summary(data: pandas.Series) -> pandas.DataFrame:
+    """Summarize authors' last names of each document without creating per-document lists.
+
+    Parameters
+    ----------
+    data : pandas.Series
+        Authors' last names, one author per row, sorted by authors' order. Indices are the
+        documents' `itemID`s.
+
+    Returns
+    -------
+    pandas.DataFrame
+        The indices are `itemID`s, and the columns are "author count", "first author",
+        "second author", and "author". The last one is the same as applying `authors_agg`.
+    """
+
+    groups = data.groupby(level=0, sort=True)
+
+    results = groups.size().rename("author count").to_frame()
+    results["first author"] = groups.nth(0)
+    results["second author"] = groups.nth(1)
+    results["author"] = authors_short(
+        results["author count"], results["first author"], results["second author"])
+
+    return results
+
+
+def _arrow_dtypes() -> typing.Tuple[str, typing.Optional[typing.Callable]]:
+    """Returns the dtype of compact strings and a function making list-typed Arrow arrays.
+
+    Strings are Arrow-backed if pyarrow is installed. List-typed Arrow columns need pandas 2 to be
+    usable (e.g., printed), so the function is None with older pandas or without pyarrow.
+    """
+    try:
+        import pyarrow  # pylint: disable=import-outside-toplevel
+    except ImportError:
+        return "string", None
+
+    if int(pandas.__version__.split(".")[0]) < 2:
+        return "string[pyarrow]", None
+
+    def to_lists(values):
+        return pandas.arrays.ArrowExtensionArray(
+            pyarrow.array(values, type=pyarrow.list_(pyarrow.string())))
+
+    return "string[pyarrow]", to_lists
+
+
+def _str_list(value: typing.Any) -> typing.List[str]:
+    """A list of strings from a list (kept if all are strings), a missing value, or a scalar."""
+    if isinstance(value, list):
+        return value if all(isinstance(val, str) for val in value) else [str(val) for val in value]
+    return [] if pandas.isna(value) else [str(value)]
+
+
+def compact_docs(docs: pandas.DataFrame) -> pandas.DataFrame:
+    """Convert the results of `Database.get_docs` to memory-compact dtypes.
+
+    * "document type" and "publication title": categorical.
+    * "author" (short names) and "title": strings, Arrow-backed if pyarrow is installed.
+    * "year": nullable 16-bit integers.
+    * "time added": datetime64 in UTC.
+    * "author" (lists of names) and "attachment path": list-typed Arrow columns of strings if
+      pyarrow and pandas 2 are available; otherwise lists of plain strings. Single paths become
+      strings with `attachment_output="explode"`.
+
+    Empty strings, which `get_docs` uses for missing values, become missing values. Other columns
+    are kept as they are.
+
+    Parameters
+    ----------
+    docs : pandas.DataFrame
+        The results of `Database.get_docs` or `read.get_docs_single_pass`.
+
+    Returns
+    -------
+    pandas.DataFrame
+        A new dataframe with the same index and columns.
+    """
+
+    string, to_lists = _arrow_dtypes()
+    results = docs.copy(deep=False)
+
+    def missing(column):
+        return docs[column].mask(docs[column].eq(""))
+
+    for column in ["document type", "publication title"]:
+        if column in docs:
+            results[column] = missing(column).astype("category")
+
+    if "title" in docs:
+        results["title"] = missing("title").astype(string)
+
+    if "year" in docs:
+        results["year"] = pandas.to_numeric(missing("year"), errors="coerce").astype("Int16")
+
+    if "time added" in docs:
+        results["time added"] = pandas.to_datetime(missing("time added"), errors="coerce", utc=True)
+
+    for column in ["author", "attachment path"]:
+        if column not in docs:
+            continue
+
+        values = missing(column)
+        nested = values.map(lambda value: isinstance(value, (list, _PurePath)))
+
+        if not nested.any():  # plain strings, e.g., short names or `attachment_output="explode"`
+            results[column] = values.astype(string)
+            continue
+
+        # a list of strings per document; documents without authors or attachments get []
+        values = values.map(_str_list)
+
+        results[column] = values if to_lists is None else pandas.Series(
+            to_lists(values.to_list()), index=values.index)
+
+    return results
+
+
+def memory_report(**frames: pandas.DataFrame) -> pandas.DataFrame:
+    """Compare the memory usage of dataframes column by column, e.g., of the two `get_docs` modes.
+
+    Parameters
+    ----------
+    **frames : pandas.DataFrame
+        The dataframes to compare, e.g., `memory_report(default=docs, compact=compact_docs(docs))`.
+
+    Returns
+    -------
+    pandas.DataFrame
+        The deep memory usage in bytes of each column (rows; "Index" is the index) and in total
+        (the last row, "total") of each dataframe (columns), plus the dtypes of each dataframe's
+        columns in the columns "<name> dtype".
+    """
+
+    usages = {name: frame.memory_usage(index=True, deep=True) for name, frame in frames.items()}
+    results = pandas.DataFrame(usages)
+    results.loc["total"] = results.sum()
+
+    for name, frame in frames.items():
+        results["{} dtype".format(name)] = frame.dtypes.astype(str)
+
+    return results
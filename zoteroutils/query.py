@@ -0,0 +1,360 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+# vim:fenc=utf-8
+#
+# Copyright © 2020 Pi-Yueh Chuang <pychuang@pm.me>
+#
+# Distributed under terms of the BSD 3-Clause license.
+
+"""Compound searches combining author, field, full-text, and type filters.
+
+A query is either a string, e.g.,
+
+    author:smith fulltext:"navier stokes" AND (type:journalArticle OR type:thesis) NOT title:review
+
+or a tree of `Term`, `And`, `Or`, and `Not`, e.g.,
+
+    And((Term("author", "smith"), Term("fulltext", "navier stokes"), Not(Term("title", "review"))))
+
+In query strings, terms next to each other are combined with AND, which binds tighter than OR.
+The fields of terms are:
+
+* `author`: creators' names;
+* `title`: documents' titles;
+* `fulltext`: attachments' full texts (matching the attachments' parents);
+* `type`: item type names, e.g., "journalArticle";
+* `field` (the default of terms without a field): all fields.
+
+A colon only separates the field from the value if it follows one of these names. Otherwise, it is
+part of the value, e.g., `http://example.com` is a value of the default field. Values with
+multiple words (quoted in query strings) match items having all the words, as whole words. Searches
+use the persistent indices in the sidecar database (see `zoteroutils.index`). The filters of an
+AND are run from the most selective one, and each filter only considers the items that passed the
+previous filters.
+"""
+import re
+import typing
+import pandas
+import sqlalchemy
+from .instrument import span as _span
+from .read import load_item_ids as _load_item_ids
+
+FIELDS = ["author", "title", "fulltext", "type", "field"]
+
+# a parenthesis, or a term with an optional field and a quoted or bare value
+_TOKEN = re.compile(
+    r'\s*(?:(?P<paren>[()])|(?:(?P<field>\w+):)?(?:"(?P<phrase>[^"]*)"|(?P<word>[^\s()"]+)))')
+
+
+class Term(typing.NamedTuple):
+    """A filter matching items whose `field` contains all words in `value`."""
+    field: str
+    value: str
+
+
+class And(typing.NamedTuple):
+    """Items matching all children."""
+    children: tuple
+
+
+class Or(typing.NamedTuple):
+    """Items matching any of the children."""
+    children: tuple
+
+
+class Not(typing.NamedTuple):
+    """Items not matching the child."""
+    child: typing.Any
+
+
+Node = typing.Union[Term, And, Or, Not]
+
+# the FTS tables in the sidecar database searched by each field; others search "fields_fts"
+_TABLES = {"author": "authors_fts", "fulltext": "fulltext_fts"}
+
+
+def _quote(word: str) -> str:
+    """Quote a word as an FTS5 string."""
+    return "\"{}\"".format(word.replace("\"", "\"\""))
+
+
+def parse(text: str) -> Node:
+    """Parse a query string into a tree of `Term`, `And`, `Or`, and `Not`.
+
+    Parameters
+    ----------
+    text : str
+        The query string. See the module's docstring for the syntax.
+
+    Returns
+    -------
+    Term, And, Or, or Not
+    """
+
+    tokens = []
+    position = 0
+    text = text.rstrip()
+
+    while position < len(text):
+        match = _TOKEN.match(text, position)
+        if match is None or match.end() == position:
+            raise ValueError("Invalid query at position {}: {}".format(position, text))
+
+        position = match.end()
+
+        if match.group("paren") is not None:
+            tokens.append(match.group("paren"))
+        elif match.group("field") is None and match.group("word") in ["AND", "OR", "NOT"]:
+            tokens.append(match.group("word"))
+        else:
+            field = "field" if match.group("field") is None else match.group("field").lower()
+            value = match.group("word") if match.group("phrase") is None else match.group("phrase")
+            if field not in FIELDS:  # not a field, e.g., "http://..."; the colon is in the value
+                field, value = "field", match.group("field") + ":" + value
+            tokens.append(Term(field, value))
+
+    node, position = _parse_or(tokens, 0)
+
+    if position != len(tokens):
+        raise ValueError("Unexpected token in query: {}".format(tokens[position]))
+
+    return node
+
+
+def _parse_or(tokens: list, position: int) -> typing.Tuple[Node, int]:
+    """or := and ("OR" and)*. For internal use."""
+    children = []
+    while True:
+        child, position = _parse_and(tokens, position)
+        children.append(child)
+        if position < len(tokens) and tokens[position] == "OR":
+            position += 1
+        else:
+            return (children[0] if len(children) == 1 else Or(tuple(children))), position
+
+
+def _parse_and(tokens: list, position: int) -> typing.Tuple[Node, int]:
+    """and := not (["AND"] not)*. For internal use."""
+    children = []
+    while True:
+        child, position = _parse_not(tokens, position)
+        children.append(child)
+        if position < len(tokens) and tokens[position] == "AND":
+            position += 1
+        elif position >= len(tokens) or tokens[position] in ["OR", ")"]:
+            return (children[0] if len(children) == 1 else And(tuple(children))), position
+
+
+def _parse_not(tokens: list, position: int) -> typing.Tuple[Node, int]:
+    """not := "NOT" not | "(" or ")" | term. For internal use."""
+
+    if position >= len(tokens):
+        raise ValueError("Unexpected end of query")
+
+    token = tokens[position]
+
+    if token == "NOT":
+        child, position = _parse_not(tokens, position+1)
+        return Not(child), position
+
+    if token == "(":
+        child, position = _parse_or(tokens, position+1)
+        if position >= len(tokens) or tokens[position] != ")":
+            raise ValueError("Unbalanced parentheses in query")
+        return child, position + 1
+
+    if isinstance(token, Term):
+        return token, position + 1
+
+    raise ValueError("Unexpected token in query: {}".format(token))
+
+
+class _Planner:
+    """Estimates and evaluates query trees on a connection. For internal use."""
+
+    def __init__(self, conn: sqlalchemy.engine.Connection, schema: str, mapping: dict):
+        self.conn = conn
+        self.schema = schema
+        self.mapping = mapping
+        self.types = {name.lower(): i for name, i in conn.execute(
+            "SELECT typeName, itemTypeID FROM itemTypes;")}
+        self.estimates: typing.Dict[Node, int] = {}
+        self._universe = None
+
+    @property
+    def universe(self) -> typing.Set[int]:
+        """The itemIDs of all documents, i.e., not attachments or notes. Loaded when first used."""
+        if self._universe is None:
+            self._universe = {row[0] for row in self.conn.execute(
+                "SELECT itemID FROM items WHERE itemTypeID NOT IN (?, ?);",
+                (self.types["attachment"], self.types["note"]))}
+        return self._universe
+
+    def documents(self, item_ids: typing.Set[int]) -> typing.Set[int]:
+        """The itemIDs of documents among the given itemIDs."""
+        if not item_ids:
+            return set()
+        if self._universe is not None:
+            return item_ids & self._universe
+        return {row[0] for row in self.conn.execute(
+            "SELECT itemID FROM items WHERE itemID IN ({}) AND itemTypeID NOT IN (?, ?);"
+            .format(_load_item_ids(self.conn, sorted(item_ids))),
+            (self.types["attachment"], self.types["note"]))}
+
+    def _type_id(self, value: str) -> int:
+        """The itemTypeID of a type name."""
+        try:
+            return self.types[value.lower()]
+        except KeyError as err:
+            raise ValueError("Unrecognized item type: {}".format(value)) from err
+
+    def estimate(self, node: Node) -> int:
+        """An upper bound of the number of items matching a node."""
+
+        if node in self.estimates:
+            return self.estimates[node]
+
+        if isinstance(node, Term) and node.field == "type":
+            result = self.conn.execute(
+                "SELECT COUNT(*) FROM items WHERE itemTypeID = ?;",
+                (self._type_id(node.value),)).fetchone()[0]
+        elif isinstance(node, Term):  # the number of rows having the rarest word
+            table = _TABLES.get(node.field, "fields_fts")
+            result = min([
+                self.conn.execute(
+                    "SELECT COUNT(*) FROM {0}.{1} WHERE {1} MATCH ?;".format(self.schema, table),
+                    (_quote(word),)).fetchone()[0]
+                for word in node.value.split()
+            ], default=0)
+        elif isinstance(node, And):
+            result = min([
+                self.estimate(child) for child in node.children if not isinstance(child, Not)
+            ], default=len(self.universe))
+        elif isinstance(node, Or):
+            result = sum(self.estimate(child) for child in node.children)
+        else:
+            result = len(self.universe)
+
+        self.estimates[node] = result
+        return result
+
+    def evaluate(self, node: Node, candidates: typing.Optional[typing.Set[int]]) -> typing.Set[int]:
+        """The itemIDs matching a node among the candidates (all items if None)."""
+
+        if isinstance(node, Term):
+            with _span("query.{}".format(node.field)) as stage:
+                found = self._term(node, candidates)
+                found = found if candidates is None else found & candidates
+                stage.rows = len(found)
+            return found
+
+        if isinstance(node, Or):
+            return set().union(*[self.evaluate(child, candidates) for child in node.children])
+
+        if isinstance(node, Not):
+            base = self.universe if candidates is None else candidates
+            return base - self.evaluate(node.child, base)
+
+        # And: the most selective filters first; negations last, only on what is left
+        positives = [child for child in node.children if not isinstance(child, Not)]
+        negatives = [child for child in node.children if isinstance(child, Not)]
+
+        with _span("query.estimate"):
+            positives = sorted(positives, key=self.estimate)
+
+        for child in positives:
+            candidates = self.evaluate(child, candidates)
+            if not candidates:
+                return set()
+
+        candidates = self.universe if candidates is None else candidates
+        for child in negatives:
+            candidates = candidates - self.evaluate(child.child, candidates)
+
+        return candidates
+
+    def _term(self, node: Term, candidates: typing.Optional[typing.Set[int]]) -> typing.Set[int]:
+        """The itemIDs matching a term; candidates only narrow down the search."""
+
+        # looking up candidates one by one is cheaper than reading all matches only if they are few;
+        # a lookup costs a few times more than reading a match
+        ids = None
+        if candidates is not None and len(candidates) * 4 < self.estimate(node):
+            ids = _load_item_ids(self.conn, sorted(candidates))
+
+        if node.field == "type":
+            query = "SELECT itemID FROM items WHERE itemTypeID = ?"
+            query += "" if ids is None else " AND itemID IN ({})".format(ids)
+            return {row[0] for row in self.conn.execute(query, (self._type_id(node.value),))}
+
+        keys = " ".join(_quote(word) for word in node.value.split())
+        if not keys:
+            return set()
+
+        table = _TABLES.get(node.field, "fields_fts")
+
+        if node.field == "fulltext":  # attachments' rows; the results are their parents
+            query = """
+                SELECT parentItemID FROM {0}.fulltext_fts
+                INNER JOIN itemAttachments ON itemAttachments.itemID = fulltext_fts.rowid
+                WHERE fulltext_fts MATCH ? AND parentItemID IS NOT NULL
+            """.format(self.schema)
+            if ids is not None:
+                query += " AND fulltext_fts.rowid IN (" \
+                    "SELECT itemID FROM itemAttachments WHERE parentItemID IN ({}))".format(ids)
+        else:
+            query = "SELECT rowid FROM {0}.{1} WHERE {1} MATCH ?".format(self.schema, table)
+            query += "" if ids is None else " AND rowid IN ({})".format(ids)
+
+        found = {row[0] for row in self.conn.execute(query, (keys,))}
+
+        if node.field != "title" or not found:
+            return found
+
+        # the field index does not know which field matched; match the titles of the matches
+        # with an FTS table of the same tokenizer, so words only match whole tokens
+        self.conn.execute("CREATE VIRTUAL TABLE IF NOT EXISTS temp.zu_titles USING FTS5(title);")
+        self.conn.execute("DELETE FROM temp.zu_titles;")
+        self.conn.execute("""
+            INSERT INTO temp.zu_titles(rowid, title)
+            SELECT itemID, value FROM itemData INNER JOIN itemDataValues USING(valueID)
+            WHERE fieldID = ? AND itemID IN ({});
+        """.format(_load_item_ids(self.conn, sorted(found))), (self.mapping["title"],))
+
+        return {row[0] for row in self.conn.execute(
+            "SELECT rowid FROM temp.zu_titles WHERE zu_titles MATCH ?;", (keys,))}
+
+
+def search(
+    conn: sqlalchemy.engine.Connection,
+    query: typing.Union[str, Node],
+    schema: str = "zindex",
+    **mapping
+) -> pandas.DataFrame:
+    """Search documents with a compound query using the persistent indices.
+
+    Call `zoteroutils.index.update_index` (and `update_fulltext_index` for `fulltext` terms)
+    first to bring the indices up-to-date.
+
+    Parameters
+    ----------
+    conn : sqlalchemy.engine.Connection
+        Connection object to Zotero's database, with the sidecar database attached.
+    query : str, or a tree of Term, And, Or, and Not
+        The query. See the module's docstring.
+    schema : str
+        The schema name of the attached sidecar database.
+    **mapping : keyword-values
+        The mapping from field names to field IDs. Only "title" is required.
+
+    Returns
+    -------
+    pandas.DataFrame
+        A dataframe with only `itemID`s of documents (i.e., not attachments or notes), sorted.
+    """
+
+    node = parse(query) if isinstance(query, str) else query
+    planner = _Planner(conn, schema, mapping)
+    found = planner.documents(planner.evaluate(node, None))
+
+    return pandas.DataFrame({"itemID": sorted(found)}, dtype=int)
@@ -10,8 +10,10 @@
 Functions in this module are those related to reading data from SQLite database.
 """
 # standard libraries
+from os import sep as _sep
 from re import sub as _sub
 from pathlib import Path as _Path
+from typing import Iterator as _Iterator
 from typing import List as _List
 from typing import Optional as _Optional
 from typing import Sequence as _Sequence
@@ -19,12 +21,72 @@ from typing import Callable as _Callable
 from typing import Union as _Union
 
 # additionally installed libraries
+import numpy as _numpy
 import pandas
 from sqlalchemy.engine import Connection as ConnType  # for type hinting
 
+# functions from this package
+from .instrument import span as _span
+from .misc import queries as _queries
+from .process import authors_short as _authors_short
+from .process import authors_summary as _authors_summary
+
 # a type hint for path-like object
 _PathLike = _Union[str, _Path]
 
+# the subquery selecting the itemIDs loaded by `load_item_ids`
+ITEM_IDS = "SELECT itemID FROM temp.zu_item_ids"
+
+
+def _read_sql(name: str, query: str, conn: ConnType, **kwargs) -> pandas.DataFrame:
+    """`pandas.read_sql_query` recorded as the span `name` when profiling. For internal use."""
+    with _span(name) as stage:
+        results: pandas.DataFrame = pandas.read_sql_query(query, conn, **kwargs)
+        stage.rows = len(results)
+    return results
+
+
+def load_item_ids(conn: ConnType, itemIDs: _Sequence[_Union[str, int]]) -> str:
+    """Load itemIDs into an indexed temporary table of the connection.
+
+    Readers join against this table instead of splicing the itemIDs into SQL strings, so query
+    strings stay short and constant regardless of how many itemIDs are selected. The table is
+    only rewritten when the itemIDs differ from those loaded last time on the same connection.
+    Inside a transaction of the caller, the table is always rewritten and not remembered, because
+    rolling back the transaction would restore the previous contents.
+
+    Parameters
+    ----------
+    conn : sqlalchemy.engine.Connection
+        The connection object to the database.
+    itemIDs : list-like of str or int
+        The itemIDs to load.
+
+    Returns
+    -------
+    str
+        The subquery selecting the loaded itemIDs, i.e., `ITEM_IDS`.
+    """
+
+    itemIDs = tuple(map(int, itemIDs))
+
+    if conn.info.get("zoteroutils.item_ids") == itemIDs:
+        return ITEM_IDS
+
+    conn.execute("CREATE TEMP TABLE IF NOT EXISTS zu_item_ids (itemID INTEGER PRIMARY KEY);")
+    conn.execute("DELETE FROM temp.zu_item_ids;")
+
+    if itemIDs:
+        conn.execute(
+            "INSERT OR IGNORE INTO temp.zu_item_ids VALUES (?);", [(i,) for i in itemIDs])
+
+    if conn.in_transaction():
+        conn.info.pop("zoteroutils.item_ids", None)
+    else:  # committed already
+        conn.info["zoteroutils.item_ids"] = itemIDs
+
+    return ITEM_IDS
+
 
 def get_table_names(conn: ConnType) -> _List[str]:
     """Returns the names of all tables in the database.
@@ -91,9 +153,9 @@ def get_item_types_mapping(conn: ConnType):
     id2doctype : dict of (int, str)
         Mapping from document type ids to string names.
     """
-    temp = pandas.read_sql_table("itemTypes", conn, columns=["typeName", "itemTypeID"])
-    doctype2id = temp.set_index("typeName")["itemTypeID"].to_dict()
-    id2doctype = temp.set_index("itemTypeID")["typeName"].to_dict()
+    temp = conn.execute(_queries.all_type_map).fetchall()
+    doctype2id = {name: i for name, i in temp}
+    id2doctype = {i: name for name, i in temp}
     return doctype2id, id2doctype
 
 
@@ -112,9 +174,9 @@ def get_field_names_mapping(conn: ConnType):
     id2field : dict of (int, str)
         Mapping from field ids to string names.
     """
-    temp = pandas.read_sql_table("fieldsCombined", conn, columns=["fieldID", "fieldName"])
-    field2id = temp.set_index("fieldName")["fieldID"].to_dict()
-    id2field = temp.set_index("fieldID")["fieldName"].to_dict()
+    temp = conn.execute(_queries.all_field_map).fetchall()
+    field2id = {name: i for name, i in temp}
+    id2field = {i: name for name, i in temp}
     return field2id, id2field
 
 
@@ -133,9 +195,9 @@ def get_creator_types_mapping(conn: ConnType):
     id2creatortype : dict of (int, str)
         Mapping from creater type id to string names.
     """
-    temp = pandas.read_sql_table("creatorTypes", conn, columns=["creatorTypeID", "creatorType"])
-    creatortype2id = temp.set_index("creatorType")["creatorTypeID"].to_dict()
-    id2creatortype = temp.set_index("creatorTypeID")["creatorType"].to_dict()
+    temp = conn.execute(_queries.all_creator_type_map).fetchall()
+    creatortype2id = {name: i for name, i in temp}
+    id2creatortype = {i: name for name, i in temp}
     return creatortype2id, id2creatortype
 
 
@@ -167,6 +229,206 @@ def get_all_names(conn: ConnType, split=False):
     return data
 
 
+def get_item_creators(conn: ConnType, **mapping: int) -> pandas.DataFrame:
+    """Returns one row per item and creator in the order of creators.
+
+    Parameters
+    ----------
+    conn : sqlalchemy.engine.Connection
+        The connection object to the database.
+    **mapping : keyword-values
+        The mapping from creator type names to creator type IDs, e.g., `Database.creatortype2id`.
+
+    Returns
+    -------
+    pandas.DataFrame
+        Columns "itemID", "orderIndex", "creator type" (categorical), "first name", and
+        "last name".
+    """
+    results = _read_sql("read.creators.query", """
+        SELECT itemID, orderIndex, creatorTypeID, firstName, lastName
+        FROM itemCreators INNER JOIN creators USING(creatorID)
+        ORDER BY itemID, orderIndex;
+    """, conn)
+
+    types = pandas.Series({i: name for name, i in mapping.items()}, dtype=object)
+    results["creatorTypeID"] = results["creatorTypeID"].map(types).astype("category")
+
+    return results.rename(columns={
+        "creatorTypeID": "creator type", "firstName": "first name", "lastName": "last name"})
+
+
+def iter_doc_ids(
+        conn: ConnType, chunksize: int, attachment: int, note: int, **kwargs: int
+) -> _Iterator[_List[int]]:
+    """Iterate through the itemIDs of all documents in ascending chunks.
+
+    Chunks are fetched with keyset pagination (`itemID > last_id ORDER BY itemID LIMIT n`), so
+    only one chunk of itemIDs is in memory at a time. Each chunk can be passed to the `itemIDs`
+    argument of other readers, e.g., `get_doc_titles`.
+
+    Parameters
+    ----------
+    conn : sqlalchemy.engine.Connection
+        The connection object to the database.
+    chunksize : int
+        The maximum number of itemIDs in each chunk. Must be positive.
+    attachment : int
+        The ID of the item type *attachment*.
+    note : int
+        The ID of the item type *note*.
+    **kwargs : int
+        Not used. Just to conform the signature with other similar functions.
+
+    Yields
+    ------
+    list of int
+        The itemIDs in a chunk.
+    """
+    # pylint: disable=unused-argument
+
+    if chunksize < 1:
+        raise ValueError("chunksize must be a positive integer: {}".format(chunksize))
+
+    query = """
+        SELECT itemID FROM items
+        WHERE itemID > ? AND itemTypeID <> {attachment} AND itemTypeID <> {note}
+        ORDER BY itemID LIMIT ?;
+    """.format(attachment=attachment, note=note)
+
+    last = -1
+    while True:
+        chunk = [row[0] for row in conn.execute(query, (last, chunksize)).fetchall()]
+
+        if not chunk:
+            return
+
+        yield chunk
+        last = chunk[-1]
+
+
+def get_high_water_mark(conn: ConnType) -> dict:
+    """Returns the current high-water mark of changes to items, creators, and the trash.
+
+    Pass the mark to `get_changed_doc_ids` later to find the documents changed since then. Read
+    the mark before reading the documents, so changes made while reading are not missed.
+
+    Parameters
+    ----------
+    conn : sqlalchemy.engine.Connection
+        The connection object to the database.
+
+    Returns
+    -------
+    dict
+        Keys: "modified" (the latest `clientDateModified`), "atModified" (the number of items
+        modified at that time), "version" (the largest `version`), "maxItemID", "count" (the
+        number of items), "maxCreatorID", "deleted" (the latest `dateDeleted` of
+        `deletedItems`), and "atDeleted" (the number of items moved to the trash at that time).
+    """
+
+    row = conn.execute("""
+        SELECT
+            MAX(clientDateModified), MAX(version), MAX(itemID), COUNT(*),
+            (SELECT MAX(creatorID) FROM creators), (SELECT MAX(dateDeleted) FROM deletedItems)
+        FROM items;
+    """).fetchone()
+
+    mark = dict(zip(["modified", "version", "maxItemID", "count", "maxCreatorID", "deleted"], row))
+    mark["atModified"] = conn.execute(
+        "SELECT COUNT(*) FROM items WHERE clientDateModified = ?;", (mark["modified"],)
+    ).fetchone()[0]
+    mark["atDeleted"] = conn.execute(
+        "SELECT COUNT(*) FROM deletedItems WHERE dateDeleted = ?;", (mark["deleted"],)
+    ).fetchone()[0]
+
+    return mark
+
+
+def get_changed_doc_ids(
+        conn: ConnType, mark: dict, attachment: int, note: int, **kwargs: int
+) -> _Optional[_List[int]]:
+    """Returns the itemIDs of documents changed since a high-water mark.
+
+    A document is changed if itself or one of its attachments was added, modified, or moved to the
+    trash, or if it got a creator added to the database since the mark. Notes are not considered
+    because they are not part of the brief information of documents.
+
+    Zotero's timestamps only have a resolution of seconds. Items modified (or moved to the trash)
+    in the same second as the mark are reported (again) if the number of items modified (or moved
+    to the trash) at that time increased, so an item modified twice within that second is not
+    reported by its timestamp.
+
+    Parameters
+    ----------
+    conn : sqlalchemy.engine.Connection
+        The connection object to the database.
+    mark : dict
+        The results of `get_high_water_mark`.
+    attachment : int
+        The ID of the item type *attachment*.
+    note : int
+        The ID of the item type *note*.
+    **kwargs : int
+        Not used. Just to conform the signature with other similar functions.
+
+    Returns
+    -------
+    list of int or None
+        The sorted itemIDs, or None if items were purged from the database since the mark. Purged
+        items leave no trace, so the callers have to read all documents again in this case.
+    """
+    # pylint: disable=unused-argument
+
+    # items with larger itemIDs than the mark are new; the remaining difference is purged items
+    new, count = conn.execute(
+        "SELECT COUNT(*), (SELECT COUNT(*) FROM items) FROM items WHERE itemID > ?;",
+        (mark["maxItemID"] or 0,)
+    ).fetchone()
+
+    if count != mark["count"] + new:
+        return None
+
+    # whether items were modified in the same second as the mark after the mark was taken; items
+    # modified again later leave that second, and they are found by later timestamps
+    boundary = mark["modified"] is not None and conn.execute(
+        "SELECT COUNT(*) FROM items WHERE clientDateModified = ?;", (mark["modified"],)
+    ).fetchone()[0] > mark["atModified"]
+
+    # the same for items moved to the trash
+    trashed = mark["deleted"] is not None and conn.execute(
+        "SELECT COUNT(*) FROM deletedItems WHERE dateDeleted = ?;", (mark["deleted"],)
+    ).fetchone()[0] > mark["atDeleted"]
+
+    query = """
+        WITH changed(itemID) AS (
+            SELECT itemID FROM items
+            WHERE clientDateModified {modified} ? OR version > ? OR itemID > ?
+            UNION SELECT itemID FROM deletedItems WHERE dateDeleted {deleted} ?
+            UNION SELECT itemID FROM itemCreators WHERE creatorID > ?
+        )
+        SELECT itemID FROM items
+        WHERE itemTypeID <> {attachment} AND itemTypeID <> {note} AND itemID IN (
+            SELECT itemID FROM changed
+            UNION SELECT parentItemID FROM itemAttachments WHERE itemID IN changed
+        )
+        ORDER BY itemID;
+    """.format(
+        attachment=attachment, note=note, modified=">=" if boundary else ">",
+        deleted=">=" if trashed else ">")
+
+    params = (
+        mark["modified"] or "", mark["version"] or 0, mark["maxItemID"] or 0,
+        mark["deleted"] or "", mark["maxCreatorID"] or 0
+    )
+
+    with _span("read.changed.query") as stage:
+        results = [row[0] for row in conn.execute(query, params).fetchall()]
+        stage.rows = len(results)
+
+    return results
+
+
 def _query_factory(
     query: str,
     org_tag: str,
@@ -202,7 +464,7 @@ def _query_factory(
         ----------
         conn : sqlalchemy.engine.Connection
             The connection object to the database.
-        itemIDs : list-like of str or None
+        itemIDs : list-like of str/int or None
             The itemID of interest. If None, consider all items.
         **mapping : keyword-values
             The mapping from required keys to values used in query strings.
@@ -214,13 +476,18 @@ def _query_factory(
         """
 
         if itemIDs is not None:
-            Q = _sub("WHERE", "WHERE items.itemID in ({}) AND".format(", ".join(itemIDs)), query)
+            Q = _sub("WHERE", "WHERE items.itemID IN ({}) AND".format(
+                load_item_ids(conn, itemIDs)), query)
         else:
             Q = query
 
-        results: pandas.DataFrame = pandas.read_sql_query(Q.format(**mapping), conn)
-        results: pandas.DataFrame = results.set_index("itemID").rename({org_tag: new_tag}, axis=1)
-        results: pandas.DataFrame = after(results)
+        results: pandas.DataFrame = _read_sql(
+            "read.{}.query".format(new_tag), Q.format(**mapping), conn)
+
+        with _span("read.{}.postprocess".format(new_tag)):
+            results: pandas.DataFrame = results.set_index("itemID").rename(
+                {org_tag: new_tag}, axis=1)
+            results: pandas.DataFrame = after(results)
         return results
 
     func.__doc__ = func.__doc__.format(new_tag)  # replace the placeholder in the docstring
@@ -303,7 +570,7 @@ get_doc_added_dates: _Callable[[ConnType, int], pandas.Series] = _query_factory(
 
 def get_doc_authors(
         conn: ConnType, attachment: int, note: int, author: int,
-        itemIDs: _Optional[_Sequence[str]] = None, **kwargs: int
+        itemIDs: _Optional[_Sequence[str]] = None, output: str = "list", **kwargs: int
 ):
     """Returns the last names of the authors of all documents.
 
@@ -317,16 +584,20 @@ def get_doc_authors(
         The ID of the item type *note*.
     author : int
         The ID of the creator type *author*.
-    itemIDs : list-like of str or None
+    itemIDs : list-like of str/int or None
         The itemID of interest. If None, consider all items.
+    output : str
+        One of "list" (default), "short", and "summary". "list" gives lists of last names. "short"
+        gives strings formatted by `process.authors_agg`. "summary" gives the columns returned by
+        `process.authors_summary`. "short" and "summary" do not create per-document lists.
     **kwargs : int
         Not used. Just to conform the signature with other similar functions.
 
     Returns
     -------
     pandas.DataFrame
-        The values in the only one column are lists of strings of last names. The indices of are
-        "itemID"s.
+        With the default output, the values in the only one column are lists of strings of last
+        names. The indices of are "itemID"s.
     """
     # pylint: disable=unused-argument
 
@@ -342,21 +613,30 @@ def get_doc_authors(
     """.format(attachment=attachment, note=note, author=author)
 
     if itemIDs is not None:
-        query = _sub("WHERE", "WHERE items.itemID in ({}) AND".format(", ".join(itemIDs)), query)
+        query = _sub(
+            "WHERE", "WHERE items.itemID IN ({}) AND".format(load_item_ids(conn, itemIDs)), query)
 
-    results: pandas.DataFrame = pandas.read_sql_query(query, conn)
-    results: pandas.DataFrame = results.sort_values(["itemID", "orderIndex"])
-    results: pandas.DataFrame = results.set_index("itemID").drop(columns="orderIndex")
-    results: pandas.core.groupby.DataFrameGroupBy = results.groupby(level=0)
-    results: pandas.DataFrame = results.aggregate(lambda x: x.values.tolist())
-    results: pandas.DataFrame = results.rename(columns={"lastName": "author"})
+    results: pandas.DataFrame = _read_sql("read.author.query", query, conn)
+
+    with _span("read.author.postprocess"):
+        results: pandas.DataFrame = results.sort_values(["itemID", "orderIndex"])
+        results: pandas.Series = results.set_index("itemID")["lastName"]
+
+        if output == "list":
+            results: pandas.DataFrame = results.groupby(level=0).agg(list).to_frame("author")
+        elif output == "short":
+            results: pandas.DataFrame = _authors_summary(results)[["author"]]
+        elif output == "summary":
+            results: pandas.DataFrame = _authors_summary(results)
+        else:
+            raise ValueError("Unrecognized output: {}".format(output))
 
     return results
 
 
 def get_doc_attachments(
         conn: ConnType, attachment: int, prefix: _PathLike = "",
-        itemIDs: _Optional[_Sequence[str]] = None, **kwargs: int
+        itemIDs: _Optional[_Sequence[str]] = None, output: str = "path", **kwargs: int
 ):
     """Returns the paths to the attachments to all documents.
 
@@ -368,8 +648,13 @@ def get_doc_attachments(
         The ID of the item type *attachment*.
     prefix : str, pathlib.Path, or path-like
         The path prefix to prepend.
-    itemIDs : list-like of str or None
+    itemIDs : list-like of str/int or None
         The itemID of interest. If None, consider all items.
+    output : str
+        One of "path" (default), "str", and "explode". "path" gives `pathlib.Path` objects, and
+        documents with more than one attachment get lists of paths. "str" is the same but with
+        plain strings. "explode" gives plain strings with one row per attachment, so the indices
+        may repeat.
     **kwargs : int
         Not used. Just to conform the signature with other similar functions.
 
@@ -377,7 +662,8 @@ def get_doc_attachments(
     -------
     pandas.DataFrame
         The values in the only one column are the relative paths to attachments. The indices of are
-        "itemID"s. The relative paths are relative to the Zotero storage path.
+        "itemID"s. The relative paths are relative to the Zotero storage path. Standalone
+        attachments (i.e., without parent items) are not included.
     """
     # pylint: disable=unused-argument
 
@@ -386,26 +672,293 @@ def get_doc_attachments(
         FROM items, itemAttachments
         WHERE
             items.itemTypeID = {attachment} AND
-            itemAttachments.itemID = items.itemID
+            itemAttachments.itemID = items.itemID AND
+            itemAttachments.parentItemID IS NOT NULL
     """.format(attachment=attachment)
 
     if itemIDs is not None:
         query = _sub(
-            "WHERE", "WHERE itemAttachments.parentitemID in ({}) AND".format(", ".join(itemIDs)),
+            "WHERE", "WHERE itemAttachments.parentItemID IN ({}) AND".format(
+                load_item_ids(conn, itemIDs)),
             query
         )
 
-    results: pandas.DataFrame = pandas.read_sql_query(query, conn)
+    results: pandas.DataFrame = _read_sql("read.attachment path.query", query, conn)
     results: pandas.DataFrame = results.rename(columns={"parentItemID": "itemID"})
     results: pandas.DataFrame = results.set_index("itemID").dropna(0, subset=["path"])
 
-    prefix = _Path(prefix)
-    results["key"] = results["key"].map(prefix.joinpath)
-    results["path"] = results["path"].str.replace("storage:", "")
-    results: pandas.Series = results.apply(lambda x: x["key"].joinpath(x["path"]), 1)
-    results: pandas.core.groupby.SeriesGroupBy = results.groupby(level=0)
-    results: pandas.Series = results.aggregate(lambda x: x.values.tolist())
-    results: pandas.Series = results.apply(lambda x: x[0] if len(x) == 1 else x, 1)
-    results: pandas.DataFrame = results.to_frame("attachment path")
+    return _format_attachments(results, prefix, output)
+
+
+def _format_attachments(
+        results: pandas.DataFrame, prefix: _PathLike, output: str = "path") -> pandas.DataFrame:
+    """Combine attachments' keys and paths into full paths and group them by parent items.
+
+    This is mainly for internal use.
+
+    Paths starting with "storage:" are files in `prefix/key/`. Absolute paths are linked files and
+    are used as they are. Other paths are treated as relative to `prefix/key/`.
+
+    Parameters
+    ----------
+    results : pandas.DataFrame
+        A dataframe with columns "key" and "path". The indices are the parents' "itemID"s.
+    prefix : str, pathlib.Path, or path-like
+        The path prefix to prepend.
+    output : str
+        See `get_doc_attachments`.
+
+    Returns
+    -------
+    pandas.DataFrame
+        See `get_doc_attachments`.
+    """
+
+    with _span("read.attachment path.postprocess"):
+        if output not in ["path", "str", "explode"]:
+            raise ValueError("Unrecognized output: {}".format(output))
+
+        # pathlib.Path("") is ".", which pathlib drops when joining with other parts
+        prefix = str(_Path(prefix))
+        prefix = "" if prefix == "." else prefix.rstrip(_sep) + _sep
+
+        storage: pandas.Series = results["path"].str.startswith("storage:")
+        linked: pandas.Series = results["path"].str.match(r"^(?:/|\\\\|[A-Za-z]:[\\/])")
+
+        paths: pandas.Series = results["path"].mask(storage, results["path"].str.slice(8))
+        paths: pandas.Series = paths.where(linked, prefix + results["key"] + _sep + paths)
+        paths: pandas.Series = paths.rename("attachment path")
+
+        if output == "explode":
+            return paths.to_frame()
+
+        if output == "path":
+            paths: pandas.Series = paths.map(_Path)
+
+        # only documents with multiple attachments go through the (slower) list aggregation
+        multiple: _numpy.ndarray = paths.index.duplicated(keep=False)
+        grouped: pandas.Series = paths[multiple].groupby(level=0, sort=False).agg(list)
+        paths: pandas.Series = pandas.concat([paths[~multiple], grouped]).sort_index(kind="stable")
+
+        return paths.to_frame("attachment path")
+
+
+def get_item_fields(
+        conn: ConnType, fields: _Sequence[str], itemIDs: _Optional[_Sequence[str]] = None,
+        categories: _Union[bool, _Sequence[str]] = False, **mapping: int
+) -> pandas.DataFrame:
+    """Returns the values of arbitrary fields of items as a wide dataframe, with one query.
+
+    Only the rows of `itemData` of the requested fields (and items) are read, and they are pivoted
+    to one column per field in pandas.
+
+    Parameters
+    ----------
+    conn : sqlalchemy.engine.Connection
+        The connection object to the database.
+    fields : list-like of str
+        The names of the fields, e.g., `["DOI", "volume", "pages", "abstractNote"]`.
+    itemIDs : list-like of str/int or None
+        The itemID of interest. If None, consider all items.
+    categories : bool or list-like of str
+        The fields converted to the categorical dtype, which saves memory for fields with few
+        distinct values (e.g., "language" or "publicationTitle"). If True, all fields.
+    **mapping : keyword-values
+        The mapping from field names to field IDs, e.g., `Database.field2id`.
+
+    Returns
+    -------
+    pandas.DataFrame
+        The indices are "itemID"s, and the columns are the fields in the order of `fields`. Items
+        having none of the fields are not included. Missing values are NaN.
+    """
+
+    try:
+        ids = {mapping[field]: field for field in fields}
+    except KeyError as err:
+        raise ValueError("Unrecognized field: {}".format(err.args[0])) from err
+
+    fieldIDs = ", ".join(str(int(i)) for i in ids)  # pylint: disable=invalid-name
+
+    if itemIDs is None:
+        query = _queries.all_itemdata_fields.format(fieldIDs)
+    else:
+        query = _queries.itemdata_fields.format(load_item_ids(conn, itemIDs), fieldIDs)
+
+    query = """
+        SELECT itemID, fieldID, value FROM ({0}) INNER JOIN itemDataValues USING(valueID)
+    """.format(query)
+
+    results: pandas.DataFrame = _read_sql("read.fields.query", query, conn)
+
+    with _span("read.fields.postprocess"):
+        results: pandas.DataFrame = results.pivot(index="itemID", columns="fieldID", values="value")
+        results: pandas.DataFrame = results.rename(columns=ids).reindex(columns=list(fields))
+        results.columns.name = None
+
+        if categories is True:
+            categories = fields
+
+        for field in (categories or []):
+            results[field] = results[field].astype("category")
+
+    return results
+
+
+def get_docs_single_pass(
+        conn: ConnType, prefix: _PathLike = "", itemIDs: _Optional[_Sequence[str]] = None,
+        output: str = "path", author_output: str = "list", **mapping: int
+):
+    """Returns the brief information of all documents using one single SQL statement.
+
+    Fields are pivoted with conditional aggregation over `itemData`, while authors and attachments
+    are collected with `GROUP_CONCAT` in the order of `orderIndex` and attachment `itemID`. SQLite
+    supports `ORDER BY` inside aggregates only since 3.44.0. With older versions, the order relies
+    on `GROUP_CONCAT` following the order of the rows of an ordered subquery, which SQLite does in
+    practice but does not document. The results are the same as joining the results of
+    `get_doc_authors`, `get_doc_types`, `get_doc_titles`, `get_doc_publications`, `get_doc_years`,
+    `get_doc_added_dates`, and `get_doc_attachments`.
+
+    Parameters
+    ----------
+    conn : sqlalchemy.engine.Connection
+        The connection object to the database.
+    prefix : str, pathlib.Path, or path-like
+        The path prefix to prepend to attachment paths.
+    itemIDs : list-like of str/int or None
+        The itemID of interest. If None, consider all items.
+    output : str
+        The format of attachment paths. See `get_doc_attachments`.
+    author_output : str
+        Either "list" (default) or "short". "short" formats authors' last names as
+        `process.authors_agg` does but without creating per-document lists.
+    **mapping : int
+        The ids of item types, field names, and creator types used in the query, i.e., the
+        combination of `Database.doctype2id`, `Database.field2id`, and `Database.creatortype2id`.
+
+    Returns
+    -------
+    pandas.DataFrame
+        The indices are "itemID"s. The columns are "author", "document type", "title",
+        "publication title", "year", "time added", and "attachment path". Missing values are
+        empty strings.
+    """
+
+    if itemIDs is not None:
+        ids = load_item_ids(conn, itemIDs)
+        mapping["items_filter"] = "AND items.itemID IN ({})".format(ids)
+        mapping["data_filter"] = "AND itemData.itemID IN ({})".format(ids)
+        mapping["creators_filter"] = "AND itemCreators.itemID IN ({})".format(ids)
+        mapping["attachments_filter"] = "AND itemAttachments.parentItemID IN ({})".format(ids)
+    else:
+        mapping.update(items_filter="", data_filter="", creators_filter="", attachments_filter="")
+
+    # order concatenated values explicitly when the SQLite library supports it
+    version = conn.execute("SELECT sqlite_version();").fetchone()[0]
+    if tuple(int(v) for v in version.split(".")) >= (3, 44):
+        mapping.update(
+            author_order=" ORDER BY orderIndex", attachment_order=" ORDER BY attachmentID")
+    else:
+        mapping.update(author_order="", attachment_order="")
+
+    # U+001F (unit separator) is used to separate the values of the concatenated lists
+    query = """
+        SELECT
+            items.itemID,
+            authors.author,
+            itemTypes.typeName AS "document type",
+            fields.title,
+            fields."publication title",
+            fields.year,
+            items.dateAdded AS "time added",
+            attachments.keys,
+            attachments.paths
+        FROM items
+        INNER JOIN itemTypes USING(itemTypeID)
+        LEFT JOIN (
+            SELECT
+                itemData.itemID,
+                MAX(CASE WHEN fieldID = {title} THEN value END) AS title,
+                MAX(CASE WHEN fieldID <> {title} AND fieldID <> {date} THEN value END)
+                    AS "publication title",
+                MAX(CASE WHEN fieldID = {date} THEN value END) AS year
+            FROM itemData INNER JOIN itemDataValues USING(valueID)
+            WHERE
+                itemData.fieldID IN (
+                    {title}, {date},
+                    {publicationTitle}, {encyclopediaTitle}, {dictionaryTitle},
+                    {websiteTitle}, {forumTitle}, {blogTitle},
+                    {proceedingsTitle}, {bookTitle}, {programTitle}
+                ) {data_filter}
+            GROUP BY itemData.itemID
+        ) AS fields USING(itemID)
+        LEFT JOIN (
+            SELECT itemID, GROUP_CONCAT(lastName, char(31){author_order}) AS author
+            FROM (
+                SELECT itemCreators.itemID, itemCreators.orderIndex, creators.lastName
+                FROM itemCreators INNER JOIN creators USING(creatorID)
+                WHERE itemCreators.creatorTypeID = {author} {creators_filter}
+                ORDER BY itemCreators.itemID, itemCreators.orderIndex
+            )
+            GROUP BY itemID
+        ) AS authors USING(itemID)
+        LEFT JOIN (
+            SELECT
+                parentItemID AS itemID,
+                GROUP_CONCAT(key, char(31){attachment_order}) AS keys,
+                GROUP_CONCAT(path, char(31){attachment_order}) AS paths
+            FROM (
+                SELECT
+                    itemAttachments.parentItemID, itemAttachments.itemID AS attachmentID,
+                    items.key, itemAttachments.path
+                FROM items INNER JOIN itemAttachments USING(itemID)
+                WHERE
+                    items.itemTypeID = {attachment} AND
+                    itemAttachments.path IS NOT NULL {attachments_filter}
+                ORDER BY itemAttachments.parentItemID, itemAttachments.itemID
+            )
+            GROUP BY parentItemID
+        ) AS attachments USING(itemID)
+        WHERE
+            items.itemTypeID <> {attachment} AND
+            items.itemTypeID <> {note} {items_filter}
+        ORDER BY items.itemID;
+    """.format(**mapping)
+
+    results: pandas.DataFrame = _read_sql("read.single_pass.query", query, conn)
+
+    with _span("read.single_pass.postprocess"):
+        return _format_single_pass(results, prefix, output, author_output)
+
+
+def _format_single_pass(
+        results: pandas.DataFrame, prefix: _PathLike, output: str, author_output: str
+) -> pandas.DataFrame:
+    """Post-process the results of the query in `get_docs_single_pass`. For internal use."""
+
+    results: pandas.DataFrame = results.set_index("itemID")
+    results["year"] = results["year"].replace(r"(?P<year>\d{4}).*", r"\g<year>", regex=True)
+
+    if author_output == "list":
+        results["author"] = results["author"].str.split("\x1f")
+    elif author_output == "short":
+        names: pandas.DataFrame = results["author"].str.split("\x1f", n=2, expand=True)
+        names: pandas.DataFrame = names.reindex(columns=[0, 1])
+        count: pandas.Series = results["author"].str.count("\x1f").add(1).fillna(0)
+        results["author"] = _authors_short(count, names[0], names[1])
+    else:
+        raise ValueError("Unrecognized author_output: {}".format(author_output))
+
+    # expand attachments to one row per attachment to reuse the same formatting routine
+    atts: pandas.DataFrame = results[["keys", "paths"]].dropna()
+    atts: pandas.DataFrame = pandas.DataFrame({
+        "key": atts["keys"].str.split("\x1f").explode(),
+        "path": atts["paths"].str.split("\x1f").explode(),
+    })
+
+    results: pandas.DataFrame = results.drop(columns=["keys", "paths"])
+    atts: pandas.DataFrame = _format_attachments(atts, prefix, output)
+    results: pandas.DataFrame = results.join(atts, None, "left")
+    results: pandas.DataFrame = results.fillna("")
 
     return results
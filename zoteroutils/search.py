@@ -10,6 +10,7 @@
 import typing
 import pandas
 import sqlalchemy
+from .read import load_item_ids, _read_sql
 
 
 def search_author_simple(conn: sqlalchemy.engine.Connection, key: str) -> pandas.DataFrame:
@@ -26,6 +27,11 @@ def search_author_simple(conn: sqlalchemy.engine.Connection, key: str) -> pandas
     -------
     pandas.DataFrame
         A dataframe of `itemID`s.
+
+    Notes
+    -----
+    This scans the whole `creators` table. `zoteroutils.index.search_creators` searches a
+    persistent trigram index instead and tolerates diacritics and typos.
     """
 
     query = """
@@ -125,7 +131,8 @@ def search_authors(
 
     Notes
     -----
-    May not be efficient if the database is very huge.
+    May not be efficient if the database is very huge. See `zoteroutils.index` for a persistent
+    index that does not need to be rebuilt for every search.
 
     Parameters
     ----------
@@ -150,7 +157,7 @@ def search_authors(
     if item_ids is None:
         partial_table = "itemCreators"
     else:
-        item_ids = ", ".join(map(str, item_ids))
+        item_ids = load_item_ids(conn, item_ids)
         partial_table = "(SELECT * FROM itemCreators WHERE itemID IN ({0}))".format(item_ids)
 
     # create a temporary FTS table
@@ -168,7 +175,8 @@ def search_authors(
     )
 
     # conduct the search
-    results = pandas.read_sql_query(
+    results = _read_sql(
+        "search.authors.query",
         """SELECT itemID FROM temp.searchable WHERE searchable MATCH '{0}' ORDER BY rank;
         """.format(keys),
         conn
@@ -189,7 +197,8 @@ def search_fields(
 
     Notes
     -----
-    May not be efficient if the database is very huge.
+    May not be efficient if the database is very huge. See `zoteroutils.index` for a persistent
+    index that does not need to be rebuilt for every search.
 
     Parameters
     ----------
@@ -214,7 +223,7 @@ def search_fields(
     if item_ids is None:
         partial_table = "itemData"
     else:
-        item_ids = ", ".join(map(str, item_ids))
+        item_ids = load_item_ids(conn, item_ids)
         partial_table = "(SELECT * FROM itemData WHERE itemID IN ({0}))".format(item_ids)
 
     # create a temporary FTS table
@@ -229,7 +238,8 @@ def search_fields(
     )
 
     # conduct the search
-    results = pandas.read_sql_query(
+    results = _read_sql(
+        "search.fields.query",
         """SELECT itemID FROM temp.searchable WHERE searchable MATCH '{0}' ORDER BY rank;
         """.format(keys),
         conn
@@ -250,7 +260,8 @@ def search_full_texts(
 
     Notes
     -----
-    May not be efficient if the database is very huge.
+    May not be efficient if the database is very huge. See `zoteroutils.index` for a persistent
+    index that does not need to be rebuilt for every search.
 
     Parameters
     ----------
@@ -274,7 +285,7 @@ def search_full_texts(
     if item_ids is None:
         partial_table = "fulltextItemWords"
     else:  # if item_ids are provided, first get their attachments' IDs; then query a smaller table
-        item_ids = ", ".join(map(str, item_ids))
+        item_ids = load_item_ids(conn, item_ids)
         partial_table = """
             SELECT * FROM fulltextItemWords WHERE itemID IN (
                 SELECT itemID
@@ -309,9 +320,10 @@ def search_full_texts(
     )
 
     # get the final DataFrame; return the parentItemIDs of the attachments
-    results = pandas.read_sql_query(
-        """SELECT parentItemID AS itemID FROM itemAttachments INNER JOIN (
-            SELECT itemID FROM temp.searchable2 WHERE searchable2 MATCH '{0}') USING(itemID);
+    results = _read_sql(
+        "search.full_texts.query",
+        """SELECT parentItemID AS itemID FROM temp.searchable2 INNER JOIN itemAttachments
+            USING(itemID) WHERE searchable2 MATCH '{0}' ORDER BY searchable2.rank;
         """.format(" ".join(keys)),
         conn
     )
@@ -0,0 +1,270 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+# vim:fenc=utf-8
+#
+# Copyright © 2020 Pi-Yueh Chuang <pychuang@pm.me>
+#
+# Distributed under terms of the BSD 3-Clause license.
+
+"""Scan the attachment storage folder and check it against the database.
+
+Usage:
+
+    report = db.check_storage(algorithm="sha1")
+    print(report.missing)     # attachments whose files do not exist
+    print(report.orphans)     # files in storage/<key>/ folders no attachment owns
+    print(report.duplicates)  # files with the same content
+
+Zotero stores the file of an attachment in `storage/<key>/`, where `<key>` is the attachment's
+key, and records the path as "storage:<file name>". Scans stat files with a thread pool and keep
+their sizes, modification times, and (optionally) content hashes in a manifest, a small SQLite
+database. Later scans only hash files whose sizes or modification times changed.
+"""
+import os
+import typing
+import hashlib
+import pathlib
+import sqlite3
+import contextlib
+import concurrent.futures
+import pandas
+import sqlalchemy
+from .instrument import span as _span
+from .read import load_item_ids, _read_sql
+
+_PathLike = typing.Union[str, pathlib.Path]
+
+# columns of scanned files
+COLUMNS = ["key", "name", "size", "mtime", "hash"]
+
+
+class StorageReport(typing.NamedTuple):
+    """The results of `check`. All are pandas.DataFrame."""
+    files: pandas.DataFrame
+    missing: pandas.DataFrame
+    orphans: pandas.DataFrame
+    duplicates: pandas.DataFrame
+
+
+def _stat_folder(folder: str) -> typing.List[tuple]:
+    """Returns (name, size, mtime) of files in a storage/<key>/ folder, including subfolders.
+
+    Names are relative to the folder and use "/" as the separator. Zotero's own files (e.g.,
+    `.zotero-ft-cache`) are skipped.
+    """
+    results = []
+    stack = [""]
+
+    while stack:
+        relative = stack.pop()
+        try:
+            entries = list(os.scandir(os.path.join(folder, relative)))
+        except (FileNotFoundError, NotADirectoryError):
+            continue
+
+        for entry in entries:
+            name = relative + entry.name
+            if entry.is_dir(follow_symlinks=False):
+                stack.append(name + "/")
+            elif not entry.name.startswith(".zotero-"):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:  # removed during the scan
+                    continue
+                results.append((name, stat.st_size, stat.st_mtime_ns))
+
+    return sorted(results)
+
+
+def _hash_file(path: str, algorithm: str) -> typing.Optional[str]:
+    """Returns the hex digest of a file, or None if the file cannot be read."""
+    digest = hashlib.new(algorithm)
+    try:
+        with open(path, "rb") as fobj:
+            for chunk in iter(lambda: fobj.read(1024**2), b""):
+                digest.update(chunk)
+    except OSError:
+        return None
+    return digest.hexdigest()
+
+
+def _open_manifest(path: _PathLike) -> sqlite3.Connection:
+    """Open (and create if needed) a manifest database."""
+    manifest = sqlite3.connect(str(path))
+    manifest.execute(
+        "CREATE TABLE IF NOT EXISTS files (key TEXT, name TEXT, size INT, mtime INT, "
+        "algorithm TEXT, hash TEXT, PRIMARY KEY (key, name)) WITHOUT ROWID;"
+    )
+    return manifest
+
+
+def scan(
+    storage_dir: _PathLike, manifest: _PathLike, algorithm: typing.Optional[str] = None,
+    max_workers: typing.Optional[int] = None
+) -> pandas.DataFrame:
+    """Stat (and optionally hash) all files in the storage folder, and update the manifest.
+
+    Every file is stat-ed in each scan, which is cheap. A file is hashed only if it is not in the
+    manifest yet, its size or modification time changed, or its hash was computed with another
+    algorithm.
+
+    Parameters
+    ----------
+    storage_dir : str or path-like
+        The storage folder, i.e., `Database.storage`.
+    manifest : str or path-like
+        The path to the manifest database. It will be created if not exist.
+    algorithm : None or str
+        A hash algorithm of `hashlib`, e.g., "sha1" or "md5". If None, files are not hashed, and
+        the hashes recorded in the manifest are kept as long as the files do not change.
+    max_workers : None or int
+        The number of threads. If None, use the default of `concurrent.futures.ThreadPoolExecutor`.
+
+    Returns
+    -------
+    pandas.DataFrame
+        One row per file, sorted, with columns "key" (the folder under storage), "name" (the path
+        relative to the key's folder), "size" (in bytes), "mtime" (in ns since epoch), and "hash"
+        (None if not hashed).
+    """
+
+    if algorithm is not None:
+        hashlib.new(algorithm)  # raise ValueError early if not supported
+
+    storage_dir = pathlib.Path(storage_dir)
+
+    try:
+        keys = sorted(entry.name for entry in os.scandir(storage_dir) if entry.is_dir())
+    except FileNotFoundError:
+        keys = []
+
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers, "zoteroutils-storage")
+
+    with contextlib.closing(_open_manifest(manifest)) as conn, executor:
+
+        recorded = {
+            (key, name): (size, mtime, algo, digest)
+            for key, name, size, mtime, algo, digest in conn.execute("SELECT * FROM files;")
+        }
+
+        with _span("storage.stat") as stage:
+            files = [
+                [key, name, size, mtime, None, None]
+                for key, stats in zip(keys, executor.map(
+                    _stat_folder, [str(storage_dir.joinpath(key)) for key in keys]))
+                for name, size, mtime in stats
+            ]
+            stage.rows = len(files)
+
+        # reuse the recorded hashes of unchanged files; rows are [key, name, size, mtime, algorithm,
+        # hash], and `recorded` is left with the files that no longer exist
+        changed, rehash = [], []
+        for row in files:
+            old = recorded.pop((row[0], row[1]), None)
+            unchanged = old is not None and old[:2] == (row[2], row[3])
+
+            if unchanged:
+                row[4:] = old[2:]
+
+            stale = algorithm is not None and (
+                not unchanged or old[2] != algorithm or old[3] is None)
+
+            if stale:
+                row[4] = algorithm
+                rehash.append(row)
+
+            if stale or not unchanged:
+                changed.append(row)
+
+        with _span("storage.hash") as stage:
+            digests = executor.map(
+                _hash_file, [str(storage_dir.joinpath(row[0], row[1])) for row in rehash],
+                [algorithm] * len(rehash))
+            for row, digest in zip(rehash, digests):
+                row[5] = digest
+            stage.rows = len(rehash)
+
+        with conn:
+            conn.executemany("DELETE FROM files WHERE key = ? AND name = ?;", list(recorded))
+            conn.executemany("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?);", changed)
+
+    return pandas.DataFrame([row[:4] + row[5:] for row in files], columns=COLUMNS)
+
+
+def get_attachment_files(
+    conn: sqlalchemy.engine.Connection, attachment: int,
+    itemIDs: typing.Optional[typing.Sequence[typing.Union[str, int]]] = None, **kwargs: int
+) -> pandas.DataFrame:
+    """Returns the storage folders and file names of attachments.
+
+    Parameters
+    ----------
+    conn : sqlalchemy.engine.Connection
+        The connection object to the database.
+    attachment : int
+        The ID of the item type *attachment*.
+    itemIDs : list-like of str/int or None
+        The itemID of the parents of interest. If None, consider all attachments.
+    **kwargs : int
+        Not used. Just to conform the signature with other similar functions.
+
+    Returns
+    -------
+    pandas.DataFrame
+        Columns "attachmentID" (the attachments' itemIDs), "itemID" (their parents' itemIDs or
+        None), "key", and "name" (the file names of stored files, or None for links and linked
+        files).
+    """
+    # pylint: disable=unused-argument, invalid-name
+
+    query = """
+        SELECT
+            items.itemID AS attachmentID, parentItemID AS itemID, items.key AS key,
+            CASE WHEN path LIKE 'storage:%' THEN SUBSTR(path, 9) END AS name
+        FROM items INNER JOIN itemAttachments USING(itemID)
+        WHERE items.itemTypeID = {0}
+    """.format(attachment)
+
+    if itemIDs is not None:
+        query += " AND parentItemID IN ({})".format(load_item_ids(conn, itemIDs))
+
+    return _read_sql("storage.attachments.query", query + ";", conn)
+
+
+def check(files: pandas.DataFrame, attachments: pandas.DataFrame) -> StorageReport:
+    """Check scanned files against attachments recorded in the database.
+
+    Parameters
+    ----------
+    files : pandas.DataFrame
+        The results of `scan`.
+    attachments : pandas.DataFrame
+        The results of `get_attachment_files` of all attachments.
+
+    Returns
+    -------
+    StorageReport
+        `files`: the scanned files with the columns "attachmentID" and "itemID" of the attachments
+        owning the folders (None for orphans). `missing`: the attachments (see
+        `get_attachment_files`) whose stored files do not exist. `orphans`: files in folders of no
+        attachments. `duplicates`: the files (with "attachmentID" and "itemID") whose hashes equal
+        those of other files, sorted by the hashes; files without hashes are not compared.
+    """
+
+    with _span("storage.check") as stage:
+        owners = attachments[["key", "attachmentID", "itemID"]].drop_duplicates("key")
+        files = files.merge(owners, "left", on="key", validate="many_to_one")
+
+        stored = attachments.dropna(subset=["name"])
+        found = stored.merge(files[["key", "name"]], "left", on=["key", "name"], indicator=True)
+        missing = stored[(found["_merge"] == "left_only").to_numpy()].reset_index(drop=True)
+
+        orphans = files[files["attachmentID"].isna()].reset_index(drop=True)
+
+        hashed = files.dropna(subset=["hash"])
+        duplicates = hashed[hashed["hash"].duplicated(keep=False)]
+        duplicates = duplicates.sort_values(["hash", "key", "name"]).reset_index(drop=True)
+
+        stage.rows = len(missing) + len(orphans) + len(duplicates)
+
+    return StorageReport(files, missing, orphans, duplicates)
@@ -0,0 +1,421 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+# vim:fenc=utf-8
+#
+# Copyright © 2020 Pi-Yueh Chuang <pychuang@pm.me>
+#
+# Distributed under terms of the BSD 3-Clause license.
+
+"""Generate synthetic Zotero SQLite databases for benchmarking and testing.
+
+Only the tables used by this package are created, but their definitions follow Zotero's schema.
+Usage from the command line:
+
+    python -m zoteroutils.synthetic <zotero_dir> [n_items] [seed]
+"""
+import sqlite3
+import typing
+import pathlib
+import numpy
+
+# table definitions following Zotero's schema (only tables used by this package)
+SCHEMA = """
+    CREATE TABLE version (schema TEXT PRIMARY KEY, version INT NOT NULL);
+    CREATE TABLE itemTypes (
+        itemTypeID INTEGER PRIMARY KEY, typeName TEXT, templateItemTypeID INT,
+        display INT DEFAULT 1
+    );
+    CREATE TABLE fields (fieldID INTEGER PRIMARY KEY, fieldName TEXT, fieldFormatID INT);
+    CREATE TABLE fieldsCombined (
+        fieldID INT NOT NULL, fieldName TEXT NOT NULL, label TEXT, fieldFormatID INT,
+        custom INT NOT NULL, PRIMARY KEY (fieldID)
+    );
+    CREATE TABLE creatorTypes (creatorTypeID INTEGER PRIMARY KEY, creatorType TEXT);
+    CREATE TABLE items (
+        itemID INTEGER PRIMARY KEY, itemTypeID INT NOT NULL,
+        dateAdded TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        dateModified TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        clientDateModified TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        libraryID INT NOT NULL, key TEXT NOT NULL, version INT NOT NULL DEFAULT 0,
+        synced INT NOT NULL DEFAULT 0, UNIQUE (libraryID, key)
+    );
+    CREATE INDEX items_synced ON items(synced);
+    CREATE TABLE itemDataValues (valueID INTEGER PRIMARY KEY, value UNIQUE);
+    CREATE TABLE itemData (
+        itemID INT, fieldID INT, valueID, PRIMARY KEY (itemID, fieldID),
+        FOREIGN KEY (itemID) REFERENCES items(itemID) ON DELETE CASCADE,
+        FOREIGN KEY (valueID) REFERENCES itemDataValues(valueID)
+    );
+    CREATE INDEX itemData_fieldID ON itemData(fieldID);
+    CREATE TABLE creators (
+        creatorID INTEGER PRIMARY KEY, firstName TEXT, lastName TEXT, fieldMode INT,
+        UNIQUE (lastName, firstName, fieldMode)
+    );
+    CREATE TABLE itemCreators (
+        itemID INT NOT NULL, creatorID INT NOT NULL, creatorTypeID INT NOT NULL DEFAULT 1,
+        orderIndex INT NOT NULL DEFAULT 0,
+        PRIMARY KEY (itemID, creatorID, creatorTypeID, orderIndex), UNIQUE (itemID, orderIndex),
+        FOREIGN KEY (itemID) REFERENCES items(itemID) ON DELETE CASCADE,
+        FOREIGN KEY (creatorID) REFERENCES creators(creatorID) ON DELETE CASCADE
+    );
+    CREATE INDEX itemCreators_creatorTypeID ON itemCreators(creatorTypeID);
+    CREATE TABLE itemAttachments (
+        itemID INTEGER PRIMARY KEY, parentItemID INT, linkMode INT, contentType TEXT,
+        charsetID INT, path TEXT, syncState INT DEFAULT 0, storageModTime INT, storageHash TEXT,
+        lastProcessedModificationTime INT,
+        FOREIGN KEY (itemID) REFERENCES items(itemID) ON DELETE CASCADE,
+        FOREIGN KEY (parentItemID) REFERENCES items(itemID) ON DELETE CASCADE
+    );
+    CREATE INDEX itemAttachments_parentItemID ON itemAttachments(parentItemID);
+    CREATE INDEX itemAttachments_contentType ON itemAttachments(contentType);
+    CREATE TABLE itemNotes (
+        itemID INTEGER PRIMARY KEY, parentItemID INT, note TEXT, title TEXT,
+        FOREIGN KEY (itemID) REFERENCES items(itemID) ON DELETE CASCADE,
+        FOREIGN KEY (parentItemID) REFERENCES items(itemID) ON DELETE CASCADE
+    );
+    CREATE INDEX itemNotes_parentItemID ON itemNotes(parentItemID);
+    CREATE TABLE deletedItems (
+        itemID INTEGER PRIMARY KEY, dateDeleted DEFAULT CURRENT_TIMESTAMP NOT NULL,
+        FOREIGN KEY (itemID) REFERENCES items(itemID) ON DELETE CASCADE
+    );
+    CREATE TABLE fulltextItems (
+        itemID INTEGER PRIMARY KEY, indexedPages INT, totalPages INT, indexedChars INT,
+        totalChars INT, version INT NOT NULL DEFAULT 0, synced INT NOT NULL DEFAULT 0,
+        FOREIGN KEY (itemID) REFERENCES items(itemID) ON DELETE CASCADE
+    );
+    CREATE TABLE fulltextWords (wordID INTEGER PRIMARY KEY, word TEXT UNIQUE);
+    CREATE TABLE fulltextItemWords (
+        wordID INT, itemID INT, PRIMARY KEY (wordID, itemID),
+        FOREIGN KEY (wordID) REFERENCES fulltextWords(wordID),
+        FOREIGN KEY (itemID) REFERENCES items(itemID) ON DELETE CASCADE
+    );
+    CREATE INDEX fulltextItemWords_itemID ON fulltextItemWords(itemID);
+"""
+
+# item types and their ids as in Zotero 5
+ITEM_TYPES = [
+    "note", "book", "bookSection", "journalArticle", "magazineArticle", "newspaperArticle",
+    "thesis", "letter", "manuscript", "interview", "film", "artwork", "webpage", "attachment",
+    "report", "bill", "case", "hearing", "patent", "statute", "email", "map", "blogPost",
+    "instantMessage", "forumPost", "audioRecording", "presentation", "videoRecording",
+    "tvBroadcast", "radioBroadcast", "podcast", "computerProgram", "conferencePaper", "document",
+    "encyclopediaArticle", "dictionaryEntry"
+]
+
+FIELDS = [
+    "url", "rights", "series", "volume", "issue", "edition", "place", "publisher", "pages",
+    "ISBN", "publicationTitle", "ISSN", "date", "section", "callNumber", "archiveLocation",
+    "distributor", "extra", "journalAbbreviation", "DOI", "accessDate", "seriesTitle",
+    "abstractNote", "title", "encyclopediaTitle", "dictionaryTitle", "websiteTitle", "forumTitle",
+    "blogTitle", "proceedingsTitle", "bookTitle", "programTitle", "university", "institution",
+    "reportNumber", "language", "shortTitle"
+]
+
+CREATOR_TYPES = [
+    "author", "contributor", "editor", "translator", "seriesEditor", "interviewee", "interviewer",
+    "director", "scriptwriter", "producer", "castMember", "sponsor", "counsel", "inventor",
+    "attorneyAgent", "recipient", "performer", "composer", "wordsBy", "cartographer",
+    "programmer", "artist", "commenter", "presenter", "guest", "podcaster", "reviewedAuthor",
+    "cosponsor", "bookAuthor"
+]
+
+# document types, their probabilities, and the fields holding their publication titles
+DOC_TYPES = [
+    ("journalArticle", 0.45, "publicationTitle"), ("conferencePaper", 0.15, "proceedingsTitle"),
+    ("book", 0.10, None), ("bookSection", 0.08, "bookTitle"), ("thesis", 0.04, None),
+    ("report", 0.05, None), ("webpage", 0.08, "websiteTitle"), ("document", 0.05, None),
+]
+
+# the most frequent words; the rest of the vocabulary is made of pseudo-words
+COMMON_WORDS = [
+    "the", "of", "and", "flow", "model", "method", "simulation", "fluid", "numerical", "data",
+    "equation", "results", "boundary", "solver", "turbulence", "performance", "parallel", "mesh",
+    "vortex", "lattice", "boltzmann", "gpu", "navier", "stokes", "immersed", "reynolds", "wake",
+    "cylinder", "learning", "network", "café", "über", "naïve", "résumé", "zürich"
+]
+
+_SYLLABLES = [
+    "ka", "lo", "mi", "ne", "su", "ta", "ri", "vo", "pe", "an", "el", "or", "ix", "um", "qu",
+    "zh", "ba", "de", "fi", "go", "hu", "ja", "ke", "ly", "mo", "nu", "pa", "ro", "si", "tu"
+]
+
+_FIRST_NAMES = [
+    "Anne", "Bob", "Chen", "Daniela", "Emil", "Fatima", "George", "Hiroshi", "Inés", "José",
+    "Karin", "Lorena", "Mohammed", "Nora", "Olivier", "Pi-Yueh", "Qing", "Raúl", "Søren", "Tanya",
+]
+
+_KEY_CHARS = "23456789ABCDEFGHIJKLMNPQRSTUVWXYZ"
+
+
+# INSERT statements of rows written in batches; values and creators get their IDs in the order
+# they are first seen, and rows referring to them look the IDs up by their unique columns
+_ITEMS = "INSERT INTO items VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?);"
+_VALUES = "INSERT OR IGNORE INTO itemDataValues(value) VALUES (?);"
+_DATA = "INSERT INTO itemData SELECT ?, ?, valueID FROM itemDataValues WHERE value = ?;"
+_CREATORS = "INSERT OR IGNORE INTO creators(firstName, lastName, fieldMode) VALUES (?, ?, 0);"
+_ITEM_CREATORS = (
+    "INSERT INTO itemCreators SELECT ?, creatorID, 1, ? FROM creators "
+    "WHERE firstName = ? AND lastName = ? AND fieldMode = 0;")
+_ATTACHMENTS = (
+    "INSERT INTO itemAttachments(itemID, parentItemID, linkMode, contentType, path) "
+    "VALUES (?, ?, ?, ?, ?);")
+_FULLTEXT_ITEMS = "INSERT INTO fulltextItems VALUES (?, ?, ?, ?, ?, 0, 1);"
+_ITEM_WORDS = "INSERT INTO fulltextItemWords VALUES (?, ?);"
+_NOTES = "INSERT INTO itemNotes VALUES (?, NULL, ?, ?);"
+_TRASHED = "INSERT INTO deletedItems(itemID, dateDeleted) VALUES (?, ?);"
+
+
+class _Batches:
+    """Buffer rows of INSERT statements and write them in batches of about `size` rows.
+
+    Statements are written in the order they were first used, so rows looking up IDs (e.g.,
+    itemData) are written after the rows they refer to (e.g., itemDataValues).
+    """
+
+    def __init__(self, conn: sqlite3.Connection, size: int = 100000):
+        self._conn = conn
+        self._size = size
+        self._rows: typing.Dict[str, list] = {}
+        self._count = 0
+
+    def add(self, statement: str, row: tuple):
+        """Buffer a row, and write all buffered rows if there are enough of them."""
+        self._rows.setdefault(statement, []).append(row)
+        self._count += 1
+        if self._count >= self._size:
+            self.flush()
+
+    def flush(self):
+        """Write all buffered rows."""
+        for statement, rows in self._rows.items():
+            self._conn.executemany(statement, rows)
+            rows.clear()
+        self._count = 0
+
+
+def _pseudo_word(index: int, min_syllables: int = 2) -> str:
+    """Returns a deterministic pseudo-word for an integer."""
+    parts = []
+    while index > 0 or len(parts) < min_syllables:
+        index, rem = divmod(index, len(_SYLLABLES))
+        parts.append(_SYLLABLES[rem])
+    return "".join(parts)
+
+
+def _key(item_id: int) -> str:
+    """Returns a deterministic 8-character Zotero-like key for an itemID."""
+    chars = []
+    for _ in range(8):
+        item_id, rem = divmod(item_id, len(_KEY_CHARS))
+        chars.append(_KEY_CHARS[rem])
+    return "".join(reversed(chars))
+
+
+def vocabulary(size: int) -> typing.List[str]:
+    """Returns the vocabulary used by the generator, ordered from the most frequent word.
+
+    Parameters
+    ----------
+    size : int
+        The number of words.
+
+    Returns
+    -------
+    list of str
+    """
+    words = COMMON_WORDS[:size]
+    words += [_pseudo_word(i + 1, 3) for i in range(size - len(words))]
+    return words
+
+
+def generate(
+    path: typing.Union[str, pathlib.Path],
+    n_items: int = 1000,
+    seed: int = 0,
+    n_words: int = 20000,
+    words_per_attachment: int = 100,
+    overwrite: bool = False
+) -> pathlib.Path:
+    """Write a synthetic `zotero.sqlite` with realistic distributions.
+
+    Distributions used:
+
+    * document types follow `DOC_TYPES`; about 5% of items are standalone notes;
+    * the number of authors per document is 1 plus a geometric random number (mean about 2.9),
+      and authors are drawn from a Zipf-like distribution, so a few authors are prolific;
+    * 20% of documents have no attachment, 65% have one, and the rest have two or three; 10% of
+      attachments are linked files, and the others are stored files;
+    * 80% of attachments are full-text indexed, with a Poisson number of distinct words (mean
+      `words_per_attachment`) drawn from a Zipf-like distribution over the vocabulary;
+    * 1% of documents are in the trash (`deletedItems`).
+
+    Rows are written in batches as they are generated, so the memory usage does not grow with
+    `n_items` beyond a few arrays of per-document numbers.
+
+    Parameters
+    ----------
+    path : str or path-like
+        The path to the SQLite file, or the folder in which `zotero.sqlite` is created.
+    n_items : int
+        The number of documents (i.e., items other than attachments and notes).
+    seed : int
+        The seed of the random number generator.
+    n_words : int
+        The size of the vocabulary of full-text words.
+    words_per_attachment : int
+        The mean number of distinct words per indexed attachment.
+    overwrite : bool
+        Whether to overwrite an existing file.
+
+    Returns
+    -------
+    pathlib.Path
+        The path to the SQLite file.
+    """
+    # pylint: disable=too-many-locals, too-many-statements
+
+    path = pathlib.Path(path).expanduser()
+    if path.suffix != ".sqlite":
+        path.mkdir(parents=True, exist_ok=True)
+        path = path.joinpath("zotero.sqlite")
+
+    if path.exists():
+        if not overwrite:
+            raise FileExistsError("{} already exists.".format(path))
+        path.unlink()
+
+    rng = numpy.random.default_rng(seed)
+    conn = sqlite3.connect(str(path))
+    conn.executescript(SCHEMA)
+
+    # meta tables
+    conn.executemany(
+        "INSERT INTO version VALUES (?, ?);",
+        [("userdata", 120), ("system", 33), ("globalSchema", 1)])
+    conn.executemany(
+        "INSERT INTO itemTypes(itemTypeID, typeName) VALUES (?, ?);",
+        list(enumerate(ITEM_TYPES, 1)))
+    conn.executemany("INSERT INTO fields VALUES (?, ?, NULL);", list(enumerate(FIELDS, 1)))
+    conn.executemany(
+        "INSERT INTO fieldsCombined VALUES (?, ?, NULL, NULL, 0);", list(enumerate(FIELDS, 1)))
+    conn.executemany("INSERT INTO creatorTypes VALUES (?, ?);", list(enumerate(CREATOR_TYPES, 1)))
+
+    type_ids = {name: i for i, name in enumerate(ITEM_TYPES, 1)}
+    field_ids = {name: i for i, name in enumerate(FIELDS, 1)}
+    words = vocabulary(n_words)
+    rows = _Batches(conn)
+
+    # documents
+    probs = numpy.array([p for _, p, _ in DOC_TYPES])
+    doc_types = rng.choice(len(DOC_TYPES), n_items, p=probs/probs.sum())
+    added = numpy.datetime64("2010-01-01") + rng.integers(0, 3650*86400, n_items).astype(
+        "timedelta64[s]")
+    modified = added + rng.integers(0, 365*86400, n_items).astype("timedelta64[s]")
+
+    last_id = [0]  # the last itemID used
+
+    def add_item(type_id, add_time, mod_time):
+        last_id[0] += 1
+        add_time = str(add_time).replace("T", " ")
+        mod_time = str(mod_time).replace("T", " ")
+        rows.add(_ITEMS, (
+            last_id[0], type_id, add_time, mod_time, mod_time, 1, _key(last_id[0]),
+            int(rng.integers(0, 5000)), 1))
+        return last_id[0]
+
+    def add_data(doc_id, field, value):
+        rows.add(_VALUES, (value,))
+        rows.add(_DATA, (doc_id, field_ids[field], value))
+
+    doc_ids = numpy.zeros(n_items, dtype=numpy.int64)
+    title_lengths = rng.integers(3, 15, n_items)
+    title_words = rng.zipf(1.2, title_lengths.sum()) % n_words
+    offsets = numpy.concatenate([[0], numpy.cumsum(title_lengths)])
+    years = rng.integers(1950, 2021, n_items)
+
+    for i in range(n_items):
+        name, _, pub_field = DOC_TYPES[doc_types[i]]
+        doc_ids[i] = doc_id = add_item(type_ids[name], added[i], modified[i])
+
+        title = " ".join(words[w] for w in title_words[offsets[i]:offsets[i+1]])
+        add_data(doc_id, "title", title.capitalize() + " " + str(doc_id))
+
+        if rng.random() < 0.95:
+            date = "{0}-{1:02d}-00 {0}".format(years[i], int(rng.integers(1, 13)))
+            add_data(doc_id, "date", date)
+
+        if pub_field is not None:
+            pub = "Journal of " + _pseudo_word(int(rng.zipf(1.5)) % 2000).capitalize()
+            add_data(doc_id, pub_field, pub)
+
+        if rng.random() < 0.6:
+            add_data(doc_id, "DOI", "10.{}/{}".format(1000 + i % 97, doc_id))
+
+        if rng.random() < 0.5:
+            add_data(doc_id, "volume", str(int(rng.integers(1, 200))))
+            add_data(doc_id, "pages", "{0}-{1}".format(*sorted(rng.integers(1, 2000, 2))))
+
+        if rng.random() < 0.5:
+            abstract = " ".join(words[w] for w in rng.zipf(1.2, 80) % n_words)
+            add_data(doc_id, "abstractNote", abstract)
+
+    # creators; lastNames from a Zipf-like distribution so some authors are prolific
+    n_authors = 1 + numpy.minimum(rng.geometric(0.35, n_items) - 1, 49)
+    creator_idx = rng.zipf(1.3, n_authors.sum()) % max(n_items, 10)
+    pos = 0
+
+    for doc_id, count in zip(doc_ids, n_authors):
+        used = set()
+        for order, idx in enumerate(creator_idx[pos:pos+count]):
+            name = (_FIRST_NAMES[idx % len(_FIRST_NAMES)], _pseudo_word(int(idx)).capitalize())
+            if name not in used:
+                used.add(name)
+                rows.add(_CREATORS, name)
+                rows.add(_ITEM_CREATORS, (int(doc_id), order) + name)
+        pos += count
+
+    # attachments and full texts
+    n_atts = rng.choice(4, n_items, p=[0.2, 0.65, 0.1, 0.05])
+
+    for doc_id, count, add_time, mod_time in zip(doc_ids, n_atts, added, modified):
+        for _ in range(count):
+            att_id = add_item(type_ids["attachment"], add_time, mod_time)
+            if rng.random() < 0.9:
+                path_ = "storage:{}.pdf".format(_pseudo_word(att_id))
+                link_mode = 1
+            else:
+                path_ = "/home/user/papers/{}.pdf".format(_pseudo_word(att_id))
+                link_mode = 2
+            rows.add(_ATTACHMENTS, (att_id, int(doc_id), link_mode, "application/pdf", path_))
+
+            if rng.random() < 0.8:
+                n_unique = max(1, rng.poisson(words_per_attachment))
+                word_ids = numpy.unique(rng.zipf(1.1, n_unique) % n_words) + 1
+                rows.add(_FULLTEXT_ITEMS, (att_id, 10, 10, 1000*n_unique, 1000*n_unique))
+                for word_id in word_ids:
+                    rows.add(_ITEM_WORDS, (int(word_id), att_id))
+
+    # standalone notes
+    for i in numpy.flatnonzero(rng.random(n_items) < 0.05):
+        note_id = add_item(type_ids["note"], added[i], modified[i])
+        rows.add(_NOTES, (note_id, "note", "note"))
+
+    # trashed at their last modification, so the same seed always generates the same database
+    for i in numpy.flatnonzero(rng.random(n_items) < 0.01):
+        rows.add(_TRASHED, (int(doc_ids[i]), str(modified[i]).replace("T", " ")))
+
+    rows.flush()
+    conn.executemany(
+        "INSERT INTO fulltextWords VALUES (?, ?);", [(i, w) for i, w in enumerate(words, 1)])
+
+    conn.commit()
+    conn.close()
+
+    return path
+
+
+if __name__ == "__main__":
+    import sys
+    generate(
+        sys.argv[1], int(sys.argv[2]) if len(sys.argv) > 2 else 1000,
+        int(sys.argv[3]) if len(sys.argv) > 3 else 0, overwrite=True)
@@ -0,0 +1,219 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+# vim:fenc=utf-8
+#
+# Copyright © 2020 Pi-Yueh Chuang <pychuang@pm.me>
+#
+# Distributed under terms of the BSD 3-Clause license.
+
+"""A positional full-text index of the texts Zotero extracted from attachments.
+
+Zotero keeps the text extracted from an attachment in `storage/<key>/.zotero-ft-cache`. Unlike
+`fulltextWords`, which only records which words an attachment contains, these files keep the words
+in order, so the index built from them answers phrase and proximity queries:
+
+    db.update_index(texts=True)
+    db.search_texts("navier stokes", mode="phrase")
+    db.search_texts("vortex shedding", mode="near", distance=5)
+
+The index lives in the sidecar database (see `zoteroutils.index`). Cache files are read and
+tokenized on a process pool, and an update only processes the files whose sizes or modification
+times changed since the last update.
+"""
+import os
+import re
+import typing
+import pathlib
+import itertools
+import contextlib
+import unicodedata
+import concurrent.futures
+import pandas
+import sqlalchemy
+from .instrument import span as _span
+from .read import load_item_ids, _read_sql
+
+CACHE_FILE = ".zotero-ft-cache"
+
+# the tokens kept in the index; the FTS5 tokenizer splits the joined tokens at the same places
+_WORD = re.compile(r"\w+")
+
+# updates with fewer changed files than this are processed without starting a process pool
+_SERIAL = 8
+
+
+def _tokenize(path: str) -> typing.Optional[str]:
+    """Runs in worker processes: read a cache file and return its words joined by spaces.
+
+    Returns None if the file cannot be read.
+    """
+    try:
+        with open(path, "r", encoding="utf-8", errors="replace") as fobj:
+            text = fobj.read()
+    except OSError:
+        return None
+    return " ".join(_WORD.findall(unicodedata.normalize("NFKC", text)))
+
+
+def _create_tables(conn: sqlalchemy.engine.Connection, schema: str):
+    """Create the index tables in the sidecar database if not exist."""
+
+    # one row per attachment (rowid = attachment's itemID) with positions of its words
+    conn.execute(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS {0}.texts_fts USING FTS5(text);".format(schema))
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS {0}.text_states "
+        "(itemID INTEGER PRIMARY KEY, size INT, mtime INT);".format(schema)
+    )
+
+
+def update_text_index(
+    conn: sqlalchemy.engine.Connection, storage: typing.Union[str, pathlib.Path],
+    max_workers: typing.Optional[int] = None, schema: str = "zindex"
+) -> int:
+    """Incrementally index the cache files of attachments in an attached sidecar database.
+
+    Every attachment's cache file is stat-ed. Only new files and files whose sizes or modification
+    times changed are read, and attachments whose cache files are gone are removed from the index.
+
+    Parameters
+    ----------
+    conn : sqlalchemy.engine.Connection
+        Connection object to Zotero's database, with the sidecar database attached.
+    storage : str or path-like
+        The storage folder, i.e., `Database.storage`.
+    max_workers : None or int
+        The number of worker processes reading and tokenizing files. If None, use the number of
+        CPUs.
+    schema : str
+        The schema name of the attached sidecar database.
+
+    Returns
+    -------
+    int
+        The number of attachments re-indexed or removed. Zero if the index is up-to-date.
+    """
+
+    _create_tables(conn, schema)
+
+    recorded = {
+        item_id: (size, mtime) for item_id, size, mtime in conn.execute(
+            "SELECT itemID, size, mtime FROM {0}.text_states;".format(schema))
+    }
+
+    with _span("texts.stat") as stage:
+        changed = []  # (itemID, path, size, mtime)
+        attachments = conn.execute(
+            "SELECT itemID, key FROM items INNER JOIN itemAttachments USING(itemID);")
+        for item_id, key in attachments:
+            path = os.path.join(storage, key, CACHE_FILE)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            if recorded.pop(item_id, None) != (stat.st_size, stat.st_mtime_ns):
+                changed.append((item_id, path, stat.st_size, stat.st_mtime_ns))
+        stage.rows = len(changed)
+
+    # `recorded` is left with attachments whose cache files are gone
+    removed = [(item_id,) for item_id in recorded] + [(row[0],) for row in changed]
+    paths = [row[1] for row in changed]
+
+    with contextlib.ExitStack() as stack:
+        if len(paths) < _SERIAL:
+            texts = map(_tokenize, paths)
+        else:  # results stream back in order, a few chunks per worker at a time
+            workers = max_workers or os.cpu_count() or 1
+            executor = stack.enter_context(concurrent.futures.ProcessPoolExecutor(workers))
+            texts = executor.map(_tokenize, paths, chunksize=max(1, min(64, len(paths)//workers)))
+
+        with _span("texts.load") as stage, conn.begin():
+            if removed:
+                conn.execute("DELETE FROM {0}.texts_fts WHERE rowid = ?;".format(schema), removed)
+                conn.execute(
+                    "DELETE FROM {0}.text_states WHERE itemID = ?;".format(schema), removed)
+
+            rows = zip(changed, texts)
+            while True:
+                batch = [(row, text) for row, text in itertools.islice(rows, 256)]
+                if not batch:
+                    break
+                batch = [(row, text) for row, text in batch if text is not None]
+                if batch:  # unreadable files are not recorded, so they are tried again next time
+                    conn.execute(
+                        "INSERT INTO {0}.texts_fts(rowid, text) VALUES (?, ?);".format(schema),
+                        [(row[0], text) for row, text in batch])
+                    conn.execute(
+                        "INSERT INTO {0}.text_states VALUES (?, ?, ?);".format(schema),
+                        [(row[0], row[2], row[3]) for row, _ in batch])
+
+            stage.rows = len(changed)
+
+    return len(recorded) + len(changed)
+
+
+def search_texts(
+    conn: sqlalchemy.engine.Connection,
+    keys: str,
+    mode: str = "all",
+    distance: int = 10,
+    item_ids: typing.Optional[typing.Sequence[typing.Union[str, int]]] = None,
+    schema: str = "zindex"
+) -> pandas.DataFrame:
+    """Search the texts extracted from attachments, with phrase and proximity queries.
+
+    Call `update_text_index` first to bring the index up-to-date.
+
+    Parameters
+    ----------
+    conn : sqlalchemy.engine.Connection
+        Connection object to Zotero's database, with the sidecar database attached.
+    keys : str
+        A single string containing all tokens/keys. Tokens/keys are separated by spaces.
+    mode : str
+        "all" (default) matches texts containing all keys anywhere. "phrase" matches texts
+        containing the keys next to each other in the given order. "near" matches texts containing
+        all keys within a window of `distance` words.
+    distance : int
+        The maximum number of words between the keys in "near" mode.
+    item_ids : None or a list-like of int/str
+        Limit the candidate items (attachments or their parents) to these item_ids. If None,
+        search all items.
+    schema : str
+        The schema name of the attached sidecar database.
+
+    Returns
+    -------
+    pandas.DataFrame
+        A dataframe with columns "itemID" (the attachments' parents) and "attachmentID", sorted by
+        relevance.
+    """
+    # pylint: disable=too-many-arguments
+
+    words = ["\"{}\"".format(key.replace("\"", "\"\"")) for key in keys.split()]
+
+    if mode == "all":
+        expression = " ".join(words)
+    elif mode == "phrase":
+        expression = " + ".join(words)
+    elif mode == "near":
+        expression = "NEAR({}, {})".format(" ".join(words), int(distance))
+    else:
+        raise ValueError("Unrecognized mode: {}".format(mode))
+
+    if not words:
+        return pandas.DataFrame({"itemID": [], "attachmentID": []})
+
+    _create_tables(conn, schema)
+
+    query = """
+        SELECT parentItemID AS itemID, itemAttachments.itemID AS attachmentID FROM {0}.texts_fts
+        INNER JOIN itemAttachments ON itemAttachments.itemID = texts_fts.rowid
+        WHERE texts_fts MATCH ?
+    """.format(schema)
+
+    if item_ids is not None:
+        item_ids = load_item_ids(conn, item_ids)
+        query += " AND (itemAttachments.itemID IN ({0}) OR parentItemID IN ({0}))".format(item_ids)
+
+    return _read_sql("texts.query", query + " ORDER BY rank;", conn, params=(expression,))
@@ -0,0 +1,142 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+# vim:fenc=utf-8
+#
+# Copyright © 2020 Pi-Yueh Chuang <pychuang@pm.me>
+#
+# Distributed under terms of the BSD 3-Clause license.
+
+"""Keep the results of `Database.get_docs` up-to-date by re-reading only changed documents.
+
+Usage:
+
+    tracker = db.track_docs()
+    docs = tracker.docs  # read all documents once
+    ...
+    tracker.refresh()    # re-read documents changed since the last read; returns their number
+    docs = tracker.docs
+"""
+import typing
+import numpy
+import pandas
+from .instrument import span as _span
+
+
+class DocsTracker:
+    """Incrementally refreshed results of `Database.get_docs`.
+
+    The tracker remembers a high-water mark of the database (see `read.get_high_water_mark`) taken
+    before each read. A refresh re-reads only the documents changed since the mark (see
+    `read.get_changed_doc_ids`) and replaces their rows, so its cost is proportional to the number
+    of edits rather than the size of the library. When items were purged from the database, the
+    refresh reads all documents again.
+
+    Parameters
+    ----------
+    db : Database
+        The database. In "snapshot" mode, call `db.refresh()` before `refresh()` to see new edits.
+    **kwargs :
+        Keyword arguments of `Database.get_docs` except `itemIDs`.
+
+    Notes
+    -----
+    Rows of re-read documents are overwritten in place when their numbers of rows do not change, so
+    a frame returned by `docs` earlier may see later refreshes. Copy it to keep a version.
+
+    An attachment moved from one document to another only updates the new parent until the next
+    full read, because the old parent's rows are not linked to the attachment anymore.
+    """
+
+    def __init__(self, db, **kwargs):
+        self._db = db
+        self._kwargs: dict = dict(
+            dict(abs_attach_path=True, simplify_author=True, method="join",
+                 attachment_output="path"), **kwargs)
+        self._docs: typing.Optional[pandas.DataFrame] = None
+        self._mark: typing.Optional[dict] = None
+
+    @property
+    def docs(self) -> pandas.DataFrame:
+        """The documents as of the last read, sorted by itemIDs. Read all of them on first use."""
+        if self._docs is None:
+            self.reload()
+        return self._docs
+
+    @property
+    def mark(self) -> typing.Optional[dict]:
+        """The high-water mark taken before the last read, or None if never read."""
+        return self._mark
+
+    def _read(self, conn, itemIDs):
+        """Read the documents with `Database._read_docs`."""
+        kwargs = self._kwargs
+        return self._db._read_docs(  # pylint: disable=protected-access
+            conn, itemIDs, kwargs["abs_attach_path"], kwargs["simplify_author"],
+            kwargs["method"], kwargs["attachment_output"])
+
+    def _patch(self, updates: pandas.DataFrame):
+        """Overwrite the rows of re-read documents in `docs` and add the rows of new documents."""
+        docs = self._docs
+        updates = updates.sort_index(kind="stable")
+
+        # the index is itemID, repeated with attachment_output="explode", in which case the rows of
+        # a document are contiguous and in the same order in both frames; documents with as many
+        # rows as before are overwritten in place, by positions because labels are not unique
+        old = docs.index[docs.index.isin(updates.index)].value_counts()
+        new = updates.index.value_counts()
+        same = new.index[new.eq(old.reindex(new.index))]
+
+        if len(same) != 0:
+            positions = numpy.flatnonzero(docs.index.isin(same))
+            patch = updates[updates.index.isin(same)]
+            for i, column in enumerate(docs.columns):
+                docs.iloc[positions, i] = patch[column].to_numpy()
+
+        # new documents, and documents whose numbers of attachment rows changed
+        rest = updates[~updates.index.isin(same)]
+        if not rest.empty:
+            docs = pandas.concat([docs.drop(rest.index.unique(), errors="ignore"), rest])
+            if not docs.index.is_monotonic_increasing:
+                docs = docs.sort_index(kind="stable")
+
+        self._docs = docs
+
+    def reload(self) -> int:
+        """Read all documents again. Returns the number of rows."""
+        from . import read  # pylint: disable=import-outside-toplevel
+
+        with self._db.engine.connect() as conn:
+            mark = read.get_high_water_mark(conn)
+            self._docs = self._read(conn, None).sort_index(kind="stable")
+            self._mark = mark
+
+        return len(self._docs)
+
+    def refresh(self) -> int:
+        """Re-read the documents changed since the last read and patch `docs`.
+
+        Returns
+        -------
+        int
+            The number of documents re-read, or the number of rows if all documents were read.
+        """
+        from . import read  # pylint: disable=import-outside-toplevel
+
+        if self._docs is None:
+            return self.reload()
+
+        with self._db.engine.connect() as conn:
+            mark = read.get_high_water_mark(conn)
+            changed = read.get_changed_doc_ids(conn, self._mark, **self._db.doctype2id)
+            updates = self._read(conn, changed) if changed else None
+
+        if changed is None:
+            return self.reload()
+
+        with _span("tracking.patch") as stage:
+            if updates is not None:
+                self._patch(updates)
+            stage.rows = len(changed)
+
+        self._mark = mark
+        return len(changed)